@@ -36,6 +36,9 @@ class DDBLogBase(LogBase):
     DDB_CORE_013 = LogReference(level=INFO, message="Completed batch write to DynamoDB")
     DDB_CORE_014 = LogReference(level=ERROR, message="Error performing batch write")
     DDB_CORE_015 = LogReference(level=ERROR, message="Unprocessed items in batch write")
+    DDB_CORE_016 = LogReference(
+        level=WARNING, message="Retrying unprocessed items in batch write"
+    )
 
 
 class DataMigrationLogBase(LogBase):
@@ -163,6 +166,54 @@ class DataMigrationLogBase(LogBase):
         level=INFO,
         message="No ageEligibilityCriteria created for Service ID {service_id} as no age range found",
     )
+    DM_ETL_018 = LogReference(
+        level=ERROR,
+        message="Failed to process SQS message {message_id}: {error}",
+    )
+    DM_ETL_019 = LogReference(
+        level=INFO,
+        message="Resuming full sync after service ID {last_record_id}",
+    )
+    DM_ETL_020 = LogReference(
+        level=INFO,
+        message="Full sync progress: {processed_records} records processed ({records_per_second:.1f} records/s)",
+    )
+    DM_ETL_021 = LogReference(
+        level=INFO,
+        message="Running incremental sync for services modified since {modified_since}",
+    )
+    DM_ETL_022 = LogReference(
+        level=WARNING,
+        message="Incremental sync completed with {error_count} errors, watermark not advanced",
+    )
+    DM_ETL_023 = LogReference(
+        level=INFO,
+        message="Incremental sync watermark advanced to {modified_since}",
+    )
+    DM_ETL_024 = LogReference(
+        level=INFO,
+        message="Pipeline stage {stage} processed {processed_items} items ({items_per_second:.1f} items/s)",
+    )
+    DM_ETL_025 = LogReference(
+        level=ERROR,
+        message="Failed to save batch of {record_count} transformed records: {error}",
+    )
+    DM_ETL_026 = LogReference(
+        level=INFO,
+        message="Profiled {total_records} services: {supported_records} supported, {records_with_issues} with validation issues",
+    )
+    DM_ETL_027 = LogReference(
+        level=INFO,
+        message="Reconciled {table}: {matched} matched, {missing} missing, {extra} extra, {drifted} drifted",
+    )
+    DM_ETL_028 = LogReference(
+        level=INFO,
+        message="Coalesced {change_count} changes into a sync of {service_count} services",
+    )
+    DM_ETL_029 = LogReference(
+        level=WARNING,
+        message="Records failed to migrate in the page ending at record {failed_record_id}, checkpoint held at {last_record_id}",
+    )
 
     DM_ETL_999 = LogReference(
         level=INFO, message="Data Migration ETL Pipeline completed successfully."
@@ -173,7 +224,7 @@ class DataMigrationLogBase(LogBase):
     )
     DM_QP_001 = LogReference(
         level=INFO,
-        message="Populating SQS queue with {count} total messages",
+        message="Populating SQS queue {queue_url} with up to {max_in_flight_batches} batches in flight",
     )
     DM_QP_002 = LogReference(
         level=DEBUG, message="Sending {count} messages to SQS queue"
@@ -184,8 +235,17 @@ class DataMigrationLogBase(LogBase):
     DM_QP_004 = LogReference(
         level=DEBUG, message="Successfully sent {count} messages to SQS queue"
     )
+    DM_QP_005 = LogReference(
+        level=WARNING,
+        message="Retrying {count} messages to SQS queue in {delay:.1f}s (attempt {attempt})",
+    )
+    DM_QP_006 = LogReference(
+        level=ERROR,
+        message="Unexpected error sending {count} messages to SQS queue: {error}",
+    )
     DM_QP_999 = LogReference(
-        level=INFO, message="Data Migration Queue Populator completed"
+        level=INFO,
+        message="Data Migration Queue Populator completed: {sent_messages} messages sent, {failed_messages} failed",
     )
 
 
@@ -1,4 +1,4 @@
-from itertools import islice
+from itertools import batched, islice
 from typing import Generator
 from uuid import UUID
 
@@ -14,6 +14,8 @@ class AttributeLevelRepository(DynamoDBRepository[ModelType]):
     updating, and deleting documents in DynamoDB.
     """
 
+    BATCH_WRITE_LIMIT = 25
+
     def create(self, obj: ModelType) -> None:
         """
         Create a new item in DynamoDB.
@@ -43,6 +45,20 @@ class AttributeLevelRepository(DynamoDBRepository[ModelType]):
         """
         self._put_item(obj)
 
+    def batch_upsert(self, objs: list[ModelType]) -> None:
+        """
+        Upsert multiple items in DynamoDB using batch writes.
+        Items are written in chunks of up to 25, the maximum allowed in a single request.
+        """
+        # A batch write cannot contain the same key twice, so keep the last copy of each item
+        items = map(self._serialise_item, objs)
+        unique_items = list(
+            {(item["id"], item["field"]): item for item in items}.values()
+        )
+
+        for chunk in batched(unique_items, self.BATCH_WRITE_LIMIT):
+            self._batch_write(put_items=list(chunk))
+
     def update(self, id: str | UUID, obj: ModelType) -> None:
         """
         Update an existing item in DynamoDB.
@@ -89,6 +105,16 @@ class AttributeLevelRepository(DynamoDBRepository[ModelType]):
             max_results,
         )
 
+    def scan_segment(
+        self, segment: int, total_segments: int
+    ) -> Generator[ModelType, None, None]:
+        """
+        Iterate across all items in one segment of a parallel scan of the table.
+        Each segment can be scanned concurrently by a separate worker.
+        """
+        for item in self._scan(Segment=segment, TotalSegments=total_segments):
+            yield self._parse_item(item)
+
     def get_by_ods_code(self, ods_code: str) -> list[str]:
         return self._get_records_by_ods_code(ods_code)
 
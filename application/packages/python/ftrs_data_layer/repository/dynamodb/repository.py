@@ -1,3 +1,5 @@
+import random
+from time import sleep
 from typing import Any, Generator
 from uuid import UUID
 
@@ -6,6 +8,7 @@ from ftrs_common.logger import Logger
 from ftrs_data_layer.client import get_dynamodb_resource
 from ftrs_data_layer.logbase import DDBLogBase
 from ftrs_data_layer.repository.base import BaseRepository, ModelType
+from mypy_boto3_dynamodb import DynamoDBServiceResource
 from mypy_boto3_dynamodb.type_defs import PutItemInputTablePutItemTypeDef
 
 
@@ -15,15 +18,20 @@ class DynamoDBRepository(BaseRepository[ModelType]):
     This class is agnostic of the methods of database storage.
     """
 
+    BATCH_WRITE_MAX_ATTEMPTS = 5
+    BATCH_WRITE_BASE_BACKOFF = 0.05
+    BATCH_WRITE_MAX_BACKOFF = 2.0
+
     def __init__(
         self,
         table_name: str,
         model_cls: ModelType = None,
         endpoint_url: str | None = None,
         logger: Logger | None = None,
+        resource: DynamoDBServiceResource | None = None,
     ) -> None:
         super().__init__(model_cls, logger)
-        self.resource = get_dynamodb_resource(endpoint_url)
+        self.resource = resource or get_dynamodb_resource(endpoint_url)
         self.table = self.resource.Table(table_name)
         self.logger.log(
             DDBLogBase.DDB_CORE_001,
@@ -158,6 +166,8 @@ class DynamoDBRepository(BaseRepository[ModelType]):
     ) -> None:
         """
         Performs a batch write operation on the DynamoDB table.
+        Unprocessed items are resent with jittered exponential backoff, and a
+        RuntimeError is raised if any remain once the attempts are exhausted.
         """
         if not put_items:
             put_items = []
@@ -182,32 +192,55 @@ class DynamoDBRepository(BaseRepository[ModelType]):
             table=self.table.name,
         )
 
-        try:
-            response = self.resource.batch_write_item(**ddb_request)
-            self.logger.log(
-                DDBLogBase.DDB_CORE_013,
-                table=self.table.name,
-                consumed_capacity=response.get("ConsumedCapacity"),
-            )
-        except ClientError as client_error:
-            self.logger.log(
-                DDBLogBase.DDB_CORE_014,
-                table=self.table.name,
-                error=client_error.response["Error"],
-                request=ddb_request,
-            )
-            raise
+        request_items = ddb_request["RequestItems"]
+        for attempt in range(1, self.BATCH_WRITE_MAX_ATTEMPTS + 1):
+            try:
+                response = self.resource.batch_write_item(
+                    **{**ddb_request, "RequestItems": request_items}
+                )
+                self.logger.log(
+                    DDBLogBase.DDB_CORE_013,
+                    table=self.table.name,
+                    consumed_capacity=response.get("ConsumedCapacity"),
+                )
+            except ClientError as client_error:
+                self.logger.log(
+                    DDBLogBase.DDB_CORE_014,
+                    table=self.table.name,
+                    error=client_error.response["Error"],
+                    request=ddb_request,
+                )
+                raise
 
-        unprocessed_items = response.get("UnprocessedItems")
-        if unprocessed_items:
-            self.logger.log(
-                DDBLogBase.DDB_CORE_015,
-                table=self.table.name,
-                request=ddb_request,
-                unprocessed_items=unprocessed_items,
-            )
-            error_msg = f"Unprocessed items in batch write: {unprocessed_items}"
-            raise RuntimeError(error_msg)
+            request_items = response.get("UnprocessedItems")
+            if not request_items:
+                return
+
+            if attempt < self.BATCH_WRITE_MAX_ATTEMPTS:
+                self.logger.log(
+                    DDBLogBase.DDB_CORE_016,
+                    table=self.table.name,
+                    attempt=attempt,
+                    unprocessed_count=len(request_items.get(self.table.name, [])),
+                )
+                sleep(
+                    random.uniform(
+                        0,
+                        min(
+                            self.BATCH_WRITE_MAX_BACKOFF,
+                            self.BATCH_WRITE_BASE_BACKOFF * 2**attempt,
+                        ),
+                    )
+                )
+
+        self.logger.log(
+            DDBLogBase.DDB_CORE_015,
+            table=self.table.name,
+            request=ddb_request,
+            unprocessed_items=request_items,
+        )
+        error_msg = f"Unprocessed items in batch write: {request_items}"
+        raise RuntimeError(error_msg)
 
     def _scan(self, **kwargs: dict) -> Generator[dict, None, None]:
         """
@@ -1,3 +1,4 @@
+from types import GeneratorType
 from unittest.mock import MagicMock
 
 from ftrs_data_layer.repository.dynamodb import AttributeLevelRepository
@@ -223,6 +224,38 @@ def test_iter_records_single_page() -> None:
     repo.table.scan.assert_called_once_with(Limit=100, ReturnConsumedCapacity="INDEXES")
 
 
+def test_scan_segment() -> None:
+    """
+    Test the scan_segment method of the AttributeLevelRepository.
+    """
+    repo = AttributeLevelRepository(
+        table_name="test_table",
+        model_cls=MockModel,
+    )
+
+    repo.table.scan = MagicMock(
+        return_value={
+            "Items": [
+                {"id": "1", "field": "document", "name": "Test1"},
+                {"id": "2", "field": "document", "name": "Test2"},
+            ]
+        }
+    )
+
+    segment = repo.scan_segment(1, 4)
+    assert isinstance(segment, GeneratorType)
+
+    results = list(segment)
+
+    assert results == [
+        MockModel(id="1", name="Test1"),
+        MockModel(id="2", name="Test2"),
+    ]
+    repo.table.scan.assert_called_once_with(
+        ReturnConsumedCapacity="INDEXES", Limit=1000, Segment=1, TotalSegments=4
+    )
+
+
 def test_iter_records_multiple_pages() -> None:
     """
     Test the iter_records method of the DocumentLevelRepository when records span multiple pages.
@@ -359,6 +392,33 @@ def test_doc_upsert() -> None:
     )
 
 
+def test_doc_batch_upsert() -> None:
+    """
+    Test the batch_upsert method of the DocumentLevelRepository.
+    """
+    repo = AttributeLevelRepository(
+        table_name="test_table",
+        model_cls=MockModel,
+    )
+    objs = [MockModel(id=str(i), name=f"Test {i}") for i in range(30)]
+    objs.append(MockModel(id="0", name="Updated"))
+
+    repo.resource.batch_write_item = MagicMock(return_value={})
+
+    repo.batch_upsert(objs)
+
+    expected_request_count = 2
+    assert repo.resource.batch_write_item.call_count == expected_request_count
+
+    first_request = repo.resource.batch_write_item.call_args_list[0].kwargs
+    second_request = repo.resource.batch_write_item.call_args_list[1].kwargs
+    assert len(first_request["RequestItems"]["test_table"]) == 25  # noqa: PLR2004
+    assert len(second_request["RequestItems"]["test_table"]) == 5  # noqa: PLR2004
+    assert first_request["RequestItems"]["test_table"][0] == {
+        "PutRequest": {"Item": {"id": "0", "field": "document", "name": "Updated"}}
+    }
+
+
 def test_get_by_ods_code() -> None:
     """
     Test the get_by_ods_code method of the DocumentLevelRepository.
@@ -1,4 +1,4 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 from botocore.exceptions import ClientError
@@ -71,6 +71,23 @@ def test_dynamodb_repository_init(mock_logger: MockLogger) -> None:
     ]
 
 
+def test_dynamodb_repository_init_with_resource() -> None:
+    """
+    Test that the DynamoDB repository uses the given resource instead of the shared one
+    """
+    mock_resource = Mock()
+
+    ddb_repo = ExampleDDBRepository(
+        table_name="test_table",
+        model_cls=BaseModel,
+        resource=mock_resource,
+    )
+
+    assert ddb_repo.resource is mock_resource
+    assert ddb_repo.table == mock_resource.Table.return_value
+    mock_resource.Table.assert_called_once_with("test_table")
+
+
 def test_dynamodb_put_item(
     mock_logger: MockLogger,
 ) -> None:
@@ -564,11 +581,13 @@ def test_dynamodb_batch_write_error(
     ]
 
 
+@patch("ftrs_data_layer.repository.dynamodb.repository.sleep")
 def test_dynamodb_batch_write_unprocessed_items(
+    mock_sleep: Mock,
     mock_logger: MockLogger,
 ) -> None:
     """
-    Test that the _batch_write method handles unprocessed items correctly
+    Test that the _batch_write method raises once retries of unprocessed items are exhausted
     """
 
     class MockModel(BaseModel):
@@ -594,6 +613,17 @@ def test_dynamodb_batch_write_unprocessed_items(
     with pytest.raises(RuntimeError):
         ddb_repo._batch_write(put_items=put_items, delete_items=delete_items)
 
+    assert (
+        ddb_repo.resource.batch_write_item.call_count
+        == DynamoDBRepository.BATCH_WRITE_MAX_ATTEMPTS
+    )
+    assert mock_sleep.call_count == DynamoDBRepository.BATCH_WRITE_MAX_ATTEMPTS - 1
+    ddb_repo.resource.batch_write_item.assert_called_with(
+        RequestItems={
+            "test_table": [{"PutRequest": {"Item": {"id": "123", "name": "test_item"}}}]
+        },
+        ReturnConsumedCapacity="INDEXES",
+    )
     assert mock_logger.get_log("DDB_CORE_015", "ERROR") == [
         {
             "reference": "DDB_CORE_015",
@@ -623,6 +653,50 @@ def test_dynamodb_batch_write_unprocessed_items(
     ]
 
 
+@patch("ftrs_data_layer.repository.dynamodb.repository.sleep")
+def test_dynamodb_batch_write_retries_unprocessed_items(
+    mock_sleep: Mock,
+    mock_logger: MockLogger,
+) -> None:
+    """
+    Test that the _batch_write method resends unprocessed items until they are written
+    """
+
+    class MockModel(BaseModel):
+        id: str
+        name: str
+
+    ddb_repo = ExampleDDBRepository(table_name="test_table", model_cls=MockModel)
+
+    unprocessed_items = {
+        "test_table": [{"PutRequest": {"Item": {"id": "123", "name": "test_item"}}}]
+    }
+    ddb_repo.resource.batch_write_item = Mock(
+        side_effect=[{"UnprocessedItems": unprocessed_items}, {"UnprocessedItems": {}}]
+    )
+
+    ddb_repo._batch_write(
+        put_items=[
+            {"id": "123", "name": "test_item"},
+            {"id": "456", "name": "another_item"},
+        ]
+    )
+
+    assert ddb_repo.resource.batch_write_item.call_count == 2  # noqa: PLR2004
+    ddb_repo.resource.batch_write_item.assert_called_with(
+        RequestItems=unprocessed_items, ReturnConsumedCapacity="INDEXES"
+    )
+    mock_sleep.assert_called_once()
+    assert mock_logger.get_log("DDB_CORE_016", "WARNING") == [
+        {
+            "reference": "DDB_CORE_016",
+            "msg": "Retrying unprocessed items in batch write",
+            "detail": {"table": "test_table", "attempt": 1, "unprocessed_count": 1},
+        }
+    ]
+    assert mock_logger.was_logged("DDB_CORE_015") is False
+
+
 def test_dynamodb_scan() -> None:
     """
     Test that the _scan method calls the DynamoDB resource
@@ -1,14 +1,23 @@
-from typing import Literal
+from datetime import datetime
+from typing import Annotated, Literal
 from uuid import uuid4
 
+from aws_lambda_powertools.metrics import Metrics, MetricUnit
 from aws_lambda_powertools.utilities.data_classes import SQSEvent
 from ftrs_common.logger import Logger
 from ftrs_data_layer.logbase import DataMigrationLogBase
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from pipeline.processor import DataMigrationProcessor
 from pipeline.triagecode_processor import TriageCodeProcessor
-from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.checkpoint import MigrationCheckpointStore, SyncWatermarkStore
+from pipeline.utils.config import DataMigrationConfig, PipelineConfig
+from pipeline.utils.dbutil import SERVICE_CHILD_TABLES
+
+MAX_BATCH_EVENT_RECORDS = 100
+
+METRICS_NAMESPACE = "FtRS/DataMigration"
+METRICS = Metrics(namespace=METRICS_NAMESPACE, service="data-migration")
 
 
 class DMSEvent(BaseModel):
@@ -18,33 +27,109 @@ class DMSEvent(BaseModel):
     method: str
 
 
+class DMSBatchEvent(BaseModel):
+    type: Literal["dms_batch_event"] = "dms_batch_event"
+    record_ids: Annotated[
+        list[int], Field(min_length=1, max_length=MAX_BATCH_EVENT_RECORDS)
+    ]
+    table_name: str
+    method: str
+
+
 class DataMigrationApplication:
+    TIMING_PERCENTILES = ("p50_ms", "p90_ms", "p99_ms")
+
     def __init__(self, config: DataMigrationConfig | None = None) -> None:
         self.config = config or DataMigrationConfig()
         self.logger = self.create_logger()
         self.processor = self.create_processor()
         self.triage_code_processor = self.create_triage_code_processor()
 
-    def handle_sqs_event(self, event: SQSEvent) -> None:
+    def handle_sqs_event(self, event: SQSEvent) -> dict:
         """
         Process the incoming event and run the correct processing logic for the change.
+
+        Changes to services and their child tables are first resolved to the IDs of the
+        changed services, so that a service changed by several messages in the batch is
+        only synced once.
+
+        Returns an SQS batch response containing the IDs of any failed messages,
+        so that only those messages are redelivered.
         """
         self.processor.metrics.reset()
+        self.processor.transformers.reset()
         self.logger.log(DataMigrationLogBase.DM_ETL_000, event=event)
 
+        failed_message_ids: list[str] = []
+        changed_services: dict[int, list[str]] = {}
         for record in event.records:
-            parsed_event = self.parse_event(record.json_body)
-            self.handle_dms_event(parsed_event)
+            try:
+                service_ids = self.get_changed_service_ids(
+                    self.parse_event(record.json_body)
+                )
+            except Exception as e:
+                self.logger.log(
+                    DataMigrationLogBase.DM_ETL_018,
+                    message_id=record.message_id,
+                    error=str(e),
+                )
+                failed_message_ids.append(record.message_id)
+                continue
 
-        self.logger.log(
-            DataMigrationLogBase.DM_ETL_999,
-            metrics=self.processor.metrics.model_dump(),
-        )
+            for service_id in service_ids:
+                changed_services.setdefault(service_id, []).append(record.message_id)
 
-    def handle_dms_event(self, event: DMSEvent) -> None:
+        if changed_services:
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_028,
+                change_count=sum(len(ids) for ids in changed_services.values()),
+                service_count=len(changed_services),
+            )
+
+        failed_services = self.sync_changed_services(list(changed_services))
+        for service_id, error in failed_services.items():
+            for message_id in changed_services[service_id]:
+                if message_id in failed_message_ids:
+                    continue
+                self.logger.log(
+                    DataMigrationLogBase.DM_ETL_018,
+                    message_id=message_id,
+                    error=error,
+                )
+                failed_message_ids.append(message_id)
+
+        self.log_completion(failed_message_count=len(failed_message_ids))
+
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": message_id} for message_id in failed_message_ids
+            ]
+        }
+
+    def sync_changed_services(self, service_ids: list[int]) -> dict[int, str]:
         """
-        Handle an event from DMS
-        This should be a single record change event.
+        Sync the changed services in batches of up to MAX_BATCH_EVENT_RECORDS.
+        Each service is synced once, and only the services which fail are reported.
+        If a batch cannot be synced at all (e.g. the services cannot be fetched),
+        every service in it is reported as failed.
+        Returns the error for each service which could not be synced.
+        """
+        failed_services = {}
+        for start in range(0, len(service_ids), MAX_BATCH_EVENT_RECORDS):
+            batch = service_ids[start : start + MAX_BATCH_EVENT_RECORDS]
+            try:
+                failed_services.update(self.processor.sync_services(batch, "update"))
+            except Exception as e:
+                failed_services.update(dict.fromkeys(batch, str(e)))
+
+        return failed_services
+
+    def get_changed_service_ids(self, event: DMSEvent | DMSBatchEvent) -> list[int]:
+        """
+        Get the IDs of the services changed by an event from DMS.
+        Changes to child tables, such as endpoints or opening times, are resolved to the
+        service the changed records belong to.
+        Returns an empty list if the change is not supported and can be ignored.
         """
         if event.method not in ["insert", "update"]:
             self.logger.log(
@@ -52,11 +137,16 @@ class DataMigrationApplication:
                 method=event.method,
                 event=event.model_dump(),
             )
-            return
+            return []
+
+        record_ids = (
+            event.record_ids if isinstance(event, DMSBatchEvent) else [event.record_id]
+        )
+        if event.table_name == "services":
+            return record_ids
 
-        match event.table_name:
-            case "services":
-                return self.processor.sync_service(event.record_id, event.method)
+        if event.table_name in SERVICE_CHILD_TABLES:
+            return self.processor.resolve_service_ids(event.table_name, record_ids)
 
         self.logger.log(
             DataMigrationLogBase.DM_ETL_011,
@@ -64,20 +154,111 @@ class DataMigrationApplication:
             method=event.method,
             event=event.model_dump(),
         )
+        return []
 
-    def handle_full_sync_event(self) -> None:
+    def handle_dms_event(self, event: DMSEvent | DMSBatchEvent) -> bool:
+        """
+        Handle an event from DMS
+        This should be a single record change event, or a batch of changes to the same table.
+        Returns False if the change could not be processed and should be retried.
+        """
+        service_ids = self.get_changed_service_ids(event)
+        if not service_ids:
+            return True
+
+        if isinstance(event, DMSEvent) and event.table_name == "services":
+            return self.processor.sync_service(event.record_id, event.method)
+
+        return not self.processor.sync_services(service_ids, event.method)
+
+    def handle_full_sync_event(
+        self,
+        checkpoint_store: MigrationCheckpointStore | None = None,
+        resume: bool = False,
+        batch_size: int = 1000,
+        pipeline_config: PipelineConfig | None = None,
+    ) -> None:
         """
         Handle a full sync event.
-        This should trigger the full sync process.
+        This should trigger the full sync process, followed by the triage code sync.
+        Completion is logged once both have finished, so that the published metrics
+        cover the whole run.
+        """
+        self.processor.sync_all_services(
+            checkpoint_store=checkpoint_store,
+            resume=resume,
+            batch_size=batch_size,
+            pipeline_config=pipeline_config,
+        )
+        self.triage_code_processor.sync_all_triage_codes(
+            concurrent=pipeline_config is not None
+        )
+        self.log_completion()
+
+    def handle_incremental_sync_event(
+        self,
+        watermark_store: SyncWatermarkStore,
+        modified_since: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Handle an incremental sync event.
+        This syncs only the services modified since the last successful run.
+        """
+        self.processor.sync_modified_services(
+            watermark_store=watermark_store,
+            modified_since=modified_since,
+            batch_size=batch_size,
+        )
+        self.log_completion()
+
+    def log_completion(self, **detail: dict) -> None:
+        """
+        Log the processor metrics, including the time spent in each stage,
+        and publish them as CloudWatch metrics.
+        """
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_999,
+            metrics=self.processor.metrics.model_dump(exclude={"timings"}),
+            timings=self.processor.metrics.timing_summary(),
+            transformer_metrics={
+                name: metrics.model_dump()
+                for name, metrics in self.processor.transformers.metrics.items()
+            },
+            **detail,
+        )
+        self.publish_metrics()
+
+    def publish_metrics(self) -> None:
+        """
+        Publish the processor metrics in CloudWatch embedded metric format.
+        Record counts are published as counts and each stage timing as latency percentiles.
+        The environment dimension is cleared with the metrics when they are flushed.
         """
-        self.processor.sync_all_services()
-        self.triage_code_processor.sync_all_triage_codes()
+        METRICS.add_dimension(name="environment", value=self.config.env)
+
+        for name, value in self.processor.metrics.model_dump(
+            exclude={"timings"}
+        ).items():
+            METRICS.add_metric(name=name, unit=MetricUnit.Count, value=value)
+
+        for stage, summary in self.processor.metrics.timing_summary().items():
+            for percentile in self.TIMING_PERCENTILES:
+                METRICS.add_metric(
+                    name=f"{stage}_{percentile}",
+                    unit=MetricUnit.Milliseconds,
+                    value=summary[percentile],
+                )
+
+        METRICS.flush_metrics()
 
-    def parse_event(self, event: dict) -> DMSEvent:
+    def parse_event(self, event: dict) -> DMSEvent | DMSBatchEvent:
         """
-        Parse the incoming event into a DMSEvent object.
+        Parse the incoming event into a DMSEvent or DMSBatchEvent object.
         """
         try:
+            if event.get("type") == "dms_batch_event":
+                return DMSBatchEvent(**event)
             return DMSEvent(**event)
         except Exception as e:
             self.logger.log(
@@ -1,22 +1,44 @@
 import asyncio
+import json
 from contextlib import contextmanager
+from datetime import datetime
 from enum import StrEnum
 from pathlib import Path
+from threading import Lock
 from typing import Annotated, Generator, List
 
 import rich
-from typer import Option, Typer
+from ftrs_common.logger import Logger
+from ftrs_data_layer.domain.triage_code import TriageCode
+from typer import BadParameter, Exit, Option, Typer
 
 from pipeline.application import DataMigrationApplication, DMSEvent
 from pipeline.processor import ServiceTransformOutput
+from pipeline.profiler import DataMigrationProfiler
 from pipeline.queue_populator import populate_sqs_queue
+from pipeline.reconciler import DataMigrationReconciler
+from pipeline.seeding.backup import BackupFormat
 from pipeline.seeding.export_to_s3 import run_s3_export
-from pipeline.seeding.restore import run_s3_restore
+from pipeline.seeding.restore import (
+    DEFAULT_FAILURES_FILE,
+    DEFAULT_WCU_BUDGET,
+    run_s3_restore,
+)
+from pipeline.utils.checkpoint import MigrationCheckpointStore, SyncWatermarkStore
 from pipeline.utils.config import (
     DatabaseConfig,
     DataMigrationConfig,
+    LogVerbosity,
+    PipelineConfig,
     QueuePopulatorConfig,
 )
+from pipeline.utils.dry_run import (
+    DRY_RUN_MODELS,
+    DryRunFormat,
+    DryRunWriter,
+    diff_dry_runs,
+    get_dry_run_path,
+)
 
 CONSOLE = rich.get_console()
 
@@ -54,21 +76,68 @@ def migrate_handler(  # noqa: PLR0913
     output_dir: Annotated[
         Path | None, Option(help="Directory to save transformed records (dry run only)")
     ] = None,
+    checkpoint_file: Annotated[
+        Path | None, Option(help="File to persist full sync progress to")
+    ] = None,
+    resume: Annotated[
+        bool, Option(help="Resume the full sync from the checkpoint file")
+    ] = False,
+    watermark_file: Annotated[
+        Path | None,
+        Option(help="Run an incremental sync using the watermark stored in this file"),
+    ] = None,
+    modified_since: Annotated[
+        datetime | None,
+        Option(help="Override the incremental sync watermark (incremental sync only)"),
+    ] = None,
+    batch_size: Annotated[
+        int, Option(min=1, help="Number of services to load and process per page")
+    ] = 1000,
+    pipeline: Annotated[
+        bool,
+        Option(
+            help="Fetch, transform and save pages and triage codes concurrently (full sync only)"
+        ),
+    ] = False,
+    load_workers: Annotated[
+        int, Option(min=1, help="Threads saving pages to DynamoDB (--pipeline only)")
+    ] = 4,
+    queue_size: Annotated[
+        int, Option(min=1, help="Pages buffered between stages (--pipeline only)")
+    ] = 2,
+    output_format: Annotated[
+        DryRunFormat, Option(help="File format of the saved records (dry run only)")
+    ] = DryRunFormat.JSONL,
+    log_verbosity: Annotated[
+        LogVerbosity, Option(help="Whether full records are included in record logs")
+    ] = LogVerbosity.FULL,
+    log_sample_percent: Annotated[
+        float,
+        Option(min=0, max=100, help="Percentage of records logged in full (sampled)"),
+    ] = 1.0,
 ) -> None:
     """
     Local entrypoint for testing the data migration.
-    This function can be used to run the full or single sync process locally.
+    This function can be used to run the full, incremental or single sync process locally.
     """
+    if resume and checkpoint_file is None:
+        raise BadParameter("--resume requires --checkpoint-file")
+
+    if modified_since and watermark_file is None:
+        raise BadParameter("--modified-since requires --watermark-file")
+
     app = DataMigrationApplication(
         config=DataMigrationConfig(
             db_config=DatabaseConfig.from_uri(db_uri),
             ENVIRONMENT=env,
             WORKSPACE=workspace,
             ENDPOINT_URL=ddb_endpoint_url,
+            LOG_VERBOSITY=log_verbosity,
+            LOG_SAMPLE_PERCENT=log_sample_percent,
         ),
     )
 
-    with patch_local_save_method(app, output_dir):
+    with patch_local_save_method(app, output_dir, output_format):
         if service_id:
             event = DMSEvent(
                 type="dms_event",
@@ -77,8 +146,25 @@ def migrate_handler(  # noqa: PLR0913
                 table_name="services",
             )
             app.handle_dms_event(event)
+        elif watermark_file:
+            app.handle_incremental_sync_event(
+                watermark_store=SyncWatermarkStore(watermark_file),
+                modified_since=modified_since,
+                batch_size=batch_size,
+            )
         else:
-            app.handle_full_sync_event()
+            app.handle_full_sync_event(
+                checkpoint_store=MigrationCheckpointStore(checkpoint_file)
+                if checkpoint_file
+                else None,
+                resume=resume,
+                batch_size=batch_size,
+                pipeline_config=PipelineConfig(
+                    load_workers=load_workers, queue_size=queue_size
+                )
+                if pipeline
+                else None,
+            )
 
 
 @typer_app.command("populate-queue")
@@ -93,6 +179,18 @@ def populate_queue_handler(
     status_id: Annotated[
         List[int] | None, Option(help="List of status IDs to filter services by")
     ] = None,
+    supported_only: Annotated[
+        bool, Option(help="Only queue services matching a supported transformer")
+    ] = False,
+    records_per_message: Annotated[
+        int, Option(min=1, max=100, help="Record IDs sent in each message")
+    ] = 1,
+    max_in_flight_batches: Annotated[
+        int, Option(min=1, help="Maximum message batches sent concurrently")
+    ] = 10,
+    max_retries: Annotated[
+        int, Option(min=0, help="Retries for messages which fail to send")
+    ] = 3,
 ) -> None:
     """
     Local entrypoint for populating the queue with legacy services.
@@ -103,13 +201,125 @@ def populate_queue_handler(
         SQS_QUEUE_URL=sqs_queue_url,
         type_ids=type_id,
         status_ids=status_id,
+        supported_only=supported_only,
+        records_per_message=records_per_message,
+        max_in_flight_batches=max_in_flight_batches,
+        max_retries=max_retries,
+    )
+    metrics = populate_sqs_queue(config)
+    CONSOLE.print(
+        f"Sent {metrics.sent_messages} messages, {metrics.failed_messages} failed",
+        style="bright_red" if metrics.failed_messages else "green",
+    )
+
+
+@typer_app.command("profile")
+def profile_handler(
+    db_uri: Annotated[str, Option(..., help="URI to connect to the source database")],
+    output_dir: Annotated[
+        Path, Option(..., help="Directory to save the record profiles and summary to")
+    ],
+    env: Annotated[
+        str, Option(help="Environment the profile is run against")
+    ] = "local",
+    batch_size: Annotated[
+        int, Option(min=1, help="Number of services to load and profile per page")
+    ] = 1000,
+    workers: Annotated[
+        int, Option(min=1, help="Threads profiling pages of services")
+    ] = 4,
+    queue_size: Annotated[
+        int, Option(min=1, help="Pages buffered between fetching and profiling")
+    ] = 2,
+) -> None:
+    """
+    Profile the legacy services without writing to DynamoDB.
+    Reports how many services each transformer supports, the validation issues
+    raised and any addresses which cannot be formatted.
+    """
+    profiler = DataMigrationProfiler(
+        config=DataMigrationConfig(
+            db_config=DatabaseConfig.from_uri(db_uri),
+            ENVIRONMENT=env,
+        ),
+        logger=Logger.get(service="data-migration"),
+    )
+    report = profiler.profile_all_services(
+        output_dir=output_dir,
+        batch_size=batch_size,
+        workers=workers,
+        queue_size=queue_size,
+    )
+
+    CONSOLE.print(
+        f"Profiled {report.total_records} services: "
+        f"{report.supported_records} supported, "
+        f"{report.skipped_records} skipped, "
+        f"{report.records_with_issues} with validation issues, "
+        f"{report.errors} errors"
+    )
+    for code, count in sorted(
+        report.issue_counts.items(), key=lambda item: item[1], reverse=True
+    ):
+        CONSOLE.print(f"  {code}: {count}")
+
+
+@typer_app.command("reconcile")
+def reconcile_handler(
+    db_uri: Annotated[str, Option(..., help="URI to connect to the source database")],
+    env: Annotated[str, Option(..., help="Environment to reconcile")],
+    workspace: Annotated[str | None, Option(help="Workspace to reconcile")] = None,
+    ddb_endpoint_url: Annotated[
+        str | None, Option(help="URL to connect to local DynamoDB")
+    ] = None,
+    segments: Annotated[
+        int, Option(min=1, help="Parallel scan segments for each target table")
+    ] = 4,
+    batch_size: Annotated[
+        int, Option(min=1, help="Number of services to load and transform per page")
+    ] = 1000,
+    output_file: Annotated[
+        Path | None,
+        Option(help="File to save the IDs of missing, extra and drifted records to"),
+    ] = None,
+) -> None:
+    """
+    Reconcile the target DynamoDB tables with the legacy services.
+    Reports records which are missing from the target, records in the target which
+    are not produced from the source, and records whose content has drifted.
+    """
+    reconciler = DataMigrationReconciler(
+        config=DataMigrationConfig(
+            db_config=DatabaseConfig.from_uri(db_uri),
+            ENVIRONMENT=env,
+            WORKSPACE=workspace,
+            ENDPOINT_URL=ddb_endpoint_url,
+        ),
+        logger=Logger.get(service="data-migration"),
     )
-    populate_sqs_queue(config)
+    results = reconciler.reconcile(segments=segments, batch_size=batch_size)
+
+    for result in results:
+        CONSOLE.print(
+            f"{result.table}: {result.matched} matched, {len(result.missing)} missing, "
+            f"{len(result.extra)} extra, {len(result.drifted)} drifted",
+            style="bright_red"
+            if result.missing or result.extra or result.drifted
+            else "green",
+        )
+
+    if output_file:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(
+            json.dumps([result.model_dump() for result in results], indent=2)
+        )
 
 
 @contextmanager
 def patch_local_save_method(
-    app: DataMigrationApplication, output_dir: Path | None
+    app: DataMigrationApplication,
+    output_dir: Path | None,
+    output_format: DryRunFormat = DryRunFormat.JSONL,
 ) -> Generator:
     """
     Patch the application to save transformed records to a local directory.
@@ -120,31 +330,86 @@ def patch_local_save_method(
         return
 
     output_dir.mkdir(parents=True, exist_ok=True)
-    organisation_path = output_dir / "organisation.jsonl"
-    location_path = output_dir / "location.jsonl"
-    healthcare_path = output_dir / "healthcare-service.jsonl"
-
-    organisation_file = open(organisation_path, "w")
-    location_file = open(location_path, "w")
-    healthcare_file = open(healthcare_path, "w")
+    organisation_writer, location_writer, healthcare_writer, triage_code_writer = (
+        DryRunWriter(
+            get_dry_run_path(output_dir, output, output_format),
+            output_format,
+            model_cls=model_cls,
+        )
+        for output, model_cls in DRY_RUN_MODELS.items()
+    )
+    service_writers = (organisation_writer, location_writer, healthcare_writer)
 
     def _mock_save(result: ServiceTransformOutput) -> None:
-        organisation_file.writelines(
-            org.model_dump_json() + "\n" for org in result.organisation
-        )
-        location_file.writelines(
-            loc.model_dump_json() + "\n" for loc in result.location
-        )
-        healthcare_file.writelines(
-            hc.model_dump_json() + "\n" for hc in result.healthcare_service
-        )
+        organisation_writer.write(result.organisation)
+        location_writer.write(result.location)
+        healthcare_writer.write(result.healthcare_service)
+
+    write_lock = Lock()
+
+    def _mock_save_batch(results: list[ServiceTransformOutput]) -> None:
+        with write_lock:
+            for result in results:
+                _mock_save(result)
+
+    def _mock_flush() -> None:
+        with write_lock:
+            for writer in service_writers:
+                writer.flush()
+
+    def _mock_save_triage_code(result: TriageCode) -> None:
+        _mock_save_triage_codes([result])
+
+    def _mock_save_triage_codes(results: list[TriageCode]) -> None:
+        with write_lock:
+            triage_code_writer.write(results)
 
     app.processor._save = _mock_save
-    yield
+    app.processor._save_batch = _mock_save_batch
+    app.processor._flush = _mock_flush
+    app.triage_code_processor._save_to_dynamoDB = _mock_save_triage_code
+    app.triage_code_processor._save_batch_to_dynamoDB = _mock_save_triage_codes
+    try:
+        yield
+    finally:
+        # Always close the writers, so that Parquet files are written with a footer
+        for writer in (*service_writers, triage_code_writer):
+            writer.close()
 
-    organisation_file.close()
-    location_file.close()
-    healthcare_file.close()
+
+@typer_app.command("diff-output")
+def diff_output_handler(
+    left_dir: Annotated[
+        Path, Option(..., help="Output directory of the baseline dry run")
+    ],
+    right_dir: Annotated[
+        Path, Option(..., help="Output directory of the dry run to compare")
+    ],
+    show_ids: Annotated[
+        bool, Option(help="Print the IDs of every added, removed or changed record")
+    ] = False,
+) -> None:
+    """
+    Compare the output of two dry runs of the migration.
+    Created and modified timestamps are ignored, as they differ between every run.
+    """
+    diffs = diff_dry_runs(left_dir, right_dir)
+    for diff in diffs:
+        CONSOLE.print(
+            f"{diff.output}: {len(diff.added)} added, {len(diff.removed)} removed, "
+            f"{len(diff.changed)} changed, {diff.unchanged} unchanged",
+            style="bright_red"
+            if diff.added or diff.removed or diff.changed
+            else "green",
+        )
+        if show_ids:
+            for change, ids in (
+                ("added", diff.added),
+                ("removed", diff.removed),
+                ("changed", diff.changed),
+            ):
+                for record_id in ids:
+                    CONSOLE.print(f"  {change}: {record_id}")
 
 
 @typer_app.command("export-to-s3")
@@ -153,11 +418,18 @@ def export_to_s3_handler(
     workspace: Annotated[
         str | None, Option(..., help="Workspace to run the export in")
     ] = None,
+    backup_format: Annotated[
+        BackupFormat,
+        Option(
+            "--format",
+            help="Format of the backup files: raw DynamoDB JSON or typed columns",
+        ),
+    ] = BackupFormat.RAW,
 ) -> None:
     """
     Handler for exporting data from all DynamoDB tables to S3.
     """
-    asyncio.run(run_s3_export(env, workspace))
+    asyncio.run(run_s3_export(env, workspace, backup_format))
 
 
 @typer_app.command("restore-from-s3")
@@ -166,8 +438,17 @@ def restore_from_s3_handler(
     workspace: Annotated[
         str | None, Option(..., help="Workspace to run the restore in")
     ] = None,
+    wcu_budget: Annotated[
+        int, Option(min=1, help="Write capacity units per second for each table")
+    ] = DEFAULT_WCU_BUDGET,
+    failures_file: Annotated[
+        Path, Option(help="Path to save any items that could not be restored")
+    ] = DEFAULT_FAILURES_FILE,
 ) -> None:
     """
     Handler for restoring data from S3 to all DynamoDB tables.
+    Exits with an error if any items could not be restored.
     """
-    asyncio.run(run_s3_restore(env, workspace))
+    results = asyncio.run(run_s3_restore(env, workspace, wcu_budget, failures_file))
+    if any(result.failed_items for result in results):
+        raise Exit(code=1)
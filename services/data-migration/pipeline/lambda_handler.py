@@ -10,13 +10,14 @@ LOGGER = Logger.get(service="data-migration")
 
 @event_source(data_class=SQSEvent)
 @LOGGER.inject_lambda_context
-def lambda_handler(event: SQSEvent, context: LambdaContext) -> None:
+def lambda_handler(event: SQSEvent, context: LambdaContext) -> dict:
     """
     AWS Lambda entrypoint for transforming data.
     This function will be triggered by an SQS event containing a batch of DMS events.
+    Returns the partial batch response so that only failed messages are retried.
     """
     global APP  # noqa: PLW0603
     if APP is None:
         APP = DataMigrationApplication()
 
-    APP.handle_sqs_event(event)
+    return APP.handle_sqs_event(event)
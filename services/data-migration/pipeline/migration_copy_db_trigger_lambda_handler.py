@@ -1,4 +1,6 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
 
 import boto3
 from ftrs_common.logger import Logger
@@ -8,15 +10,44 @@ from pipeline.utils.secret_utils import get_dms_workspaces
 LOGGER = Logger.get(service="migration-copy-db-trigger")
 SQS_CLIENT = boto3.client("sqs")
 
+# Maximum number of workspace queues sent to concurrently
+MAX_WORKERS = 8
+# Number of times a failed send is retried, with exponential backoff
+MAX_RETRIES = 2
+RETRY_DELAY = 0.1
+
 
 def lambda_handler(event: dict, context: dict) -> None:
-    message = get_message_from_event(event)
+    message_body = json.dumps(get_message_from_event(event))
     workspaces = get_dms_workspaces()
+    if not workspaces:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(workspaces))) as executor:
+        results = list(
+            executor.map(
+                lambda queue_url: send_message(queue_url, message_body), workspaces
+            )
+        )
+
+    failed_count = results.count(False)
+    if failed_count:
+        LOGGER.error(
+            "Failed to send message to %s of %s workspaces",
+            failed_count,
+            len(workspaces),
+        )
 
-    for workspace_queue_url in workspaces:
+
+def send_message(workspace_queue_url: str, message_body: str) -> bool:
+    """
+    Send the message to a workspace queue, retrying with exponential backoff on failure.
+    Returns True if the message was sent.
+    """
+    for attempt in range(MAX_RETRIES + 1):
         try:
             response = SQS_CLIENT.send_message(
-                QueueUrl=workspace_queue_url, MessageBody=json.dumps(message)
+                QueueUrl=workspace_queue_url, MessageBody=message_body
             )
 
             LOGGER.info(
@@ -24,10 +55,23 @@ def lambda_handler(event: dict, context: dict) -> None:
                 workspace_queue_url,
                 response.get("MessageId"),
             )
+            return True
         except Exception:
-            LOGGER.exception(
-                "Failed to send message to SQS for workspace %s", workspace_queue_url
+            if attempt == MAX_RETRIES:
+                LOGGER.exception(
+                    "Failed to send message to SQS for workspace %s",
+                    workspace_queue_url,
+                )
+                return False
+
+            LOGGER.warning(
+                "Retrying message to SQS for workspace %s (attempt %s)",
+                workspace_queue_url,
+                attempt + 1,
             )
+            sleep(RETRY_DELAY * 2**attempt)
+
+    return False
 
 
 def get_message_from_event(event: dict) -> dict:
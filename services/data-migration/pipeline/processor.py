@@ -1,20 +1,38 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
 from time import perf_counter
-from typing import Iterable
+from typing import ClassVar, Iterable, Iterator
+from zlib import crc32
 
 from ftrs_common.logger import Logger
 from ftrs_data_layer.domain import HealthcareService, Location, Organisation, legacy
 from ftrs_data_layer.logbase import DataMigrationLogBase
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, create_engine, select
 
 from pipeline.transformer import (
     SUPPORTED_TRANSFORMERS,
     ServiceTransformer,
     ServiceTransformOutput,
+    TransformerRegistry,
+    build_selection_clause,
 )
 from pipeline.utils.cache import DoSMetadataCache
-from pipeline.utils.config import DataMigrationConfig
-from pipeline.utils.dbutil import get_repository
+from pipeline.utils.checkpoint import (
+    BatchCompletionTracker,
+    MigrationCheckpoint,
+    MigrationCheckpointStore,
+    SyncWatermarkStore,
+)
+from pipeline.utils.config import DataMigrationConfig, LogVerbosity, PipelineConfig
+from pipeline.utils.dbutil import get_parent_service_ids, get_repository
+from pipeline.utils.memory import get_rss_mb
+from pipeline.utils.stage import PipelineStage, StageMetrics
+from pipeline.utils.timing import StageTiming
 from pipeline.validation.types import ValidationIssue
 
 
@@ -27,6 +45,34 @@ class DataMigrationMetrics(BaseModel):
     skipped_records: int = 0
     invalid_records: int = 0
     errors: int = 0
+    timings: dict[str, StageTiming] = Field(default_factory=dict)
+
+    _lock: ClassVar[Lock] = Lock()
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """
+        Time the enclosed block and record it against the given stage.
+        """
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, perf_counter() - start_time)
+
+    def record_time(self, stage: str, elapsed_time: float) -> None:
+        """
+        Record the time spent in a stage, in seconds.
+        """
+        with self._lock:
+            self.timings.setdefault(stage, StageTiming()).record(elapsed_time)
+
+    def timing_summary(self) -> dict[str, dict]:
+        """
+        Summarise the time spent in each stage, including latency percentiles.
+        """
+        with self._lock:
+            return {stage: timing.summary() for stage, timing in self.timings.items()}
 
     def reset(self) -> None:
         """
@@ -40,6 +86,32 @@ class DataMigrationMetrics(BaseModel):
         self.skipped_records = 0
         self.invalid_records = 0
         self.errors = 0
+        self.timings = {}
+
+
+@dataclass
+class TransformedService:
+    record_id: int
+    transformer_name: str
+    output: ServiceTransformOutput
+    start_time: float
+
+
+@dataclass
+class ServiceBatch:
+    sequence: int
+    records: list[legacy.Service]
+    start_time: float
+
+
+@dataclass
+class TransformedBatch:
+    sequence: int
+    last_record_id: int
+    record_count: int
+    start_time: float
+    services: list[TransformedService] = field(default_factory=list)
+    errors: dict[int, str] = field(default_factory=dict)
 
 
 class DataMigrationProcessor:
@@ -66,127 +138,630 @@ class DataMigrationProcessor:
         self.engine = create_engine(connection_string, echo=False)
         self.metrics = DataMigrationMetrics()
         self.metadata = DoSMetadataCache(self.engine)
+        self.transformers = TransformerRegistry(SUPPORTED_TRANSFORMERS)
+        self._metrics_lock = Lock()
+        self._last_rss_mb: float | None = None
 
-    def sync_all_services(self) -> None:
+    def sync_all_services(
+        self,
+        checkpoint_store: MigrationCheckpointStore | None = None,
+        resume: bool = False,
+        batch_size: int = 1000,
+        pipeline_config: PipelineConfig | None = None,
+    ) -> None:
         """
         Run the full sync process.
+
+        Services are read in pages ordered by ID. Each page is loaded in its own session
+        which is expunged once the page has been processed and the output flushed, so
+        memory use is bounded by the batch size rather than the size of the table.
+
+        When a checkpoint store is provided the ID of the last service in each completed
+        page is saved, and a resumed sync continues from the page after that watermark.
+        Once a record fails with an unexpected error the checkpoint is held before its
+        page, so that a resumed sync retries it.
+
+        When a pipeline config is provided, reading, transforming and saving pages run
+        concurrently as separate stages (see _sync_all_services_pipelined).
+        """
+        checkpoint = MigrationCheckpoint()
+        self._last_rss_mb = get_rss_mb()
+        if checkpoint_store and resume:
+            checkpoint = checkpoint_store.load()
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_019,
+                last_record_id=checkpoint.last_record_id,
+                processed_records=checkpoint.processed_records,
+            )
+
+        if pipeline_config:
+            completed = self._sync_all_services_pipelined(
+                checkpoint, checkpoint_store, batch_size, pipeline_config
+            )
+        else:
+            completed = self._sync_all_services_sequential(
+                checkpoint, checkpoint_store, batch_size
+            )
+
+        if checkpoint_store and completed:
+            checkpoint_store.clear()
+
+    def _sync_all_services_sequential(
+        self,
+        checkpoint: MigrationCheckpoint,
+        checkpoint_store: MigrationCheckpointStore | None,
+        batch_size: int,
+    ) -> bool:
+        """
+        Read, transform and save each page of services in turn.
+        Returns False if the checkpoint was held before a page with a failed record.
+        """
+        start_time = perf_counter()
+        synced_records = 0
+        checkpoint_held = False
+
+        for batch in self._iter_record_batches(
+            batch_size=batch_size,
+            start_after=checkpoint.last_record_id,
+            where=self._get_selection_criteria(),
+        ):
+            batch_start_time = perf_counter()
+            failed_records = [
+                record.id for record in batch if not self._process_service(record)
+            ]
+
+            self._flush()
+
+            synced_records += len(batch)
+            if failed_records and not checkpoint_held:
+                checkpoint_held = True
+                self.logger.log(
+                    DataMigrationLogBase.DM_ETL_029,
+                    last_record_id=checkpoint.last_record_id,
+                    failed_record_id=batch[-1].id,
+                )
+
+            if checkpoint_held:
+                continue
+
+            checkpoint.last_record_id = batch[-1].id
+            checkpoint.processed_records += len(batch)
+
+            if checkpoint_store:
+                checkpoint_store.save(checkpoint)
+
+            self._log_progress(
+                checkpoint,
+                synced_records=synced_records,
+                start_time=start_time,
+                batch_records=len(batch),
+                batch_start_time=batch_start_time,
+            )
+
+        return not checkpoint_held
+
+    def _sync_all_services_pipelined(
+        self,
+        checkpoint: MigrationCheckpoint,
+        checkpoint_store: MigrationCheckpointStore | None,
+        batch_size: int,
+        pipeline_config: PipelineConfig,
+    ) -> bool:
+        """
+        Run the full sync as three stages connected by bounded queues:
+
+        - fetch: pages of services are read with all relationships eagerly loaded,
+          then detached from the session (runs on the calling thread)
+        - transform: records are validated and transformed (single thread, as the work is CPU bound)
+        - load: transformed pages are written with batch upserts (pipeline_config.load_workers threads)
+
+        Pages may finish loading out of order, so the checkpoint is only advanced
+        past pages which have all been saved. Once a record in a page fails to transform
+        or save the checkpoint is held before it, so that a resumed sync retries the page.
+        Returns False if the checkpoint was held.
+        """
+        start_time = perf_counter()
+        synced_records = 0
+        checkpoint_held = False
+
+        def on_batch_complete(batch: TransformedBatch) -> None:
+            nonlocal synced_records, checkpoint_held
+            synced_records += batch.record_count
+
+            if batch.errors and not checkpoint_held:
+                checkpoint_held = True
+                self.logger.log(
+                    DataMigrationLogBase.DM_ETL_029,
+                    last_record_id=checkpoint.last_record_id,
+                    failed_record_id=batch.last_record_id,
+                )
+
+            if checkpoint_held:
+                return
+
+            checkpoint.last_record_id = batch.last_record_id
+            checkpoint.processed_records += batch.record_count
+
+            if checkpoint_store:
+                checkpoint_store.save(checkpoint)
+
+            self._log_progress(
+                checkpoint,
+                synced_records=synced_records,
+                start_time=start_time,
+                batch_records=batch.record_count,
+                batch_start_time=batch.start_time,
+                queue_depths={
+                    "transform": transform_stage.queue.qsize(),
+                    "load": load_stage.queue.qsize(),
+                },
+            )
+
+        tracker = BatchCompletionTracker[TransformedBatch](on_batch_complete)
+
+        def load(batch: TransformedBatch) -> None:
+            self._load_batch(batch)
+            self._flush()
+            # Release the transformed output, as the tracker may hold the page until
+            # the pages before it have been saved
+            batch.services = []
+            tracker.complete(batch.sequence, batch)
+
+        def transform(batch: ServiceBatch) -> None:
+            load_stage.put(self._transform_batch(batch))
+
+        load_stage = PipelineStage[TransformedBatch](
+            "load",
+            handler=load,
+            workers=pipeline_config.load_workers,
+            queue_size=pipeline_config.queue_size,
+        )
+        transform_stage = PipelineStage[ServiceBatch](
+            "transform",
+            handler=transform,
+            queue_size=pipeline_config.queue_size,
+        )
+        fetch_metrics = StageMetrics(name="fetch")
+
+        load_stage.start()
+        transform_stage.start()
+
+        fetch_start_time = perf_counter()
+        try:
+            batches = self._iter_record_batches(
+                batch_size=batch_size,
+                start_after=checkpoint.last_record_id,
+                where=self._get_selection_criteria(),
+                eager_load=True,
+            )
+            for sequence, batch in enumerate(batches):
+                fetch_metrics.busy_time += perf_counter() - fetch_start_time
+                fetch_metrics.processed_items += 1
+                transform_stage.put(ServiceBatch(sequence, batch, perf_counter()))
+                fetch_start_time = perf_counter()
+        finally:
+            fetch_metrics.elapsed_time = perf_counter() - start_time
+            transform_stage.join()
+            load_stage.join()
+
+        for metrics in (fetch_metrics, transform_stage.metrics, load_stage.metrics):
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_024,
+                stage=metrics.name,
+                items_per_second=metrics.items_per_second,
+                **metrics.model_dump(exclude={"name"}),
+            )
+
+        for stage in (transform_stage, load_stage):
+            if stage.exception:
+                raise stage.exception
+
+        return not checkpoint_held
+
+    def iter_record_batches(
+        self, batch_size: int = 1000
+    ) -> Iterable[list[legacy.Service]]:
+        """
+        Read every service, page by page, without transforming or saving it.
+        Pages are read with all relationships eagerly loaded and detached from their
+        session, so they can be processed on other threads.
+        """
+        return self._iter_record_batches(batch_size=batch_size, eager_load=True)
+
+    def iter_transformed_batches(
+        self, batch_size: int = 1000
+    ) -> Iterable[TransformedBatch]:
+        """
+        Transform every service a supported transformer may migrate, page by page,
+        without saving the output.
+        Pages are read with all relationships eagerly loaded, as in the pipelined full sync.
+        """
+        batches = self._iter_record_batches(
+            batch_size=batch_size,
+            where=self._get_selection_criteria(),
+            eager_load=True,
+        )
+        for sequence, records in enumerate(batches):
+            yield self._transform_batch(ServiceBatch(sequence, records, perf_counter()))
+
+    def _transform_batch(self, batch: ServiceBatch) -> TransformedBatch:
+        """
+        Transform a detached page of services, ready to be saved by the load stage.
+        """
+        transformed_batch = TransformedBatch(
+            sequence=batch.sequence,
+            last_record_id=batch.records[-1].id,
+            record_count=len(batch.records),
+            start_time=batch.start_time,
+        )
+
+        for service in batch.records:
+            self.logger.thread_safe_append_keys(record_id=service.id)
+            try:
+                if transformed := self._transform_service(service):
+                    transformed_batch.services.append(transformed)
+            except Exception as e:
+                self._record_error(e)
+                transformed_batch.errors[service.id] = str(e)
+            finally:
+                self.logger.thread_safe_remove_keys(["record_id"])
+
+        return transformed_batch
+
+    def _load_batch(self, batch: TransformedBatch) -> bool:
+        """
+        Save a page of transformed services to DynamoDB using batch upserts.
+        If the batch cannot be saved every record in it is counted as an error,
+        and the error is recorded against each record in the batch.
+        Returns False if the batch could not be saved.
+        """
+        if not batch.services:
+            return True
+
+        try:
+            with self.metrics.time("write"):
+                self._save_batch([transformed.output for transformed in batch.services])
+        except Exception as e:
+            with self._metrics_lock:
+                self.metrics.errors += len(batch.services)
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_025,
+                record_count=len(batch.services),
+                record_ids=[transformed.record_id for transformed in batch.services],
+                error=str(e),
+            )
+            batch.errors.update(
+                {transformed.record_id: str(e) for transformed in batch.services}
+            )
+            return False
+
+        for transformed in batch.services:
+            self.logger.thread_safe_append_keys(record_id=transformed.record_id)
+            self._record_migrated(transformed)
+            self.logger.thread_safe_remove_keys(["record_id"])
+
+        return True
+
+    def _log_progress(
+        self,
+        checkpoint: MigrationCheckpoint,
+        synced_records: int,
+        start_time: float,
+        batch_records: int,
+        batch_start_time: float,
+        **detail: dict,
+    ) -> None:
+        """
+        Log the progress of the full sync once a page of services has been completed.
+        The current RSS is reported with its change since the previous page completed,
+        so memory which is not released between pages shows up as a steady increase.
+        """
+        rss_mb = get_rss_mb()
+        rss_delta_mb = (
+            rss_mb - self._last_rss_mb
+            if rss_mb is not None and self._last_rss_mb is not None
+            else None
+        )
+        self._last_rss_mb = rss_mb
+
+        end_time = perf_counter()
+        elapsed_time = end_time - start_time
+        batch_elapsed_time = end_time - batch_start_time
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_020,
+            processed_records=checkpoint.processed_records,
+            last_record_id=checkpoint.last_record_id,
+            elapsed_time=elapsed_time,
+            records_per_second=synced_records / elapsed_time if elapsed_time else 0.0,
+            batch_records=batch_records,
+            batch_elapsed_time=batch_elapsed_time,
+            batch_records_per_second=batch_records / batch_elapsed_time
+            if batch_elapsed_time
+            else 0.0,
+            rss_mb=rss_mb,
+            rss_delta_mb=rss_delta_mb,
+            **detail,
+        )
+
+    def sync_modified_services(
+        self,
+        watermark_store: SyncWatermarkStore,
+        modified_since: datetime | None = None,
+        batch_size: int = 1000,
+    ) -> None:
         """
-        for record in self._iter_records():
-            self._process_service(record)
+        Run the incremental sync process.
 
-    def sync_service(self, record_id: int, method: str) -> None:
+        Only services modified at or after the watermark are processed. The watermark
+        is advanced to the latest modifiedtime seen, but only when the run completes
+        without errors so that failed records are picked up again by the next run.
+        """
+        watermark = watermark_store.load()
+        modified_since = modified_since or watermark.modified_since
+        if modified_since is None:
+            raise ValueError(
+                "No incremental sync watermark found; a start time must be provided"
+            )
+
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_021,
+            modified_since=modified_since.isoformat(),
+        )
+
+        errors_before = self.metrics.errors
+        latest_modified_time = modified_since
+
+        for batch in self._iter_record_batches(
+            batch_size=batch_size,
+            where=[
+                legacy.Service.modifiedtime >= modified_since,
+                *self._get_selection_criteria(),
+            ],
+        ):
+            for record in batch:
+                self._process_service(record)
+                if record.modifiedtime and record.modifiedtime > latest_modified_time:
+                    latest_modified_time = record.modifiedtime
+
+            self._flush()
+
+        error_count = self.metrics.errors - errors_before
+        if error_count:
+            self.logger.log(DataMigrationLogBase.DM_ETL_022, error_count=error_count)
+            return
+
+        watermark.modified_since = latest_modified_time
+        watermark_store.save(watermark)
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_023,
+            modified_since=latest_modified_time.isoformat(),
+        )
+
+    def sync_service(self, record_id: int, method: str) -> bool:
         """
         Run the single record sync process.
+        Returns True if the record was processed without error.
         """
         with Session(self.engine) as session:
-            record = session.get(legacy.Service, record_id)
+            with self.metrics.time("fetch"):
+                record = session.get(legacy.Service, record_id)
             if not record:
                 raise ValueError(f"Service with ID {record_id} not found")
 
-            self._process_service(record)
+            return self._process_service(record)
 
-    def _process_service(self, service: legacy.Service) -> None:
+    def sync_services(self, record_ids: list[int], method: str) -> dict[int, str]:
         """
-        Process a single record by transforming it using the appropriate transformer.
+        Run the sync process for a batch of records delivered in a single event.
+        The records are fetched in one query and saved using batch writes.
+        Returns the error for each record which could not be synced, including any
+        records which were not found. An empty dict means every record was synced.
+        """
+        failed_records = {}
+
+        with Session(self.engine) as session:
+            with self.metrics.time("fetch"):
+                records = session.exec(
+                    select(legacy.Service)
+                    .where(legacy.Service.id.in_(record_ids))
+                    .options(*self._get_eager_load_options())
+                    .order_by(legacy.Service.id)
+                ).all()
+
+            if records:
+                batch = self._transform_batch(
+                    ServiceBatch(sequence=0, records=records, start_time=perf_counter())
+                )
+                self._load_batch(batch)
+                failed_records.update(batch.errors)
+
+        for record_id in sorted(set(record_ids) - {record.id for record in records}):
+            failed_records[record_id] = f"Service with ID {record_id} not found"
+
+        return failed_records
+
+    def resolve_service_ids(self, table_name: str, record_ids: list[int]) -> list[int]:
         """
+        Get the IDs of the services which changed child table records belong to.
+        """
+        with self.metrics.time("fetch"):
+            return get_parent_service_ids(self.engine, table_name, record_ids)
 
+    def _process_service(self, service: legacy.Service) -> bool:
+        """
+        Process a single record by transforming it using the appropriate transformer.
+        Returns False if an unexpected error occurred whilst processing the record.
+        Unsupported, skipped and invalid records are considered successfully processed.
+        """
         self.logger.append_keys(record_id=service.id)
-        self.logger.log(
-            DataMigrationLogBase.DM_ETL_001,
-            record=service.model_dump(exclude_none=True, mode="json", warnings=False),
-        )
 
         try:
-            start_time = perf_counter()
-            self.metrics.total_records += 1
+            transformed = self._transform_service(service)
+            if transformed is None:
+                return True
 
-            transformer = self.get_transformer(service)
-            if not transformer:
-                self.metrics.unsupported_records += 1
-                self.logger.log(
-                    DataMigrationLogBase.DM_ETL_004,
-                    reason="No suitable transformer found",
-                )
-                return
+            with self.metrics.time("write"):
+                self._save(transformed.output)
+            self._record_migrated(transformed)
+            return True
 
-            self.metrics.supported_records += 1
-            should_include, reason = transformer.should_include_service(service)
-            if not should_include:
-                self.metrics.skipped_records += 1
-                self.logger.log(DataMigrationLogBase.DM_ETL_005, reason=reason)
-                return
+        except Exception as e:
+            self._record_error(e)
+            return False
 
-            validation_result = transformer.validator.validate(service)
-            if not validation_result.is_valid:
-                issues = [
-                    issue.model_dump(mode="json") for issue in validation_result.issues
-                ]
-                self.logger.log(
-                    DataMigrationLogBase.DM_ETL_013,
-                    record_id=service.id,
-                    issue_count=len(issues),
-                    issues=issues,
-                )
+        finally:
+            self.logger.remove_keys(["record_id"])
 
-            if not validation_result.should_continue:
-                self.metrics.invalid_records += 1
-                self.logger.log(
-                    DataMigrationLogBase.DM_ETL_014,
-                    record_id=service.id,
-                )
-                return
+    def _transform_service(self, service: legacy.Service) -> TransformedService | None:
+        """
+        Select a transformer for the record, then validate and transform it.
+        Returns None if the record is unsupported, skipped or invalid.
+        """
+        start_time = perf_counter()
+        log_record_detail = self._should_log_record_detail(service)
 
-            issues = self._convert_validation_issues(validation_result.issues)
-            result = transformer.transform(validation_result.sanitised, issues)
-            self.metrics.transformed_records += 1
+        if self._is_logged(DataMigrationLogBase.DM_ETL_001):
+            with self.metrics.time("serialise"):
+                detail = {}
+                if log_record_detail:
+                    detail["record"] = service.model_dump(
+                        exclude_none=True, mode="json", warnings=False
+                    )
+                self.logger.log(DataMigrationLogBase.DM_ETL_001, **detail)
 
+        self.metrics.total_records += 1
+
+        with self.metrics.time("select"):
+            transformer = self.get_transformer(service)
+        if not transformer:
+            self.metrics.unsupported_records += 1
             self.logger.log(
-                DataMigrationLogBase.DM_ETL_006,
-                transformer_name=transformer.__class__.__name__,
-                original_record=service.model_dump(
-                    exclude_none=True, mode="json", warnings=False
-                ),
-                transformed_record=result.model_dump(
-                    exclude_none=True, mode="json", warnings=False
-                ),
+                DataMigrationLogBase.DM_ETL_004,
+                reason="No suitable transformer found",
             )
+            return None
 
-            self._save(result)
-            self.metrics.migrated_records += 1
+        self.metrics.supported_records += 1
+        should_include, reason = transformer.should_include_service(service)
+        if not should_include:
+            self.metrics.skipped_records += 1
+            self.logger.log(DataMigrationLogBase.DM_ETL_005, reason=reason)
+            return None
 
-            elapsed_time = perf_counter() - start_time
+        with self.metrics.time("validate"):
+            validation_result = transformer.validator.validate(service)
+        if not validation_result.is_valid:
+            issues = [
+                issue.model_dump(mode="json") for issue in validation_result.issues
+            ]
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_013,
+                record_id=service.id,
+                issue_count=len(issues),
+                issues=issues,
+            )
 
+        if not validation_result.should_continue:
+            self.metrics.invalid_records += 1
             self.logger.log(
-                DataMigrationLogBase.DM_ETL_007,
-                elapsed_time=elapsed_time,
-                transformer_name=transformer.__class__.__name__,
-                healthcare_service_count=len(result.healthcare_service),
-                location_count=len(result.location),
-                organisation_count=len(result.organisation),
-                healthcare_service_ids=[hs.id for hs in result.healthcare_service],
-                location_ids=[loc.id for loc in result.location],
-                organisation_ids=[org.id for org in result.organisation],
+                DataMigrationLogBase.DM_ETL_014,
+                record_id=service.id,
             )
+            return None
 
-        except Exception as e:
+        with self.metrics.time("transform"):
+            issues = self._convert_validation_issues(validation_result.issues)
+            result = transformer.transform(validation_result.sanitised, issues)
+        self.metrics.transformed_records += 1
+
+        if self._is_logged(DataMigrationLogBase.DM_ETL_006):
+            with self.metrics.time("serialise"):
+                detail = {}
+                if log_record_detail:
+                    detail["original_record"] = service.model_dump(
+                        exclude_none=True, mode="json", warnings=False
+                    )
+                    detail["transformed_record"] = result.model_dump(
+                        exclude_none=True, mode="json", warnings=False
+                    )
+                self.logger.log(
+                    DataMigrationLogBase.DM_ETL_006,
+                    transformer_name=transformer.__class__.__name__,
+                    **detail,
+                )
+
+        return TransformedService(
+            record_id=service.id,
+            transformer_name=transformer.__class__.__name__,
+            output=result,
+            start_time=start_time,
+        )
+
+    def _is_logged(self, log_reference: DataMigrationLogBase) -> bool:
+        """
+        Check whether the logger will emit the log reference at its current level,
+        so that expensive log details are not built for messages that would be dropped.
+        """
+        return log_reference.value.level >= self.logger.log_level
+
+    def _should_log_record_detail(self, service: legacy.Service) -> bool:
+        """
+        Check whether the full source and transformed records should be logged for the service.
+        Sampling is deterministic on the service ID, so every log for a sampled record
+        includes its detail and the same records are sampled on every run.
+        """
+        match self.config.log_verbosity:
+            case LogVerbosity.FULL:
+                return True
+            case LogVerbosity.SAMPLED:
+                bucket = crc32(str(service.id).encode()) % 10000
+                return bucket < self.config.log_sample_percent * 100
+
+        return False
+
+    def _record_migrated(self, transformed: TransformedService) -> None:
+        """
+        Record that a transformed service has been saved.
+        """
+        with self._metrics_lock:
+            self.metrics.migrated_records += 1
+
+        result = transformed.output
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_007,
+            elapsed_time=perf_counter() - transformed.start_time,
+            transformer_name=transformed.transformer_name,
+            healthcare_service_count=len(result.healthcare_service),
+            location_count=len(result.location),
+            organisation_count=len(result.organisation),
+            healthcare_service_ids=[hs.id for hs in result.healthcare_service],
+            location_ids=[loc.id for loc in result.location],
+            organisation_ids=[org.id for org in result.organisation],
+        )
+
+    def _record_error(self, error: Exception) -> None:
+        """
+        Record an unexpected error whilst processing a service.
+        """
+        with self._metrics_lock:
             self.metrics.errors += 1
-            self.logger.exception(
-                "Unexpected error encountered whilst processing service record"
-            )
-            self.logger.log(DataMigrationLogBase.DM_ETL_008, error=str(e))
-            return
 
-        finally:
-            self.logger.remove_keys(["record_id"])
+        self.logger.exception(
+            "Unexpected error encountered whilst processing service record"
+        )
+        self.logger.log(DataMigrationLogBase.DM_ETL_008, error=str(error))
 
     def get_transformer(self, service: legacy.Service) -> ServiceTransformer | None:
         """
         Get the appropriate transformer for the service.
+        Only transformers registered for the service type are checked.
         """
-        for TransformerClass in SUPPORTED_TRANSFORMERS:
+        for TransformerClass in self.transformers.get_candidates(service.typeid):
+            metrics = self.transformers.get_metrics(TransformerClass)
             is_supported, reason = TransformerClass.is_service_supported(service)
 
             if not is_supported:
+                metrics.rejected += 1
                 self.logger.log(
                     DataMigrationLogBase.DM_ETL_002,
                     transformer_name=TransformerClass.__name__,
@@ -194,19 +769,80 @@ class DataMigrationProcessor:
                 )
                 continue
 
+            metrics.selected += 1
             self.logger.log(
                 DataMigrationLogBase.DM_ETL_003,
                 transformer_name=TransformerClass.__name__,
             )
-            return TransformerClass(logger=self.logger, metadata=self.metadata)
+            return self.transformers.get_instance(
+                TransformerClass, logger=self.logger, metadata=self.metadata
+            )
 
-    def _iter_records(self, batch_size: int = 1000) -> Iterable[legacy.Service]:
+    def _get_selection_criteria(self) -> list[ColumnElement[bool]]:
         """
-        Iterate over records in the database.
+        Get the SQL predicates selecting services which a supported transformer may migrate.
+        Services which cannot match any transformer are not loaded from the database.
         """
-        stmt = select(legacy.Service).execution_options(yield_per=batch_size)
-        with Session(self.engine) as session:
-            yield from session.scalars(stmt)
+        clause = build_selection_clause(SUPPORTED_TRANSFORMERS)
+        return [clause] if clause is not None else []
+
+    def _iter_record_batches(
+        self,
+        batch_size: int = 1000,
+        start_after: int | None = None,
+        where: list[ColumnElement[bool]] | None = None,
+        eager_load: bool = False,
+    ) -> Iterable[list[legacy.Service]]:
+        """
+        Iterate over pages of services using keyset pagination on the service ID.
+        Each page is read in its own session, which remains open while the page
+        is processed so that relationships can be lazy loaded.
+
+        With eager_load, every relationship is loaded up front and the page is detached
+        before it is yielded, so it can be processed outside the session.
+        """
+        last_id = start_after
+
+        while True:
+            stmt = select(legacy.Service).order_by(legacy.Service.id).limit(batch_size)
+            if where:
+                stmt = stmt.where(*where)
+            if last_id is not None:
+                stmt = stmt.where(legacy.Service.id > last_id)
+            if eager_load:
+                stmt = stmt.options(*self._get_eager_load_options())
+
+            with Session(self.engine) as session:
+                with self.metrics.time("fetch"):
+                    batch = list(session.scalars(stmt))
+                if not batch:
+                    return
+
+                if eager_load:
+                    session.expunge_all()
+
+                yield batch
+
+                last_id = batch[-1].id
+                # Detach the page and any lazy loaded relationships before the next page is read
+                session.expunge_all()
+
+    def _get_eager_load_options(self) -> list:
+        """
+        Loader options which load every relationship used by the transformers.
+        """
+        return [
+            selectinload(legacy.Service.endpoints),
+            selectinload(legacy.Service.scheduled_opening_times).selectinload(
+                legacy.ServiceDayOpening.times
+            ),
+            selectinload(legacy.Service.specified_opening_times).selectinload(
+                legacy.ServiceSpecifiedOpeningDate.times
+            ),
+            selectinload(legacy.Service.sgsds),
+            selectinload(legacy.Service.dispositions),
+            selectinload(legacy.Service.age_range),
+        ]
 
     def _save(self, result: ServiceTransformOutput) -> None:
         """
@@ -229,6 +865,36 @@ class DataMigrationProcessor:
         for hc in result.healthcare_service:
             service_repo.upsert(hc)
 
+    def _save_batch(self, results: list[ServiceTransformOutput]) -> None:
+        """
+        Save a batch of transformed results to DynamoDB using batch writes.
+        """
+        org_repo = get_repository(
+            self.config, "organisation", Organisation, self.logger
+        )
+        location_repo = get_repository(self.config, "location", Location, self.logger)
+        service_repo = get_repository(
+            self.config, "healthcare-service", HealthcareService, self.logger
+        )
+
+        org_repo.batch_upsert(
+            [org for result in results for org in result.organisation]
+        )
+        location_repo.batch_upsert(
+            [loc for result in results for loc in result.location]
+        )
+        service_repo.batch_upsert(
+            [hc for result in results for hc in result.healthcare_service]
+        )
+
+    def _flush(self) -> None:
+        """
+        Flush any buffered output once a page of services has been saved, before the
+        checkpoint is advanced past it. Called after every page in both sync modes.
+        Records are written to DynamoDB as they are saved, so there is nothing to flush
+        by default; the --output-dir dry run overrides this to flush its writers.
+        """
+
     def _convert_validation_issues(self, issues: list[ValidationIssue]) -> list[str]:
         """
         Convert validation issues to a list of strings.
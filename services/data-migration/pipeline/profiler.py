@@ -0,0 +1,281 @@
+from collections import defaultdict
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ftrs_common.logger import Logger
+from ftrs_data_layer.domain import legacy
+from ftrs_data_layer.logbase import DataMigrationLogBase
+from pydantic import BaseModel, Field
+
+from pipeline.processor import DataMigrationProcessor
+from pipeline.transformer import ServiceTransformer
+from pipeline.utils.address_formatter import format_address
+from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.stage import PipelineStage, StageMetrics
+
+RECORDS_FILE = "records.parquet"
+SUMMARY_FILE = "summary.json"
+
+RECORD_SCHEMA = pa.schema(
+    [
+        ("record_id", pa.int64()),
+        ("type_id", pa.int64()),
+        ("status_id", pa.int64()),
+        ("transformer_name", pa.string()),
+        ("rejection_reasons", pa.list_(pa.string())),
+        ("skip_reason", pa.string()),
+        ("is_valid", pa.bool_()),
+        ("should_continue", pa.bool_()),
+        ("issue_codes", pa.list_(pa.string())),
+        ("address_issue", pa.string()),
+        ("error", pa.string()),
+    ]
+)
+
+
+class RecordProfile(BaseModel):
+    record_id: int
+    type_id: int | None = None
+    status_id: int | None = None
+    transformer_name: str | None = None
+    rejection_reasons: list[str] = Field(default_factory=list)
+    skip_reason: str | None = None
+    is_valid: bool | None = None
+    should_continue: bool | None = None
+    issue_codes: list[str] = Field(default_factory=list)
+    address_issue: str | None = None
+    error: str | None = None
+
+
+class ProfileReport(BaseModel):
+    total_records: int = 0
+    supported_records: int = 0
+    unsupported_records: int = 0
+    skipped_records: int = 0
+    invalid_records: int = 0
+    records_with_issues: int = 0
+    errors: int = 0
+    transformers: dict[str, int] = Field(default_factory=dict)
+    rejection_reasons: dict[str, int] = Field(default_factory=dict)
+    skip_reasons: dict[str, int] = Field(default_factory=dict)
+    issue_counts: dict[str, int] = Field(default_factory=dict)
+    address_issues: dict[str, int] = Field(default_factory=dict)
+    stages: list[StageMetrics] = Field(default_factory=list)
+    timings: dict[str, dict] = Field(default_factory=dict)
+
+    def add(self, profile: RecordProfile) -> None:
+        """
+        Aggregate the profile of a single record into the report.
+        """
+        self.total_records += 1
+        self.errors += profile.error is not None
+        self.records_with_issues += bool(profile.issue_codes)
+        self.invalid_records += profile.should_continue is False
+
+        if profile.transformer_name is None:
+            self.unsupported_records += 1
+        else:
+            self.supported_records += 1
+            self._increment(self.transformers, profile.transformer_name)
+
+        if profile.skip_reason is not None:
+            self.skipped_records += 1
+            self._increment(self.skip_reasons, profile.skip_reason)
+
+        if profile.address_issue is not None:
+            self._increment(self.address_issues, profile.address_issue)
+
+        for reason in profile.rejection_reasons:
+            self._increment(self.rejection_reasons, reason)
+
+        for code in profile.issue_codes:
+            self._increment(self.issue_counts, code)
+
+    @staticmethod
+    def _increment(counts: dict[str, int], key: str) -> None:
+        counts[key] = counts.get(key, 0) + 1
+
+
+class DataMigrationProfiler:
+    """
+    Profiles the legacy services table without writing to DynamoDB.
+
+    Services are read in pages with their child tables eagerly loaded, and each page
+    is run through transformer selection, validation and address formatting by a
+    pool of worker threads. Issue counts are aggregated into a report, and the
+    profile of every record is written to a Parquet file for further analysis.
+    """
+
+    def __init__(self, config: DataMigrationConfig, logger: Logger) -> None:
+        self.logger = logger
+        self.processor = DataMigrationProcessor(config=config, logger=logger)
+        self.metrics = self.processor.metrics
+        self.transformers = self.processor.transformers
+        self.report = ProfileReport()
+        self._lock = Lock()
+
+    def profile_all_services(
+        self,
+        output_dir: Path,
+        batch_size: int = 1000,
+        workers: int = 4,
+        queue_size: int = 2,
+    ) -> ProfileReport:
+        """
+        Profile every service, writing the record profiles and summary report to output_dir.
+
+        Pages are fetched on the calling thread and profiled by the worker threads,
+        with the queue between them bounding the number of pages held in memory.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        start_time = perf_counter()
+
+        with pq.ParquetWriter(output_dir / RECORDS_FILE, RECORD_SCHEMA) as writer:
+
+            def profile(batch: list[legacy.Service]) -> None:
+                profiles = self._profile_batch(batch)
+                table = pa.Table.from_pylist(
+                    [profile.model_dump() for profile in profiles],
+                    schema=RECORD_SCHEMA,
+                )
+                with self._lock:
+                    for record_profile in profiles:
+                        self.report.add(record_profile)
+                    with self.metrics.time("write"):
+                        writer.write_table(table)
+
+            profile_stage = PipelineStage[list[legacy.Service]](
+                "profile",
+                handler=profile,
+                workers=workers,
+                queue_size=queue_size,
+            )
+            fetch_metrics = StageMetrics(name="fetch")
+
+            profile_stage.start()
+            fetch_start_time = perf_counter()
+            try:
+                for batch in self.processor.iter_record_batches(batch_size=batch_size):
+                    fetch_metrics.busy_time += perf_counter() - fetch_start_time
+                    fetch_metrics.processed_items += 1
+                    profile_stage.put(batch)
+                    fetch_start_time = perf_counter()
+            finally:
+                fetch_metrics.elapsed_time = perf_counter() - start_time
+                profile_stage.join()
+
+        self.report.stages = [fetch_metrics, profile_stage.metrics]
+        self.report.timings = self.metrics.timing_summary()
+        (output_dir / SUMMARY_FILE).write_text(self.report.model_dump_json(indent=2))
+
+        for metrics in self.report.stages:
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_024,
+                stage=metrics.name,
+                items_per_second=metrics.items_per_second,
+                **metrics.model_dump(exclude={"name"}),
+            )
+
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_026,
+            total_records=self.report.total_records,
+            supported_records=self.report.supported_records,
+            records_with_issues=self.report.records_with_issues,
+            issue_counts=self.report.issue_counts,
+        )
+
+        if profile_stage.exception:
+            raise profile_stage.exception
+
+        return self.report
+
+    def _profile_batch(self, batch: list[legacy.Service]) -> list[RecordProfile]:
+        """
+        Profile a detached page of services.
+        Records are grouped by the selected transformer so that each group can be
+        validated column-wise in a single call to its validator.
+        """
+        profiles: dict[int, RecordProfile] = {}
+        groups: dict[ServiceTransformer, list[legacy.Service]] = defaultdict(list)
+
+        for service in batch:
+            profile = profiles[service.id] = RecordProfile(
+                record_id=service.id,
+                type_id=service.typeid,
+                status_id=service.statusid,
+            )
+            try:
+                with self.metrics.time("select"):
+                    transformer = self._select_transformer(service, profile)
+                if transformer:
+                    groups[transformer].append(service)
+
+                with self.metrics.time("address"):
+                    profile.address_issue = self._check_address(service)
+            except Exception as e:
+                profile.error = str(e)
+
+        for transformer, services in groups.items():
+            try:
+                with self.metrics.time("validate"):
+                    results = transformer.validator.validate_many(services)
+            except Exception as e:
+                for service in services:
+                    profiles[service.id].error = str(e)
+                continue
+
+            for result in results:
+                profile = profiles[result.origin_record_id]
+                profile.is_valid = result.is_valid
+                profile.should_continue = result.should_continue
+                profile.issue_codes = [issue.code for issue in result.issues]
+
+        return list(profiles.values())
+
+    def _select_transformer(
+        self, service: legacy.Service, profile: RecordProfile
+    ) -> ServiceTransformer | None:
+        """
+        Select the transformer for the service, recording why each candidate was rejected.
+        Returns None if the service is unsupported or would be skipped by the transformer.
+        """
+        for transformer_cls in self.transformers.get_candidates(service.typeid):
+            is_supported, reason = transformer_cls.is_service_supported(service)
+            if not is_supported:
+                profile.rejection_reasons.append(reason)
+                continue
+
+            profile.transformer_name = transformer_cls.__name__
+            transformer = self.transformers.get_instance(
+                transformer_cls,
+                logger=self.logger,
+                metadata=self.processor.metadata,
+            )
+            should_include, reason = transformer.should_include_service(service)
+            if not should_include:
+                profile.skip_reason = reason
+                return None
+
+            return transformer
+
+        return None
+
+    def _check_address(self, service: legacy.Service) -> str | None:
+        """
+        Run the address formatter over the service address.
+        Returns a code describing why the address could not be fully formatted, if any.
+        """
+        if not service.address or service.address == "Not Available":
+            return "address_missing"
+
+        address = format_address(service.address, service.town, service.postcode)
+        if not address.line1:
+            return "address_lines_missing"
+
+        if not address.postcode:
+            return "postcode_missing"
+
+        return None
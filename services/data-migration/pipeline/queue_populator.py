@@ -1,19 +1,24 @@
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from itertools import batched
-from typing import Iterable
+from time import sleep
+from typing import Iterable, Iterator
 
 import boto3
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.exceptions import BotoCoreError, ClientError
 from ftrs_common.logger import Logger
 from ftrs_data_layer.domain.legacy import Service
 from ftrs_data_layer.logbase import DataMigrationLogBase
 from pydantic import BaseModel
 from sqlmodel import Session, create_engine, select
 
-from pipeline.application import DMSEvent
+from pipeline.application import DMSBatchEvent, DMSEvent
+from pipeline.transformer import SUPPORTED_TRANSFORMERS, build_selection_clause
 from pipeline.utils.config import DatabaseConfig, QueuePopulatorConfig
 
 SQS_BATCH_SIZE_LIMIT = 10
+ID_FETCH_SIZE = 1000
+RETRY_DELAY = 0.5
 LOGGER = Logger.get(service="data-migration-queue-populator")
 SQS_CLIENT = boto3.client("sqs")
 
@@ -21,11 +26,24 @@ SQS_CLIENT = boto3.client("sqs")
 class QueuePopulatorEvent(BaseModel):
     type_ids: list[int] | None = None
     status_ids: list[int] | None = None
+    supported_only: bool = False
+    records_per_message: int = 1
 
 
-def get_record_ids(config: QueuePopulatorConfig) -> Iterable[int]:
+class QueuePopulatorMetrics(BaseModel):
+    sent_messages: int = 0
+    failed_messages: int = 0
+
+    def add(self, other: "QueuePopulatorMetrics") -> None:
+        self.sent_messages += other.sent_messages
+        self.failed_messages += other.failed_messages
+
+
+def get_record_ids(config: QueuePopulatorConfig) -> Iterator[int]:
     """
-    Retrieve record IDs based on the provided type and status IDs.
+    Stream record IDs based on the provided type and status IDs.
+    IDs are fetched through a server-side cursor, so memory use does not grow
+    with the number of matching services.
     """
     engine = create_engine(config.db_config.connection_string)
 
@@ -37,99 +55,201 @@ def get_record_ids(config: QueuePopulatorConfig) -> Iterable[int]:
         if config.status_ids is not None:
             stmt = stmt.where(Service.statusid.in_(config.status_ids))
 
-        return session.exec(stmt).all()
+        if (
+            config.supported_only
+            and (selection_clause := build_selection_clause(SUPPORTED_TRANSFORMERS))
+            is not None
+        ):
+            stmt = stmt.where(selection_clause)
+
+        yield from session.exec(stmt.execution_options(yield_per=ID_FETCH_SIZE))
 
 
 def get_dms_event_batches(config: QueuePopulatorConfig) -> Iterable[list[dict]]:
     """
     Populate the queue with legacy services based on type and status IDs.
+    When `records_per_message` is greater than one, each message is a DMSBatchEvent
+    carrying up to that many record IDs.
     """
-    record_ids = get_record_ids(config)
+    record_id_groups = batched(get_record_ids(config), config.records_per_message)
 
-    LOGGER.log(
-        DataMigrationLogBase.DM_QP_001,
-        count=len(record_ids),
-        queue_url=config.sqs_queue_url,
-    )
-
-    for batch in batched(record_ids, SQS_BATCH_SIZE_LIMIT):
+    for batch in batched(record_id_groups, SQS_BATCH_SIZE_LIMIT):
         sqs_messages = [
-            {
-                "Id": str(record_id),
-                "MessageBody": DMSEvent(
-                    type="dms_event",
-                    record_id=record_id,
-                    table_name="services",
-                    method="insert",
-                ).model_dump_json(),
-            }
-            for record_id in batch
+            build_sqs_message(record_ids, config.records_per_message)
+            for record_ids in batch
         ]
 
         yield {"QueueUrl": config.sqs_queue_url, "Entries": sqs_messages}
 
 
-def send_message_batch(batch: dict) -> None:
+def build_sqs_message(record_ids: tuple[int, ...], records_per_message: int) -> dict:
+    """
+    Build the SQS message for a group of record IDs.
+    """
+    if records_per_message == 1:
+        return {
+            "Id": str(record_ids[0]),
+            "MessageBody": DMSEvent(
+                type="dms_event",
+                record_id=record_ids[0],
+                table_name="services",
+                method="insert",
+            ).model_dump_json(),
+        }
+
+    return {
+        "Id": f"{record_ids[0]}-{record_ids[-1]}",
+        "MessageBody": DMSBatchEvent(
+            type="dms_batch_event",
+            record_ids=record_ids,
+            table_name="services",
+            method="insert",
+        ).model_dump_json(),
+    }
+
+
+def send_message_batch(
+    batch: dict, max_retries: int = 3, retry_delay: float = RETRY_DELAY
+) -> QueuePopulatorMetrics:
     """
     Send a batch of messages to the SQS queue.
+    Messages which fail for reasons other than a sender fault are retried with
+    exponential backoff, and any still failing are logged and counted as failed.
     """
-    LOGGER.log(
-        DataMigrationLogBase.DM_QP_002,
-        count=len(batch["Entries"]),
-        queue_url=batch["QueueUrl"],
-    )
+    queue_url = batch["QueueUrl"]
+    pending = batch["Entries"]
+    metrics = QueuePopulatorMetrics()
+    failed = []
+
+    for attempt in range(max_retries + 1):
+        if attempt > 0:
+            delay = retry_delay * 2 ** (attempt - 1)
+            LOGGER.log(
+                DataMigrationLogBase.DM_QP_005,
+                count=len(pending),
+                delay=delay,
+                attempt=attempt,
+                queue_url=queue_url,
+            )
+            sleep(delay)
 
-    response = SQS_CLIENT.send_message_batch(
-        QueueUrl=batch["QueueUrl"],
-        Entries=batch["Entries"],
-    )
+        LOGGER.log(
+            DataMigrationLogBase.DM_QP_002,
+            count=len(pending),
+            queue_url=queue_url,
+        )
+
+        try:
+            response = SQS_CLIENT.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=pending,
+            )
+        except (BotoCoreError, ClientError) as e:
+            response = {
+                "Failed": [
+                    {"Id": entry["Id"], "SenderFault": False, "Message": str(e)}
+                    for entry in pending
+                ]
+            }
 
-    if failed := response.get("Failed"):
+        if successful := response.get("Successful"):
+            LOGGER.log(
+                DataMigrationLogBase.DM_QP_004,
+                count=len(successful),
+                record_ids=[entry["Id"] for entry in successful],
+                queue_url=queue_url,
+            )
+            metrics.sent_messages += len(successful)
+
+        retryable = []
+        for entry in response.get("Failed", []):
+            (failed if entry.get("SenderFault") else retryable).append(entry)
+
+        retry_ids = {entry["Id"] for entry in retryable}
+        pending = [entry for entry in pending if entry["Id"] in retry_ids]
+        if not pending:
+            break
+    else:
+        failed.extend(retryable)
+
+    if failed:
         LOGGER.log(
             DataMigrationLogBase.DM_QP_003,
             count=len(failed),
-            queue_url=batch["QueueUrl"],
+            queue_url=queue_url,
             failed=failed,
         )
+        metrics.failed_messages += len(failed)
 
-    if successful := response.get("Successful"):
-        LOGGER.log(
-            DataMigrationLogBase.DM_QP_004,
-            count=len(successful),
-            record_ids=[entry["Id"] for entry in successful],
-            queue_url=batch["QueueUrl"],
-        )
+    return metrics
 
 
-def populate_sqs_queue(config: QueuePopulatorConfig) -> None:
+def populate_sqs_queue(config: QueuePopulatorConfig) -> QueuePopulatorMetrics:
     """
     Populate the SQS queue with DMS events for legacy services.
+    At most `max_in_flight_batches` batches are sent at once, so reading IDs from
+    the database is paused while the queue catches up.
     """
     LOGGER.log(
         DataMigrationLogBase.DM_QP_000,
         type_ids=config.type_ids,
         status_ids=config.status_ids,
+        supported_only=config.supported_only,
+    )
+    LOGGER.log(
+        DataMigrationLogBase.DM_QP_001,
+        queue_url=config.sqs_queue_url,
+        max_in_flight_batches=config.max_in_flight_batches,
     )
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        executor.map(
-            send_message_batch,
-            get_dms_event_batches(config),
-        )
+    metrics = QueuePopulatorMetrics()
+    in_flight: dict[Future, dict] = {}
+
+    def collect(futures: Iterable[Future]) -> None:
+        for future in futures:
+            batch = in_flight.pop(future)
+            try:
+                metrics.add(future.result())
+            except Exception as e:
+                LOGGER.log(
+                    DataMigrationLogBase.DM_QP_006,
+                    count=len(batch["Entries"]),
+                    error=str(e),
+                    queue_url=batch["QueueUrl"],
+                )
+                metrics.failed_messages += len(batch["Entries"])
+
+    with ThreadPoolExecutor(max_workers=config.max_in_flight_batches) as executor:
+        for batch in get_dms_event_batches(config):
+            if len(in_flight) >= config.max_in_flight_batches:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            future = executor.submit(
+                send_message_batch, batch, max_retries=config.max_retries
+            )
+            in_flight[future] = batch
+
+        collect(list(in_flight))
 
-    LOGGER.log(DataMigrationLogBase.DM_QP_999)
+    LOGGER.log(DataMigrationLogBase.DM_QP_999, **metrics.model_dump())
+    return metrics
 
 
 @LOGGER.inject_lambda_context
-def lambda_handler(event: dict, context: LambdaContext) -> None:
+def lambda_handler(event: dict, context: LambdaContext) -> dict:
     """
     AWS Lambda entrypoint for populating the queue with legacy services.
+    Returns the number of messages sent and failed.
     """
     parsed_event = QueuePopulatorEvent(**event)
-    populate_sqs_queue(
+    metrics = populate_sqs_queue(
         config=QueuePopulatorConfig(
             db_config=DatabaseConfig.from_secretsmanager(),
             type_ids=parsed_event.type_ids,
             status_ids=parsed_event.status_ids,
+            supported_only=parsed_event.supported_only,
+            records_per_message=parsed_event.records_per_message,
         )
     )
+    return metrics.model_dump()
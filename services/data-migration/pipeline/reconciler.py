@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from ftrs_common.logger import Logger
+from ftrs_data_layer.domain import HealthcareService, Location, Organisation
+from ftrs_data_layer.logbase import DataMigrationLogBase
+from pydantic import BaseModel, Field
+
+from pipeline.processor import DataMigrationProcessor
+from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.dbutil import get_repository
+from pipeline.utils.digest import get_record_digest
+
+# Target tables populated by the service migration, and the output each is loaded from
+RECONCILED_TABLES: dict[str, tuple[str, type[BaseModel]]] = {
+    "organisation": ("organisation", Organisation),
+    "location": ("location", Location),
+    "healthcare-service": ("healthcare_service", HealthcareService),
+}
+
+
+class TableReconciliation(BaseModel):
+    table: str
+    source_records: int = 0
+    target_records: int = 0
+    matched: int = 0
+    missing: list[str] = Field(default_factory=list)
+    extra: list[str] = Field(default_factory=list)
+    drifted: list[str] = Field(default_factory=list)
+
+
+class DataMigrationReconciler:
+    """
+    Compares the records the migration would produce from the legacy services
+    with the records held in the target DynamoDB tables.
+
+    The source is transformed in pages, without being saved, and a digest of each
+    expected record is kept by ID. Each target table is then read using a parallel
+    segmented scan, and each item is matched to the expected record by ID and digest.
+    Created and modified timestamps are excluded from the digests.
+    """
+
+    def __init__(self, config: DataMigrationConfig, logger: Logger) -> None:
+        self.config = config
+        self.logger = logger
+        self.processor = DataMigrationProcessor(config=config, logger=logger)
+        self.metrics = self.processor.metrics
+        self._lock = Lock()
+
+    def reconcile(
+        self, segments: int = 4, batch_size: int = 1000
+    ) -> list[TableReconciliation]:
+        """
+        Reconcile every target table with the legacy services.
+        """
+        expected = self._get_expected_digests(batch_size)
+
+        results = []
+        for table, (_, model_cls) in RECONCILED_TABLES.items():
+            result = self._reconcile_table(table, model_cls, expected[table], segments)
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_027,
+                table=table,
+                source_records=result.source_records,
+                target_records=result.target_records,
+                matched=result.matched,
+                missing=len(result.missing),
+                extra=len(result.extra),
+                drifted=len(result.drifted),
+            )
+            results.append(result)
+
+        return results
+
+    def _get_expected_digests(self, batch_size: int) -> dict[str, dict[str, bytes]]:
+        """
+        Transform every supported legacy service and get a digest of each expected
+        record, keyed by target table and record ID.
+        Record IDs are deterministic, so they match those of previously migrated records.
+        """
+        expected: dict[str, dict[str, bytes]] = {
+            table: {} for table in RECONCILED_TABLES
+        }
+
+        for batch in self.processor.iter_transformed_batches(batch_size):
+            with self.metrics.time("digest"):
+                for service in batch.services:
+                    for table, (output, _) in RECONCILED_TABLES.items():
+                        for record in getattr(service.output, output):
+                            expected[table][str(record.id)] = get_record_digest(
+                                record.model_dump(mode="json")
+                            )
+
+        return expected
+
+    def _reconcile_table(
+        self,
+        table: str,
+        model_cls: type[BaseModel],
+        expected: dict[str, bytes],
+        segments: int,
+    ) -> TableReconciliation:
+        """
+        Scan the target table in parallel segments, comparing each item with the
+        expected records. Expected records not seen in any segment are missing.
+        Items are parsed into their model first, so that they are serialised in
+        exactly the same way as the expected records.
+        """
+        result = TableReconciliation(table=table, source_records=len(expected))
+        seen: set[str] = set()
+
+        def scan_segment(segment: int) -> None:
+            # Each scan thread uses its own repository, as boto3 resources are not thread-safe
+            repository = get_repository(self.config, table, model_cls, self.logger)
+            for record in repository.scan_segment(segment, segments):
+                record_id = str(record.id)
+                digest = get_record_digest(record.model_dump(mode="json"))
+                with self._lock:
+                    seen.add(record_id)
+                    result.target_records += 1
+                    if (expected_digest := expected.get(record_id)) is None:
+                        result.extra.append(record_id)
+                    elif expected_digest != digest:
+                        result.drifted.append(record_id)
+                    else:
+                        result.matched += 1
+
+        with self.metrics.time(f"scan:{table}"):
+            with ThreadPoolExecutor(max_workers=segments) as executor:
+                # Consume the results so that any scan error is raised
+                list(executor.map(scan_segment, range(segments)))
+
+        result.missing = [record_id for record_id in expected if record_id not in seen]
+        for ids in (result.extra, result.drifted):
+            ids.sort()
+
+        return result
@@ -0,0 +1,271 @@
+"""
+Backup Format Utilities
+
+Utilities for converting DynamoDB items to and from the rows of a parquet backup.
+
+Raw backups hold each exported item as a DynamoDB JSON string in a single `data`
+column. Typed backups flatten each item into one column per field of its domain
+model, with nested models stored as structs and lists as list columns, so that
+backups compress well and can be filtered (e.g. by ODS code) without decoding.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum, StrEnum
+from types import NoneType, UnionType
+from typing import Annotated, Any, Literal, Union, get_args, get_origin
+from uuid import UUID
+
+import pyarrow as pa
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from ftrs_data_layer.domain import HealthcareService, Location, Organisation
+from pydantic import BaseModel
+
+RAW_SCHEMA = pa.schema([("data", pa.string())])
+
+# Domain model of each table that can be backed up, by entity name
+BACKUP_MODELS: dict[str, type[BaseModel]] = {
+    "organisation": Organisation,
+    "location": Location,
+    "healthcare-service": HealthcareService,
+}
+
+# Values serialised as strings in the JSON form of a model
+STRING_TYPES = (str, UUID, datetime, date, time, Decimal, Enum)
+
+DESERIALIZER = TypeDeserializer()
+SERIALIZER = TypeSerializer()
+
+
+class BackupFormat(StrEnum):
+    """
+    Format of the records stored in a parquet backup.
+    """
+
+    RAW = "raw"
+    TYPED = "typed"
+
+
+def get_backup_format(schema: pa.Schema) -> BackupFormat:
+    """
+    Get the format of a backup from the schema of its parquet file.
+    """
+    if schema.names == RAW_SCHEMA.names:
+        return BackupFormat.RAW
+
+    return BackupFormat.TYPED
+
+
+def get_record_schema(model_cls: type[BaseModel]) -> pa.Schema:
+    """
+    Get the schema of a table holding one column per field of the given model.
+    """
+    return pa.schema(
+        [
+            pa.field(name, _get_arrow_type(annotation))
+            for name, annotation in _get_fields(model_cls).items()
+        ]
+    )
+
+
+def get_backup_schema(model_cls: type[BaseModel]) -> pa.Schema:
+    """
+    Get the schema of a typed backup for the given domain model.
+    The sort key of the item is stored alongside the model fields.
+    """
+    return get_record_schema(model_cls).insert(1, pa.field("field", pa.string()))
+
+
+def to_record_row(record: dict, model_cls: type[BaseModel]) -> dict:
+    """
+    Convert the JSON form of a model into a row of its record schema.
+    """
+    return {
+        name: _to_column_value(record.get(name), annotation)
+        for name, annotation in _get_fields(model_cls).items()
+    }
+
+
+def from_record_row(row: dict, model_cls: type[BaseModel]) -> dict:
+    """
+    Convert a row of a record schema back into the JSON form of its model.
+    """
+    record = {
+        name: _from_column_value(row.get(name), annotation)
+        for name, annotation in _get_fields(model_cls).items()
+    }
+    return model_cls.model_validate(record).model_dump(mode="json")
+
+
+def to_backup_record(line: str, model_cls: type[BaseModel]) -> dict:
+    """
+    Convert an exported DynamoDB JSON line into a typed backup row.
+    The item is validated against its domain model, so that every value is stored
+    using the same types as the migration writes it with.
+    """
+    item = {
+        key: DESERIALIZER.deserialize(value)
+        for key, value in json.loads(line)["Item"].items()
+    }
+    record = model_cls.model_validate(item).model_dump(mode="json")
+    row = to_record_row(record, model_cls)
+    row["field"] = item.get("field", "document")
+    return row
+
+
+def from_backup_record(row: dict, model_cls: type[BaseModel]) -> dict:
+    """
+    Convert a typed backup row back into a DynamoDB JSON item.
+    """
+    item = {
+        "id": str(row["id"]),
+        "field": row.get("field") or "document",
+        **from_record_row(row, model_cls),
+    }
+    return {key: SERIALIZER.serialize(value) for key, value in item.items()}
+
+
+def _get_fields(model_cls: type[BaseModel]) -> dict[str, Any]:
+    return {name: field.annotation for name, field in model_cls.model_fields.items()}
+
+
+def _get_struct_fields(annotation: Any) -> dict[str, Any] | None:  # noqa: ANN401
+    """
+    Get the fields of a model, or the combined fields of a union of models.
+    Returns None if the annotation is not a model.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _get_fields(annotation)
+
+    args = get_args(annotation)
+    if _is_union(annotation) and all(
+        isinstance(arg, type) and issubclass(arg, BaseModel) for arg in args
+    ):
+        fields = {}
+        for arg in args:
+            for name, field_annotation in _get_fields(arg).items():
+                fields.setdefault(name, field_annotation)
+        return fields
+
+    return None
+
+
+def _unwrap(annotation: Any) -> Any:  # noqa: ANN401
+    """
+    Remove Annotated metadata and optionality from a type annotation.
+    """
+    while get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+
+    if _is_union(annotation):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1:
+            return _unwrap(args[0])
+        return Union[tuple(args)]
+
+    return annotation
+
+
+def _is_union(annotation: Any) -> bool:  # noqa: ANN401
+    return get_origin(annotation) in (Union, UnionType)
+
+
+def _get_scalar_type(annotation: Any) -> pa.DataType | None:  # noqa: ANN401, PLR0911
+    """
+    Get the arrow type of a scalar annotation, or None if it is not a scalar.
+    Unions are scalar only if every member maps to the same arrow type.
+    """
+    annotation = _unwrap(annotation)
+
+    if _is_union(annotation):
+        types = {_get_scalar_type(arg) for arg in get_args(annotation)}
+        return types.pop() if len(types) == 1 else None
+
+    if get_origin(annotation) is Literal:
+        return _get_scalar_type(type(get_args(annotation)[0]))
+
+    if not isinstance(annotation, type):
+        return None
+
+    if issubclass(annotation, bool):
+        return pa.bool_()
+    if issubclass(annotation, int):
+        return pa.int64()
+    if issubclass(annotation, float):
+        return pa.float64()
+    if issubclass(annotation, STRING_TYPES):
+        return pa.string()
+
+    return None
+
+
+def _get_arrow_type(annotation: Any) -> pa.DataType:  # noqa: ANN401
+    """
+    Get the arrow type of a model field.
+    Values that cannot be typed, such as unions of scalar types, are stored as JSON.
+    """
+    annotation = _unwrap(annotation)
+
+    if (scalar_type := _get_scalar_type(annotation)) is not None:
+        return scalar_type
+
+    if get_origin(annotation) is list:
+        return pa.list_(_get_arrow_type(get_args(annotation)[0]))
+
+    if (fields := _get_struct_fields(annotation)) is not None:
+        return pa.struct(
+            [pa.field(name, _get_arrow_type(ann)) for name, ann in fields.items()]
+        )
+
+    return pa.string()
+
+
+def _to_column_value(value: Any, annotation: Any) -> Any:  # noqa: ANN401
+    """
+    Convert a JSON value of a model field into its column value.
+    """
+    if value is None:
+        return None
+
+    annotation = _unwrap(annotation)
+
+    if _get_scalar_type(annotation) is not None:
+        return value
+
+    if get_origin(annotation) is list:
+        (item_annotation,) = get_args(annotation)
+        return [_to_column_value(item, item_annotation) for item in value]
+
+    if (fields := _get_struct_fields(annotation)) is not None:
+        return {
+            name: _to_column_value(value.get(name), field_annotation)
+            for name, field_annotation in fields.items()
+        }
+
+    return json.dumps(value)
+
+
+def _from_column_value(value: Any, annotation: Any) -> Any:  # noqa: ANN401
+    """
+    Convert a column value back into the JSON value of a model field.
+    """
+    if value is None:
+        return None
+
+    annotation = _unwrap(annotation)
+
+    if _get_scalar_type(annotation) is not None:
+        return value
+
+    if get_origin(annotation) is list:
+        (item_annotation,) = get_args(annotation)
+        return [_from_column_value(item, item_annotation) for item in value]
+
+    if (fields := _get_struct_fields(annotation)) is not None:
+        return {
+            name: _from_column_value(value.get(name), field_annotation)
+            for name, field_annotation in fields.items()
+        }
+
+    return json.loads(value)
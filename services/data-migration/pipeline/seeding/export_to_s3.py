@@ -10,22 +10,41 @@ import asyncio
 import gzip
 import json
 import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from math import floor
-from threading import Lock
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterable, Iterator
 
 import awswrangler as wr
 import boto3
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import rich
 from aws_lambda_powertools.utilities.parameters import set_parameter
 from ftrs_common.utils.db_service import format_table_name, get_table_arn
 from ftrs_data_layer.client import get_dynamodb_client
 from mypy_boto3_dynamodb.type_defs import ExportDescriptionTypeDef
+from pydantic import BaseModel
+
+from pipeline.seeding.backup import (
+    BACKUP_MODELS,
+    RAW_SCHEMA,
+    BackupFormat,
+    get_backup_schema,
+    to_backup_record,
+)
 
 CONSOLE = rich.get_console()
 S3_CLIENT = boto3.client("s3")
 
+# Number of export data files downloaded and held in memory at once
+MAX_FILES_IN_FLIGHT = 4
+# Number of records written to each row group of the backup parquet file
+ROW_GROUP_SIZE = 10000
+
 
 def get_migration_store_bucket_name(env: str, workspace: str | None = None) -> str:
     """
@@ -115,14 +134,51 @@ async def export_table(
     return client.describe_export(ExportArn=export_arn)["ExportDescription"]
 
 
-async def process_export(description: ExportDescriptionTypeDef) -> None:
+def process_export(
+    description: ExportDescriptionTypeDef,
+    out_uri: str,
+    model_cls: type[BaseModel] | None = None,
+) -> int:
     """
-    Process the compressed export files into a single parquet file.
+    Process the compressed export files into a single parquet file in S3.
+
+    Data files are downloaded and decompressed in parallel, with at most
+    MAX_FILES_IN_FLIGHT files held in memory at once. Records are appended to a local
+    parquet file in row groups as each file arrives, and the file is uploaded once
+    complete. Returns the number of records written.
+
+    If a model is given, records are written as a typed backup with a column for each
+    field of the model. Otherwise, they are written as raw DynamoDB JSON.
     """
     file_list = get_export_file_list(description)
-    compressed_files = download_exported_files(description, file_list)
-    records = decompress_and_parse_files(compressed_files)
-    return pd.DataFrame(records, columns=["data"])
+    schema = get_backup_schema(model_cls) if model_cls else RAW_SCHEMA
+    record_count = 0
+
+    with TemporaryDirectory() as temp_dir:
+        local_path = Path(temp_dir) / "export.parquet"
+        with pq.ParquetWriter(local_path, schema) as writer:
+            buffer = []
+            for idx, records in enumerate(iter_export_files(description, file_list)):
+                CONSOLE.print(
+                    f"Parsed {len(records)} records from file [bright_cyan]{idx + 1}[/bright_cyan]",
+                    style="bright_black",
+                )
+                buffer.extend(
+                    to_backup_record(record, model_cls)
+                    if model_cls
+                    else {"data": record}
+                    for record in records
+                )
+                while len(buffer) >= ROW_GROUP_SIZE:
+                    write_row_group(writer, buffer[:ROW_GROUP_SIZE])
+                    del buffer[:ROW_GROUP_SIZE]
+                record_count += len(records)
+
+            write_row_group(writer, buffer)
+
+        wr.s3.upload(local_file=str(local_path), path=out_uri)
+
+    return record_count
 
 
 def get_export_file_list(description: ExportDescriptionTypeDef) -> list[dict]:
@@ -146,91 +202,108 @@ def get_export_file_list(description: ExportDescriptionTypeDef) -> list[dict]:
     ]
 
 
-def download_exported_files(
-    description: ExportDescriptionTypeDef, file_list: list[dict]
-) -> list[bytes]:
+def iter_export_files(
+    description: ExportDescriptionTypeDef,
+    file_list: list[dict],
+    max_in_flight: int = MAX_FILES_IN_FLIGHT,
+) -> Iterator[list[str]]:
     """
-    Download the exported files from S3.
+    Download and parse the exported files in parallel, yielding the records of each
+    file in manifest order. No more than max_in_flight files are fetched ahead of
+    the consumer.
     """
     table_name = description["TableArn"].rsplit("/")[-1]
-    files_lock = Lock()
-    files = []
-
     CONSOLE.print(
         f"Downloading {len(file_list)} data files for [bright_blue]{table_name}[/bright_blue]",
         style="bright_black",
     )
 
-    def _download_file(file_info: dict) -> bytes:
-        obj = S3_CLIENT.get_object(
-            Bucket=description["S3Bucket"],
-            Key=file_info["dataFileS3Key"],
+    files = iter(file_list)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        in_flight = deque(
+            executor.submit(download_export_file, description, file_info)
+            for file_info in islice(files, max_in_flight)
         )
-        with files_lock:
-            files.append(obj["Body"].read())
+        while in_flight:
+            records = in_flight.popleft().result()
+            if (file_info := next(files, None)) is not None:
+                in_flight.append(
+                    executor.submit(download_export_file, description, file_info)
+                )
+            yield records
+
+
+def download_export_file(
+    description: ExportDescriptionTypeDef, file_info: dict
+) -> list[str]:
+    """
+    Download an exported file from S3, decompressing and parsing it as it is read.
+    """
+    obj = S3_CLIENT.get_object(
+        Bucket=description["S3Bucket"],
+        Key=file_info["dataFileS3Key"],
+    )
+    with gzip.open(obj["Body"], "rt", encoding="utf-8") as file:
+        return parse_export_lines(file)
 
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        executor.map(_download_file, file_list)
 
-    return files
+def parse_export_lines(lines: Iterable[str]) -> list[str]:
+    """
+    Parse the records from the lines of a decompressed export file.
+    """
+    return [line.strip() for line in lines if line.strip()]
 
 
-def decompress_and_parse_files(compressed_files: list[bytes]) -> list[dict]:
+def write_row_group(writer: pq.ParquetWriter, rows: list[dict]) -> None:
     """
-    Decompress and parse the exported files.
+    Write a list of rows to the parquet file as a row group.
     """
-    CONSOLE.print(
-        f"Decompressing {len(compressed_files)} data files",
-        style="bright_black",
-    )
+    if rows:
+        writer.write_table(pa.Table.from_pylist(rows, schema=writer.schema))
 
-    records = []
-    for idx, file_content in enumerate(compressed_files):
-        decompressed_content = gzip.decompress(file_content)
-        file_records = [
-            line.strip()
-            for line in decompressed_content.decode("utf-8").splitlines()
-            if line.strip()
-        ]
-        records.extend(file_records)
-        CONSOLE.print(
-            f"Parsed {len(file_records)} records from file [bright_cyan]{idx + 1}[/bright_cyan]",
-            style="bright_black",
-        )
 
-    return records
+async def export_entity(
+    entity_name: str, env: str, workspace: str | None
+) -> tuple[str, ExportDescriptionTypeDef]:
+    """
+    Export the table of an entity, returning the entity name with the export description
+    """
+    return entity_name, await export_table(entity_name, env, workspace)
 
 
-async def run_s3_export(env: str, workspace: str | None) -> list:
+async def run_s3_export(
+    env: str,
+    workspace: str | None,
+    backup_format: BackupFormat = BackupFormat.RAW,
+) -> list:
     """
     Run the actual S3 export process (async)
     """
     export_tasks = [
-        export_table("location", env, workspace),
-        export_table("organisation", env, workspace),
-        # export_table("healthcare-service", env, workspace), TODO: FDOS-547 - Uncomment when enabling seeding of HealthcareService records
+        export_entity("location", env, workspace),
+        export_entity("organisation", env, workspace),
+        # export_entity("healthcare-service", env, workspace), TODO: FDOS-547 - Uncomment when enabling seeding of HealthcareService records
     ]
     table_uris = {}
 
     for task in asyncio.as_completed(export_tasks):
-        export_description = await task
+        entity_name, export_description = await task
         table_name = export_description["TableArn"].rsplit("/")[-1]
-        records_df = await process_export(export_description)
-
         out_key = f"backups/{table_name}.parquet"
         out_uri = f"s3://{export_description['S3Bucket']}/{out_key}"
 
-        wr.s3.to_parquet(
-            df=records_df,
-            path=out_uri,
-            dataset=False,
+        model_cls = (
+            BACKUP_MODELS[entity_name] if backup_format == BackupFormat.TYPED else None
+        )
+        record_count = await asyncio.to_thread(
+            process_export, export_description, out_uri, model_cls
         )
         CONSOLE.print(
-            f"Saved {records_df.shape[0]} items from [bright_blue]{table_name}[/bright_blue] to [bright_cyan]{out_key}[/bright_cyan]",
+            f"Saved {record_count} items from [bright_blue]{table_name}[/bright_blue] to [bright_cyan]{out_key}[/bright_cyan]",
             style="green",
         )
 
-        table_uris[table_name.split("database-")[-1]] = out_uri
+        table_uris[entity_name] = out_uri
 
     set_parameter(
         name=f"/ftrs-dos/{env}/dynamodb-backup-arns",
@@ -1,19 +1,35 @@
 import asyncio
 import json
+import random
 import time
-from concurrent.futures import ThreadPoolExecutor
 from itertools import batched
+from math import ceil
 from multiprocessing import cpu_count
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Lock
 from time import sleep
 from typing import Generator
 
 import awswrangler as wr
 import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
 import rich
 from aws_lambda_powertools.utilities.parameters import get_parameter
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from ftrs_common.utils.db_service import format_table_name
+from pydantic import BaseModel, Field, PrivateAttr
+
+from pipeline.seeding.backup import (
+    BACKUP_MODELS,
+    BackupFormat,
+    from_backup_record,
+    get_backup_format,
+)
+from pipeline.utils.rate_limiter import TokenBucket
+from pipeline.utils.stage import PipelineStage
 
 CONSOLE = rich.get_console()
 DDB_CLIENT = boto3.client(
@@ -21,115 +37,351 @@ DDB_CLIENT = boto3.client(
     config=Config(connect_timeout=1, read_timeout=1, retries={"max_attempts": 5}),
 )
 
+# Write capacity units per second each table is restored at
+DEFAULT_WCU_BUDGET = 1000
+DEFAULT_FAILURES_FILE = Path("restore-failures.jsonl")
+
+# Number of times a batch is sent before its remaining items are recorded as failed
+MAX_WRITE_ATTEMPTS = 8
+BASE_BACKOFF = 0.05
+MAX_BACKOFF = 5
+
+# Number of rows read from the backup file at a time, and the workers for each table
+# that parse them into DynamoDB items and write them
+READ_BATCH_SIZE = 1000
+PARSE_WORKERS = max(cpu_count() // 2, 1)
+WRITE_WORKERS = cpu_count() * 2
+
+# Seconds between progress reports for each table
+PROGRESS_INTERVAL = 10
+
+THROTTLING_ERRORS = (
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+)
+
 
 def iter_batches(
     items: list[dict],
     batch_size: int = 25,
-) -> Generator[list[str], None, None]:
+) -> Generator[list[dict], None, None]:
     for batch in batched(items, batch_size):
-        yield [json.loads(item)["Item"] for item in batch]
+        yield list(batch)
 
 
-def write_item_batch(
-    table_name: str,
-    batch: list[dict],
-    backoff: int = 1,
-    initial_start_time: float | None = None,
-) -> None:
+def read_backup_items(
+    backup: pa.Table | pa.RecordBatch, entity_type: str
+) -> list[dict]:
     """
-    Write a batch of items to a DynamoDB table
+    Read the DynamoDB items from a backup, or a batch of its records,
+    in either the raw or typed format
     """
+    if get_backup_format(backup.schema) == BackupFormat.RAW:
+        return [json.loads(item)["Item"] for item in backup.column("data").to_pylist()]
 
-    try:
-        start_time = initial_start_time or time.monotonic()
-        DDB_CLIENT.transact_write_items(
-            TransactItems=[
-                {"Put": {"TableName": table_name, "Item": item}} for item in batch
-            ]
-        )
-        elapsed_time = time.monotonic() - start_time
+    model_cls = BACKUP_MODELS[entity_type]
+    return [from_backup_record(row, model_cls) for row in backup.to_pylist()]
+
+
+class RestoreProgress(BaseModel):
+    """
+    Progress of the restore of a single table.
+    Updated from the writer threads, so changes should be made through `add`.
+    """
+
+    table_name: str
+    total_items: int = 0
+    written_items: int = 0
+    failed_items: int = 0
+    consumed_wcu: float = 0
+    throttled_requests: int = 0
+    start_time: float = Field(default_factory=time.monotonic)
+    last_reported: float = Field(default_factory=time.monotonic)
+
+    _lock: Lock = PrivateAttr(default_factory=Lock)
+
+    def add(
+        self,
+        written: int = 0,
+        failed: int = 0,
+        consumed_wcu: float = 0,
+        throttled: int = 0,
+    ) -> None:
+        with self._lock:
+            self.written_items += written
+            self.failed_items += failed
+            self.consumed_wcu += consumed_wcu
+            self.throttled_requests += throttled
+
+            if time.monotonic() - self.last_reported >= PROGRESS_INTERVAL:
+                self.last_reported = time.monotonic()
+                self.report()
 
+    def report(self) -> None:
+        elapsed_time = time.monotonic() - self.start_time
         CONSOLE.print(
-            f"Written {len(batch)} items to [bright_blue]{table_name}[/bright_blue] in {elapsed_time:.2f} seconds",
+            f"Written {self.written_items}/{self.total_items} items to [bright_blue]{self.table_name}[/bright_blue] "
+            f"({self.failed_items} failed, {self.consumed_wcu:.0f} WCU consumed, {self.throttled_requests} throttled) "
+            f"in {elapsed_time:.2f} seconds",
             style="bright_black",
         )
 
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "ThrottlingException":
-            CONSOLE.print(
-                f"Table {table_name} is being throttled. Waiting for {backoff} seconds...",
-                style="yellow",
+
+class FailureLedger:
+    """
+    Records the items that could not be written during a restore, so that they can
+    be inspected or replayed. Each entry is saved as a line of JSON.
+    """
+
+    def __init__(self) -> None:
+        self.entries: list[dict] = []
+        self._lock = Lock()
+
+    def record(self, table_name: str, items: list[dict], error: str) -> None:
+        with self._lock:
+            self.entries.extend(
+                {"table": table_name, "error": error, "item": item} for item in items
             )
-            sleep(backoff)
-            return write_item_batch(table_name, batch, backoff * 2, start_time)
 
-        CONSOLE.print(
-            f"Error writing items to [bright_blue]{table_name}[/bright_blue]: {e}",
-            style="bright_red",
-        )
+    def save(self, path: Path) -> None:
+        with open(path, "w") as file:
+            file.writelines(json.dumps(entry) + "\n" for entry in self.entries)
 
-    except Exception as e:
-        CONSOLE.print(
-            f"Error writing items to [bright_blue]{table_name}[/bright_blue]: {e}",
-            style="bright_red",
+
+def get_write_units(items: list[dict]) -> int:
+    """
+    Estimate the write capacity units needed to put the given DynamoDB JSON items.
+    Each item uses one unit per started kilobyte; the JSON size slightly overestimates
+    the item size, keeping the estimate on the safe side of the budget.
+    """
+    return sum(ceil(len(json.dumps(item)) / 1024) for item in items)
+
+
+def write_item_batch(
+    table_name: str,
+    batch: list[dict],
+    rate_limiter: TokenBucket,
+    progress: RestoreProgress,
+    ledger: FailureLedger,
+) -> None:
+    """
+    Write a batch of up to 25 items to a DynamoDB table using BatchWriteItem.
+
+    Each request first takes its estimated write units from the rate limiter.
+    Unprocessed items and throttled requests are retried with jittered exponential
+    backoff, up to MAX_WRITE_ATTEMPTS times. Items that cannot be written are added
+    to the failure ledger.
+    """
+    requests = [{"PutRequest": {"Item": item}} for item in batch]
+
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        if attempt:
+            sleep(random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2**attempt)))
+
+        rate_limiter.acquire(get_write_units(batch))
+        try:
+            response = DDB_CLIENT.batch_write_item(
+                RequestItems={table_name: requests},
+                ReturnConsumedCapacity="TOTAL",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in THROTTLING_ERRORS:
+                progress.add(throttled=1)
+                continue
+
+            _record_failure(table_name, _get_items(requests), str(e), progress, ledger)
+            return
+
+        except Exception as e:
+            _record_failure(table_name, _get_items(requests), str(e), progress, ledger)
+            return
+
+        unprocessed = response.get("UnprocessedItems", {}).get(table_name, [])
+        progress.add(
+            written=len(requests) - len(unprocessed),
+            consumed_wcu=sum(
+                capacity.get("CapacityUnits", 0)
+                for capacity in response.get("ConsumedCapacity", [])
+            ),
+            throttled=1 if unprocessed else 0,
         )
+        if not unprocessed:
+            return
+
+        requests = unprocessed
+        batch = _get_items(requests)
+
+    _record_failure(
+        table_name,
+        _get_items(requests),
+        f"Items not processed after {MAX_WRITE_ATTEMPTS} attempts",
+        progress,
+        ledger,
+    )
+
 
+def _get_items(requests: list[dict]) -> list[dict]:
+    return [request["PutRequest"]["Item"] for request in requests]
 
-async def bulk_load_table(table_name: str, items: list[dict]) -> None:
+
+def _record_failure(
+    table_name: str,
+    items: list[dict],
+    error: str,
+    progress: RestoreProgress,
+    ledger: FailureLedger,
+) -> None:
+    CONSOLE.print(
+        f"Error writing {len(items)} items to [bright_blue]{table_name}[/bright_blue]: {error}",
+        style="bright_red",
+    )
+    ledger.record(table_name, items, error)
+    progress.add(failed=len(items))
+
+
+def restore_table(
+    table_name: str,
+    entity_type: str,
+    backup_path: Path,
+    wcu_budget: int = DEFAULT_WCU_BUDGET,
+    ledger: FailureLedger | None = None,
+) -> RestoreProgress:
     """
-    Bulk load items into a DynamoDB table
+    Restore a table from a local parquet backup, writing no more than the given
+    number of write capacity units per second.
+
+    The backup is streamed in record batches, one row group at a time. Each record
+    batch is parsed into DynamoDB items by a pool of parse workers, and the items are
+    written in batches of 25 by a pool of write workers. The queues between stages
+    are bounded, so memory use does not depend on the size of the table.
+
+    A record batch that cannot be parsed is added to the failure ledger as its
+    backup rows, and the rest of the backup is still restored.
     """
-    workers = cpu_count() * 2
+    backup = pq.ParquetFile(backup_path)
+    rate_limiter = TokenBucket(rate=wcu_budget)
+    progress = RestoreProgress(
+        table_name=table_name, total_items=backup.metadata.num_rows
+    )
+    ledger = ledger or FailureLedger()
     CONSOLE.print(
-        f"Bulk loading {len(items)} items into table [bright_blue]{table_name}[/bright_blue] using {workers} workers"
+        f"Bulk loading {progress.total_items} items into table [bright_blue]{table_name}[/bright_blue] using {WRITE_WORKERS} workers at up to {wcu_budget} WCU/s"
     )
-    loop = asyncio.get_running_loop()
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        tasks = []
-        for batch in iter_batches(items):
-            tasks.append(
-                loop.run_in_executor(executor, write_item_batch, table_name, batch)
+    def write(batch: list[dict]) -> None:
+        write_item_batch(table_name, batch, rate_limiter, progress, ledger)
+
+    def parse(record_batch: pa.RecordBatch) -> None:
+        try:
+            items = read_backup_items(record_batch, entity_type)
+        except Exception as e:
+            _record_failure(
+                table_name, record_batch.to_pylist(), str(e), progress, ledger
             )
+            return
 
-        for done in asyncio.as_completed(tasks):
-            await done
+        for batch in iter_batches(items):
+            write_stage.put(batch)
 
+    write_stage = PipelineStage[list[dict]](
+        "write", handler=write, workers=WRITE_WORKERS, queue_size=WRITE_WORKERS * 2
+    )
+    parse_stage = PipelineStage[pa.RecordBatch](
+        "parse", handler=parse, workers=PARSE_WORKERS, queue_size=PARSE_WORKERS
+    )
+    write_stage.start()
+    parse_stage.start()
+
+    try:
+        for record_batch in backup.iter_batches(batch_size=READ_BATCH_SIZE):
+            parse_stage.put(record_batch)
+    finally:
+        parse_stage.join()
+        write_stage.join()
+
+    for stage in (parse_stage, write_stage):
+        if stage.exception:
+            raise stage.exception
+
+    progress.report()
     CONSOLE.print(
-        f"Successfully written {len(items)} items to [bright_blue]{table_name}[/bright_blue]",
-        style="green",
+        f"Successfully written {progress.written_items} of {progress.total_items} items to [bright_blue]{table_name}[/bright_blue]",
+        style="green" if not progress.failed_items else "yellow",
     )
+    return progress
 
 
-async def run_s3_restore(env: str, workspace: str | None) -> None:
+def restore_backup(
+    table_name: str,
+    entity_type: str,
+    backup_uri: str,
+    wcu_budget: int = DEFAULT_WCU_BUDGET,
+    ledger: FailureLedger | None = None,
+) -> RestoreProgress:
+    """
+    Download a backup from S3 to a temporary file and restore it to a table.
+    The download is streamed to disk, so the backup is never held in memory.
+    """
+    with TemporaryDirectory() as temp_dir:
+        backup_path = Path(temp_dir) / "backup.parquet"
+        wr.s3.download(path=backup_uri, local_file=str(backup_path))
+        return restore_table(table_name, entity_type, backup_path, wcu_budget, ledger)
+
+
+async def run_s3_restore(
+    env: str,
+    workspace: str | None,
+    wcu_budget: int = DEFAULT_WCU_BUDGET,
+    failures_file: Path = DEFAULT_FAILURES_FILE,
+) -> list[RestoreProgress]:
     """
     Run the actual S3 restore process (async)
+    Tables are restored concurrently, and items that could not be written are saved
+    to the failures file. The failures file is saved once every table has finished,
+    even if the restore of a table raised an error.
     """
     CONSOLE.print(
         f"Restoring data from S3 for environment [bright_blue]{env}[/bright_blue] and workspace [bright_blue]{workspace}[/bright_blue]"
     )
 
-    CONSOLE.print("Downloading backup files from S3", style="bright_black")
     backup_uris = get_parameter(
         name=f"/ftrs-dos/{env}/dynamodb-backup-arns",
         transform="json",
     )
-    data = {
-        entity_type: wr.s3.read_parquet(path=path)
-        for entity_type, path in backup_uris.items()
-    }
 
     CONSOLE.print("Restoring data to DynamoDB", style="bright_black")
+    ledger = FailureLedger()
     tasks = [
-        bulk_load_table(
-            format_table_name(entity_type, env, workspace), df["data"].tolist()
+        asyncio.to_thread(
+            restore_backup,
+            format_table_name(entity_type, env, workspace),
+            entity_type,
+            backup_uri,
+            wcu_budget,
+            ledger,
         )
-        for entity_type, df in data.items()
+        for entity_type, backup_uri in backup_uris.items()
     ]
 
-    await asyncio.gather(*tasks)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    if ledger.entries:
+        ledger.save(failures_file)
+        CONSOLE.print(
+            f"Failed to restore {len(ledger.entries)} items. Failed items saved to [bright_cyan]{failures_file}[/bright_cyan]",
+            style="bright_red",
+        )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    if ledger.entries:
+        return results
 
     CONSOLE.print(
         f"Data restoration complete to [bright_blue]{env}[/bright_blue] and workspace [bright_blue]{workspace}[/bright_blue]",
         style="bright_green",
     )
+    return results
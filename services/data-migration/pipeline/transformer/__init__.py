@@ -1,6 +1,11 @@
-from pipeline.transformer.base import ServiceTransformer, ServiceTransformOutput
+from pipeline.transformer.base import (
+    ServiceTransformer,
+    ServiceTransformOutput,
+    build_selection_clause,
+)
 from pipeline.transformer.gp_enhanced_access import GPEnhancedAccessTransformer
 from pipeline.transformer.gp_practice import GPPracticeTransformer
+from pipeline.transformer.registry import TransformerMetrics, TransformerRegistry
 
 SUPPORTED_TRANSFORMERS: list[ServiceTransformer] = [
     GPPracticeTransformer,
@@ -13,4 +18,7 @@ __all__ = [
     "GPPracticeTransformer",
     "GPEnhancedAccessTransformer",
     "SUPPORTED_TRANSFORMERS",
+    "TransformerMetrics",
+    "TransformerRegistry",
+    "build_selection_clause",
 ]
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import UTC, datetime
 from decimal import Decimal
-from typing import Type
+from typing import ClassVar, Type
 from uuid import UUID
 
 from ftrs_common.logger import Logger
@@ -33,6 +33,7 @@ from ftrs_data_layer.domain.clinical_code import (
 from ftrs_data_layer.domain.enums import TimeUnit
 from ftrs_data_layer.logbase import DataMigrationLogBase
 from pydantic import BaseModel, Field
+from sqlalchemy import ColumnElement, and_, or_
 
 from pipeline.utils.address_formatter import format_address
 from pipeline.utils.cache import DoSMetadataCache
@@ -62,12 +63,20 @@ class ServiceTransformer(ABC):
     MIGRATION_UUID_NS = UUID("fa3aaa15-9f83-4f4a-8f86-fd1315248bcb")
     MIGRATION_USER = "DATA_MIGRATION"
     VALIDATOR_CLS: Type[Validator] = ServiceValidator
+    # Legacy service type IDs this transformer can support.
+    # An empty tuple means the transformer is considered for every service type.
+    TYPE_IDS: ClassVar[tuple[int, ...]] = ()
 
     def __init__(self, logger: Logger, metadata: DoSMetadataCache) -> None:
         self.start_time = datetime.now(UTC)
         self.logger = logger
         self.metadata = metadata
         self.validator = self.VALIDATOR_CLS(logger)
+        # Symptom group and discriminator pairs are shared by many services,
+        # so they are built once per code and a copy is returned for each service.
+        self.sgsd_pairs: dict[
+            tuple[int, int], SymptomGroupSymptomDiscriminatorPair
+        ] = {}
 
     @abstractmethod
     def transform(
@@ -95,6 +104,21 @@ class ServiceTransformer(ABC):
         """
         return False, None
 
+    @classmethod
+    def get_selection_criteria(cls) -> list[ColumnElement[bool]]:
+        """
+        SQL predicates over the legacy services table which select the services
+        this transformer could support and include.
+
+        These are used to filter services in the database before they are loaded.
+        They must never be stricter than is_service_supported and should_include_service,
+        which are still applied to every loaded record.
+        An empty list means the transformer cannot be expressed in SQL.
+
+        :return: A list of predicates which are combined with AND.
+        """
+        return []
+
     @classmethod
     @abstractmethod
     def should_include_service(
@@ -339,7 +363,14 @@ class ServiceTransformer(ABC):
     ) -> SymptomGroupSymptomDiscriminatorPair:
         """
         Build a single SymptomGroupSymptomDiscriminatorPair from a ServiceSGSD code.
+        The pair is cached by symptom group and discriminator ID, and a copy of the
+        cached pair is returned for every service with the same code, so that no
+        two outputs share an instance.
         """
+        key = (code.sgid, code.sdid)
+        if pair := self.sgsd_pairs.get(key):
+            return pair.model_copy(deep=True)
+
         sg = self.metadata.symptom_groups.get(code.sgid)
         sd = self.metadata.symptom_discriminators.get(code.sdid)
 
@@ -349,7 +380,7 @@ class ServiceTransformer(ABC):
             else ClinicalCodeSource.PATHWAYS
         )
 
-        return SymptomGroupSymptomDiscriminatorPair(
+        pair = self.sgsd_pairs[key] = SymptomGroupSymptomDiscriminatorPair(
             sg=SymptomGroup(
                 id=generate_uuid(sg.id, "symptomgroup"),
                 codeID=code.sgid,
@@ -364,6 +395,7 @@ class ServiceTransformer(ABC):
                 synonyms=[syn.name for syn in sd.synonyms],
             ),
         )
+        return pair.model_copy(deep=True)
 
     def build_dispositions(self, service: legacy_model.Service) -> list[Disposition]:
         """
@@ -439,3 +471,25 @@ class ServiceTransformer(ABC):
         result.append(current_range)
 
         return result
+
+
+def build_selection_clause(
+    transformers: list[Type[ServiceTransformer]],
+) -> ColumnElement[bool] | None:
+    """
+    Combine the selection criteria of the given transformers into a single predicate.
+    Returns None if any transformer cannot be expressed in SQL,
+    in which case every service must be loaded.
+    """
+    clauses = []
+    for transformer in transformers:
+        criteria = transformer.get_selection_criteria()
+        if not criteria:
+            return None
+
+        clauses.append(and_(*criteria))
+
+    if not clauses:
+        return None
+
+    return or_(*clauses)
@@ -2,6 +2,7 @@ import re
 
 from ftrs_data_layer.domain import HealthcareServiceCategory, HealthcareServiceType
 from ftrs_data_layer.domain import legacy as legacy_model
+from sqlalchemy import ColumnElement, func
 
 from pipeline.transformer.base import ServiceTransformer, ServiceTransformOutput
 
@@ -10,6 +11,7 @@ class GPEnhancedAccessTransformer(ServiceTransformer):
     STATUS_ACTIVE = 1
     GP_ACCESS_HUB_TYPE_ID = 136
     PCN_ENHANCED_SERVICE_TYPE_ID = 152
+    TYPE_IDS = (GP_ACCESS_HUB_TYPE_ID, PCN_ENHANCED_SERVICE_TYPE_ID)
     GP_ENHANCED_ACCESS_ODS_CODE_REGEX = re.compile(r"^U\d{5}$")
 
     # Name exclusion patterns
@@ -87,6 +89,22 @@ class GPEnhancedAccessTransformer(ServiceTransformer):
 
         return True, None
 
+    @classmethod
+    def get_selection_criteria(cls) -> list[ColumnElement[bool]]:
+        """
+        Select active GP Access Hub and PCN Enhanced Services
+        whose truncated ODS code is correctly formatted.
+        """
+        return [
+            legacy_model.Service.typeid.in_(
+                [cls.GP_ACCESS_HUB_TYPE_ID, cls.PCN_ENHANCED_SERVICE_TYPE_ID]
+            ),
+            legacy_model.Service.statusid == cls.STATUS_ACTIVE,
+            func.left(legacy_model.Service.odscode, 6).regexp_match(
+                cls.GP_ENHANCED_ACCESS_ODS_CODE_REGEX.pattern
+            ),
+        ]
+
     @classmethod
     def should_include_service(
         cls, service: legacy_model.Service
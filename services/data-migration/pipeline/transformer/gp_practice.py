@@ -2,6 +2,7 @@ import re
 
 from ftrs_data_layer.domain import HealthcareServiceCategory, HealthcareServiceType
 from ftrs_data_layer.domain import legacy as legacy_model
+from sqlalchemy import ColumnElement
 
 from pipeline.transformer.base import ServiceTransformer, ServiceTransformOutput
 from pipeline.validation.service import GPPracticeValidator
@@ -10,6 +11,7 @@ from pipeline.validation.service import GPPracticeValidator
 class GPPracticeTransformer(ServiceTransformer):
     STATUS_ACTIVE = 1
     GP_PRACTICE_TYPE_ID = 100
+    TYPE_IDS = (GP_PRACTICE_TYPE_ID,)
     GP_PRACTICE_ODS_CODE_REGEX = re.compile(r"^[ABCDEFGHJKLMNPVWY][0-9]{5}$")
     VALIDATOR_CLS = GPPracticeValidator
 
@@ -68,6 +70,19 @@ class GPPracticeTransformer(ServiceTransformer):
 
         return True, None
 
+    @classmethod
+    def get_selection_criteria(cls) -> list[ColumnElement[bool]]:
+        """
+        Select active GP practices with a correctly formatted ODS code.
+        """
+        return [
+            legacy_model.Service.typeid == cls.GP_PRACTICE_TYPE_ID,
+            legacy_model.Service.statusid == cls.STATUS_ACTIVE,
+            legacy_model.Service.odscode.regexp_match(
+                cls.GP_PRACTICE_ODS_CODE_REGEX.pattern
+            ),
+        ]
+
     @classmethod
     def should_include_service(
         cls, service: legacy_model.Service
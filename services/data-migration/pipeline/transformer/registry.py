@@ -0,0 +1,79 @@
+from datetime import UTC, datetime
+from typing import Iterable
+
+from ftrs_common.logger import Logger
+from pydantic import BaseModel
+
+from pipeline.transformer.base import ServiceTransformer
+from pipeline.utils.cache import DoSMetadataCache
+
+
+class TransformerMetrics(BaseModel):
+    selected: int = 0
+    rejected: int = 0
+
+
+class TransformerRegistry:
+    """
+    Dispatch table mapping legacy service type IDs to the transformers which may support them.
+
+    Transformers are instantiated on first use and the instance is reused for
+    every subsequent record, along with its validator. The start time of the
+    instance is refreshed each time it is selected for a record.
+    """
+
+    def __init__(self, transformers: Iterable[type[ServiceTransformer]]) -> None:
+        self.transformers = list(transformers)
+        self.fallback = [cls for cls in self.transformers if not list(cls.TYPE_IDS)]
+        self.dispatch: dict[int, list[type[ServiceTransformer]]] = {
+            type_id: [
+                cls
+                for cls in self.transformers
+                if type_id in cls.TYPE_IDS or cls in self.fallback
+            ]
+            for cls in self.transformers
+            for type_id in cls.TYPE_IDS
+        }
+        self.instances: dict[type[ServiceTransformer], ServiceTransformer] = {}
+        self.metrics: dict[str, TransformerMetrics] = {}
+
+    def get_candidates(self, type_id: int | None) -> list[type[ServiceTransformer]]:
+        """
+        Get the transformers which may support a service of the given type, in priority order.
+        """
+        return self.dispatch.get(type_id, self.fallback)
+
+    def get_instance(
+        self,
+        transformer_cls: type[ServiceTransformer],
+        logger: Logger,
+        metadata: DoSMetadataCache,
+    ) -> ServiceTransformer:
+        """
+        Get the cached instance of the transformer, creating it if required.
+        The start time used for created and modified timestamps is reset, so that
+        records in a long running sync are stamped with the time they were transformed.
+        """
+        if transformer_cls not in self.instances:
+            self.instances[transformer_cls] = transformer_cls(
+                logger=logger, metadata=metadata
+            )
+
+        instance = self.instances[transformer_cls]
+        instance.start_time = datetime.now(UTC)
+        return instance
+
+    def get_metrics(
+        self, transformer_cls: type[ServiceTransformer]
+    ) -> TransformerMetrics:
+        """
+        Get the dispatch counters for the transformer.
+        """
+        return self.metrics.setdefault(transformer_cls.__name__, TransformerMetrics())
+
+    def reset(self) -> None:
+        """
+        Discard cached transformer instances and reset all counters.
+        """
+        self.instances.clear()
+        self.metrics.clear()
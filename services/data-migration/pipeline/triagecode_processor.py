@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+from threading import Lock
 from time import perf_counter
+from typing import Callable
 
 from ftrs_common.logger import Logger
 from ftrs_data_layer.domain import legacy
@@ -11,14 +15,16 @@ from pipeline.transformer.triage_code import TriageCodeTransformer
 from pipeline.utils.cache import DoSMetadataCache
 from pipeline.utils.config import DataMigrationConfig
 from pipeline.utils.dbutil import (
-    get_all_symptom_groups,
     get_repository,
-    get_symptom_discriminators_for_symptom_group,
     iter_records,
+    iter_symptom_discriminators_by_symptom_group,
 )
+from pipeline.utils.stage import StageMetrics
 
 
 class TriageCodeProcessor:
+    BATCH_SIZE = 100
+
     def __init__(
         self,
         config: DataMigrationConfig,
@@ -29,11 +35,17 @@ class TriageCodeProcessor:
         self.engine = create_engine(config.db_config.connection_string, echo=False)
         self.metrics = DataMigrationMetrics()
         self.metadata = DoSMetadataCache(self.engine)
+        self._metrics_lock = Lock()
 
-    def sync_all_triage_codes(self) -> None:
+    def sync_all_triage_codes(self, concurrent: bool = False) -> None:
         """
         Run the full sync process for triage codes.
+        In concurrent mode the record types are synced concurrently using batch writes.
         """
+        if concurrent:
+            self._sync_all_triage_codes_concurrent()
+            return
+
         for symptom_group in iter_records(self.engine, legacy.SymptomGroup):
             self._process_record(
                 symptom_group,
@@ -112,28 +124,119 @@ class TriageCodeProcessor:
         finally:
             self.logger.remove_keys(["record_id"])
 
-    def _process_combinations(self) -> None:
+    def _sync_all_triage_codes_concurrent(self) -> None:
         """
-        Process and save combinations of symptom groups and symptom discriminators.
+        Sync symptom groups, dispositions, symptom discriminators and combinations
+        as four concurrent streams, and log the throughput of each stream.
         """
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="triage") as executor:
+            futures = [
+                executor.submit(
+                    self._sync_records_batched,
+                    legacy.SymptomGroup,
+                    "SymptomGroup",
+                    TriageCodeTransformer.build_triage_code_from_symptom_group,
+                ),
+                executor.submit(
+                    self._sync_records_batched,
+                    legacy.Disposition,
+                    "Disposition",
+                    TriageCodeTransformer.build_triage_code_from_disposition,
+                ),
+                executor.submit(
+                    self._sync_records_batched,
+                    legacy.SymptomDiscriminator,
+                    "SymptomDiscriminator",
+                    TriageCodeTransformer.build_triage_code_from_symptom_discriminator,
+                ),
+                executor.submit(self._process_combinations, log_records=False),
+            ]
+
+        for future in futures:
+            if future.exception() is not None:
+                continue
 
+            metrics = future.result()
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_024,
+                stage=metrics.name,
+                items_per_second=metrics.items_per_second,
+                **metrics.model_dump(exclude={"name"}),
+            )
+
+        for future in futures:
+            if exception := future.exception():
+                raise exception
+
+    def _sync_records_batched(
+        self,
+        model_class: type[legacy.LegacyDoSModel],
+        record_type: str,
+        transformer_method: Callable,
+    ) -> StageMetrics:
+        """
+        Transform every record of a single type and save them using batch writes.
+        Only failures are logged per record.
+        """
+        stream_metrics = StageMetrics(name=record_type)
         start_time = perf_counter()
-        try:
-            symptom_groups = get_all_symptom_groups(self.engine)
-            for sg_id in symptom_groups:
+
+        records = iter_records(self.engine, model_class, self.BATCH_SIZE)
+        for batch in batched(records, self.BATCH_SIZE):
+            triage_codes = []
+            for record in batch:
                 try:
-                    symptom_discriminators_symptom_group = (
-                        get_symptom_discriminators_for_symptom_group(self.engine, sg_id)
+                    triage_codes.append(transformer_method(record))
+                except Exception as e:
+                    self._record_error(stream_metrics)
+                    self.logger.log(
+                        DataMigrationLogBase.DM_ETL_008,
+                        error=str(e),
+                        record_id=record.id,
+                        record_type=record_type,
                     )
-                    if not symptom_discriminators_symptom_group:
-                        self.logger.log(DataMigrationLogBase.DM_ETL_012, sg_id=sg_id)
-                        continue
 
+            self._save_triage_codes(triage_codes, stream_metrics)
+
+        stream_metrics.elapsed_time = perf_counter() - start_time
+        return stream_metrics
+
+    def _process_combinations(self, log_records: bool = True) -> StageMetrics:
+        """
+        Process and save combinations of symptom groups and symptom discriminators.
+        The mappings are read in a single query and the triage codes saved using batch writes.
+        Without log_records only failures are logged per symptom group, as in concurrent mode.
+        """
+        stream_metrics = StageMetrics(name="Combinations")
+        start_time = perf_counter()
+        triage_codes = []
+
+        try:
+            for (
+                sg_id,
+                symptom_discriminators_symptom_group,
+            ) in iter_symptom_discriminators_by_symptom_group(self.engine):
+                try:
                     triage_code = TriageCodeTransformer.build_triage_code_combinations(
                         sg_id, symptom_discriminators_symptom_group
                     )
-                    self._save_to_dynamoDB(triage_code)
+                except Exception as e:
+                    self._record_error(stream_metrics)
+                    if log_records:
+                        self.logger.exception(
+                            f"Unexpected error encountered whilst processing symptom group ID {sg_id}"
+                        )
+                        self.logger.log(DataMigrationLogBase.DM_ETL_008, error=str(e))
+                    else:
+                        self.logger.log(
+                            DataMigrationLogBase.DM_ETL_008,
+                            error=str(e),
+                            record_id=sg_id,
+                            record_type=stream_metrics.name,
+                        )
+                    continue
 
+                if log_records:
                     self.logger.log(
                         DataMigrationLogBase.DM_ETL_006,
                         transformer_name="TriageCodeTransformer",
@@ -150,30 +253,72 @@ class TriageCodeProcessor:
                             exclude_none=True, mode="json", warnings=False
                         ),
                     )
-                    elapsed_time = perf_counter() - start_time
-                    self.logger.log(
-                        DataMigrationLogBase.DM_ETL_007,
-                        process="combinations",
-                        elapsed_time=elapsed_time,
-                        # Additional metrics...
-                    )
-                except Exception as e:
-                    self.metrics.errors += 1
-                    self.logger.exception(
-                        f"Unexpected error encountered whilst processing symptom group ID {sg_id}"
-                    )
-                    self.logger.log(DataMigrationLogBase.DM_ETL_008, error=str(e))
-                    continue
+
+                triage_codes.append(triage_code)
+                if len(triage_codes) >= self.BATCH_SIZE:
+                    self._save_triage_codes(triage_codes, stream_metrics)
+                    triage_codes = []
+
         except Exception as e:
-            self.metrics.errors += 1
+            self._record_error(stream_metrics)
             self.logger.exception(
                 "Unexpected error encountered whilst fetching symptom groups"
             )
             self.logger.log(DataMigrationLogBase.DM_ETL_008, error=str(e))
+
+        self._save_triage_codes(triage_codes, stream_metrics)
+        stream_metrics.elapsed_time = perf_counter() - start_time
+        return stream_metrics
+
+    def _save_triage_codes(
+        self, triage_codes: list[TriageCode], stream_metrics: StageMetrics
+    ) -> None:
+        """
+        Save a batch of triage codes using batch writes.
+        If the batch cannot be saved every triage code in it is counted as an error.
+        """
+        if not triage_codes:
             return
 
+        start_time = perf_counter()
+        try:
+            self._save_batch_to_dynamoDB(triage_codes)
+        except Exception as e:
+            self._record_error(stream_metrics, len(triage_codes))
+            self.logger.log(
+                DataMigrationLogBase.DM_ETL_025,
+                record_count=len(triage_codes),
+                record_ids=[triage_code.id for triage_code in triage_codes],
+                error=str(e),
+            )
+            return
+
+        elapsed_time = perf_counter() - start_time
+        stream_metrics.processed_items += len(triage_codes)
+        stream_metrics.busy_time += elapsed_time
+        self.logger.log(
+            DataMigrationLogBase.DM_ETL_007,
+            process=stream_metrics.name,
+            record_count=len(triage_codes),
+            elapsed_time=elapsed_time,
+        )
+
+    def _record_error(self, stream_metrics: StageMetrics, count: int = 1) -> None:
+        """
+        Record errors against both the stream and the overall metrics.
+        """
+        stream_metrics.errors += count
+        with self._metrics_lock:
+            self.metrics.errors += count
+
     def _save_to_dynamoDB(self, result: TriageCode) -> None:
         traige_code_repo = get_repository(
             self.config, "triage-code", TriageCode, self.logger
         )
         traige_code_repo.upsert(result)
+
+    def _save_batch_to_dynamoDB(self, results: list[TriageCode]) -> None:
+        triage_code_repo = get_repository(
+            self.config, "triage-code", TriageCode, self.logger
+        )
+        triage_code_repo.batch_upsert(results)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 
 import pycountry
@@ -23,6 +24,21 @@ def _norm(text: Optional[str]) -> str:
     return " ".join(text.strip().lower().split())
 
 
+def _build_county_index() -> dict[str, str]:
+    """
+    Index pycountry's GB subdivisions by normalised name, once at import time.
+    A fuzzy search for the exact name of a GB subdivision always returns that
+    subdivision first, so these segments can be matched without searching.
+    """
+    return {
+        _norm(sub.name): sub.name
+        for sub in pycountry.subdivisions.get(country_code="GB")
+    }
+
+
+GB_SUBDIVISION_INDEX = _build_county_index()
+
+
 def _pycountry_county_name_gb(segment: str) -> str | None:
     """
     Use pycountry to recognize GB county-like subdivisions from a free-text segment.
@@ -35,7 +51,20 @@ def _pycountry_county_name_gb(segment: str) -> str | None:
     if not q:
         return None
 
-    # First, check our custom mapping
+    if county_name := GB_SUBDIVISION_INDEX.get(_norm(q)):
+        return county_name
+
+    return _search_county_name(q)
+
+
+@lru_cache(maxsize=4096)
+def _search_county_name(q: str) -> str | None:
+    """
+    Fuzzy search pycountry's subdivisions for a segment, falling back to the
+    predefined list of UK counties when nothing matches.
+    Results are memoised as the same segments recur across services, and each
+    search scans every subdivision in the world.
+    """
     try:
         address_formatter_logger.log(
             UtilsLogBase.UTILS_ADDRESS_FORMATTER_001, county_name=q
@@ -82,13 +111,16 @@ def format_address(address: str, town: str, postcode: str) -> Address:
 
     town_norm = _norm(town)
     filtered: list[str] = []
+    previous_norm = None
     for seg in segments:
-        if town_norm and _norm(seg) == town_norm:
+        seg_norm = _norm(seg)
+        if town_norm and seg_norm == town_norm:
             continue  # ignore the town appearing in the string
         # avoid immediate duplicates after normalization
-        if filtered and _norm(seg) == _norm(filtered[-1]):
+        if filtered and seg_norm == previous_norm:
             continue
         filtered.append(seg)
+        previous_norm = seg_norm
 
     # Detect county using pycountry (preferred)
     county: str | None = None
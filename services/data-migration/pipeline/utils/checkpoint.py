@@ -0,0 +1,113 @@
+from datetime import UTC, datetime
+from pathlib import Path
+from threading import Lock
+from typing import Callable, ClassVar, Generic, TypeVar
+
+from pydantic import BaseModel
+
+
+class MigrationCheckpoint(BaseModel):
+    """
+    Watermark recording how far through the services table a full sync has progressed.
+    """
+
+    last_record_id: int | None = None
+    processed_records: int = 0
+    updated_at: datetime | None = None
+
+
+class SyncWatermark(BaseModel):
+    """
+    Watermark recording the latest service modifiedtime seen by a successful
+    incremental sync.
+    """
+
+    modified_since: datetime | None = None
+    updated_at: datetime | None = None
+
+
+StateType = TypeVar("StateType", MigrationCheckpoint, SyncWatermark)
+
+
+class LocalStateStore(Generic[StateType]):
+    """
+    Persists migration state to a local JSON file.
+    """
+
+    MODEL: ClassVar[type[BaseModel]]
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load(self) -> StateType:
+        """
+        Load the state from disk.
+        Returns an empty state if none has been saved yet.
+        """
+        if not self.path.exists():
+            return self.MODEL()
+
+        return self.MODEL.model_validate_json(self.path.read_text())
+
+    def save(self, state: StateType) -> None:
+        """
+        Save the state to disk.
+        The file is replaced atomically so a crash mid-write cannot corrupt it.
+        """
+        state.updated_at = datetime.now(UTC)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(state.model_dump_json())
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        """
+        Remove the saved state.
+        """
+        self.path.unlink(missing_ok=True)
+
+
+class MigrationCheckpointStore(LocalStateStore[MigrationCheckpoint]):
+    """
+    Persists the full sync checkpoint so that an interrupted sync
+    can be resumed without redoing completed work.
+    """
+
+    MODEL = MigrationCheckpoint
+
+
+class SyncWatermarkStore(LocalStateStore[SyncWatermark]):
+    """
+    Persists the incremental sync watermark between runs.
+    """
+
+    MODEL = SyncWatermark
+
+
+BatchType = TypeVar("BatchType")
+
+
+class BatchCompletionTracker(Generic[BatchType]):
+    """
+    Orders batches which may complete out of sequence, so that a checkpoint
+    is only ever advanced past batches which have all been completed.
+    """
+
+    def __init__(self, on_complete: Callable[[BatchType], None]) -> None:
+        self.on_complete = on_complete
+        self.next_sequence = 0
+        self.pending: dict[int, BatchType] = {}
+        self._lock = Lock()
+
+    def complete(self, sequence: int, batch: BatchType) -> None:
+        """
+        Mark a batch as complete.
+        The callback is run, in sequence order, for every batch that is now contiguous
+        with those already completed.
+        """
+        with self._lock:
+            self.pending[sequence] = batch
+            while self.next_sequence in self.pending:
+                self.on_complete(self.pending.pop(self.next_sequence))
+                self.next_sequence += 1
@@ -1,5 +1,6 @@
 import logging
 import os
+from enum import StrEnum
 from typing import Annotated, Tuple
 from urllib.parse import urlparse
 
@@ -60,6 +61,16 @@ class DatabaseConfig(BaseModel):
         return cls(**db_credentials)
 
 
+class LogVerbosity(StrEnum):
+    """
+    Controls whether full source and transformed records are included in per-record logs.
+    """
+
+    SUMMARY = "summary"
+    SAMPLED = "sampled"
+    FULL = "full"
+
+
 class DataMigrationConfig(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -69,6 +80,25 @@ class DataMigrationConfig(BaseSettings):
     env: Annotated[str, Field("local", alias="ENVIRONMENT")]
     workspace: Annotated[str | None, Field(None, alias="WORKSPACE")]
     dynamodb_endpoint: Annotated[str | None, Field(None, alias="ENDPOINT_URL")]
+    log_verbosity: Annotated[
+        LogVerbosity, Field(LogVerbosity.FULL, alias="LOG_VERBOSITY")
+    ]
+    log_sample_percent: Annotated[
+        float, Field(1.0, ge=0, le=100, alias="LOG_SAMPLE_PERCENT")
+    ]
+
+
+class PipelineConfig(BaseModel):
+    """
+    Settings for running the full sync as a pipeline of extract, transform and load stages.
+    """
+
+    load_workers: Annotated[
+        int, Field(default=4, ge=1, description="Threads writing batches to DynamoDB")
+    ]
+    queue_size: Annotated[
+        int, Field(default=2, ge=1, description="Batches buffered between each stage")
+    ]
 
 
 class QueuePopulatorConfig(BaseSettings):
@@ -85,6 +115,32 @@ class QueuePopulatorConfig(BaseSettings):
         list[int] | None,
         Field(default=None, description="List of status IDs to filter services by"),
     ]
+    supported_only: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Only include services matching a supported transformer",
+        ),
+    ]
+    records_per_message: Annotated[
+        int,
+        Field(
+            default=1,
+            ge=1,
+            le=100,
+            description="Record IDs sent in each message, using a batch event when above 1",
+        ),
+    ]
+    max_in_flight_batches: Annotated[
+        int,
+        Field(
+            default=10, ge=1, description="Maximum message batches sent concurrently"
+        ),
+    ]
+    max_retries: Annotated[
+        int,
+        Field(default=3, ge=0, description="Retries for messages which fail to send"),
+    ]
 
 
 class DmsDatabaseConfig:
@@ -1,17 +1,22 @@
-from typing import Iterable
+from itertools import groupby
+from operator import attrgetter
+from threading import local
+from typing import Iterable, Iterator
 
+import boto3
 from ftrs_common.logger import Logger
 from ftrs_data_layer.domain import legacy
 from ftrs_data_layer.domain.legacy import SymptomGroupSymptomDiscriminator
 from ftrs_data_layer.repository.base import ModelType
 from ftrs_data_layer.repository.dynamodb import AttributeLevelRepository
-from sqlalchemy import Engine, create_engine, distinct
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import joinedload
-from sqlmodel import Session, select
+from sqlmodel import Session, SQLModel, select
 
 from pipeline.utils.config import DatabaseConfig, DataMigrationConfig
 
-REPOSITORY_CACHE: dict[str, AttributeLevelRepository] = {}
+# Repositories are cached per thread, as boto3 sessions and resources are not thread-safe
+REPOSITORY_CACHE = local()
 
 
 def iter_records(
@@ -32,46 +37,97 @@ def iter_records(
         yield from session.scalars(stmt)
 
 
-def get_all_symptom_groups(engine: Engine) -> list[int]:
+def iter_symptom_discriminators_by_symptom_group(
+    engine: Engine, batch_size: int = 1000
+) -> Iterator[tuple[int, list[SymptomGroupSymptomDiscriminator]]]:
     """
-    Fetch all unique symptom group IDs from the SymptomGroupSymptomDiscriminator table.
+    Iterate over the symptom discriminator mappings grouped by symptom group.
+    All mappings are streamed from a single query ordered by symptom group ID.
 
     Args:
         engine: Database engine
+        batch_size: Number of rows to fetch at once
 
     Returns:
-        List of unique symptom group IDs
+        Iterable of symptom group IDs and their SymptomGroupSymptomDiscriminator records
     """
-    stmt = select(distinct(SymptomGroupSymptomDiscriminator.symptomgroupid))
+    stmt = (
+        select(SymptomGroupSymptomDiscriminator)
+        .options(
+            joinedload(SymptomGroupSymptomDiscriminator.symptomgroup),
+            joinedload(SymptomGroupSymptomDiscriminator.symptomdiscriminator),
+        )
+        .order_by(
+            SymptomGroupSymptomDiscriminator.symptomgroupid,
+            SymptomGroupSymptomDiscriminator.symptomdiscriminatorid,
+        )
+        .execution_options(yield_per=batch_size)
+    )
     with Session(engine) as session:
-        result = session.scalars(stmt)
-    return list(result.all())
-
-
-def get_symptom_discriminators_for_symptom_group(
-    engine: Engine, symptom_group_id: int
-) -> list[SymptomGroupSymptomDiscriminator]:
+        rows = session.scalars(stmt)
+        for sg_id, group in groupby(rows, key=attrgetter("symptomgroupid")):
+            yield sg_id, list(group)
+
+
+# Legacy tables holding records which belong directly to a service
+SERVICE_CHILD_MODELS: dict[str, type[SQLModel]] = {
+    model.__tablename__: model
+    for model in (
+        legacy.ServiceEndpoint,
+        legacy.ServiceDayOpening,
+        legacy.ServiceSpecifiedOpeningDate,
+        legacy.ServiceSGSD,
+        legacy.ServiceDisposition,
+        legacy.ServiceAgeRange,
+    )
+}
+
+# Legacy tables holding records which belong to a service through a child record
+SERVICE_GRANDCHILD_MODELS: dict[str, tuple[type[SQLModel], type[SQLModel], str]] = {
+    legacy.ServiceDayOpeningTime.__tablename__: (
+        legacy.ServiceDayOpeningTime,
+        legacy.ServiceDayOpening,
+        "servicedayopeningid",
+    ),
+    legacy.ServiceSpecifiedOpeningTime.__tablename__: (
+        legacy.ServiceSpecifiedOpeningTime,
+        legacy.ServiceSpecifiedOpeningDate,
+        "servicespecifiedopeningdateid",
+    ),
+}
+
+SERVICE_CHILD_TABLES = frozenset(SERVICE_CHILD_MODELS) | frozenset(
+    SERVICE_GRANDCHILD_MODELS
+)
+
+
+def get_parent_service_ids(
+    engine: Engine, table_name: str, record_ids: list[int]
+) -> list[int]:
     """
-    Fetch all symptom discriminator mappings for a specific symptom group.
+    Get the IDs of the services which the given child table records belong to.
+    Records which no longer exist are ignored.
 
     Args:
         engine: Database engine
-        symptom_group_id: ID of the symptom group to fetch discriminators for
+        table_name: Name of the legacy child table
+        record_ids: IDs of the changed records in the child table
 
     Returns:
-        List of SymptomGroupSymptomDiscriminator records
+        Sorted list of distinct service IDs
     """
-    query = (
-        select(SymptomGroupSymptomDiscriminator)
-        .where(SymptomGroupSymptomDiscriminator.symptomgroupid == symptom_group_id)
-        .options(
-            joinedload(SymptomGroupSymptomDiscriminator.symptomgroup),
-            joinedload(SymptomGroupSymptomDiscriminator.symptomdiscriminator),
+    if model := SERVICE_CHILD_MODELS.get(table_name):
+        stmt = select(model.serviceid).where(model.id.in_(record_ids))
+    else:
+        model, parent_model, parent_key = SERVICE_GRANDCHILD_MODELS[table_name]
+        stmt = (
+            select(parent_model.serviceid)
+            .join(model, getattr(model, parent_key) == parent_model.id)
+            .where(model.id.in_(record_ids))
         )
-    )
+
     with Session(engine) as session:
-        result = session.scalars(query)
-        return list(result.all())
+        return sorted(set(session.exec(stmt.distinct())))
 
 
 # TODO: Remove this method and use the common function once merged by IS
@@ -81,19 +137,31 @@ def get_repository(
     """
     Get a DynamoDB repository for the specified table and model class.
     Caches the repository to avoid creating multiple instances for the same table.
+
+    The cache is held per thread, and each thread creates its repositories from its own
+    boto3 session, so repositories can be used by concurrent workers without sharing
+    a resource between threads.
     """
     table_name = f"ftrs-dos-{config.env}-database-{entity_type}"
     if config.workspace:
         table_name = f"{table_name}-{config.workspace}"
 
-    if table_name not in REPOSITORY_CACHE:
-        REPOSITORY_CACHE[table_name] = AttributeLevelRepository[ModelType](
+    if not hasattr(REPOSITORY_CACHE, "repositories"):
+        REPOSITORY_CACHE.resource = boto3.session.Session().resource(
+            "dynamodb", endpoint_url=config.dynamodb_endpoint
+        )
+        REPOSITORY_CACHE.repositories = {}
+
+    repositories = REPOSITORY_CACHE.repositories
+    if table_name not in repositories:
+        repositories[table_name] = AttributeLevelRepository[ModelType](
             table_name=table_name,
             model_cls=model_cls,
             endpoint_url=config.dynamodb_endpoint,
             logger=logger,
+            resource=REPOSITORY_CACHE.resource,
         )
-    return REPOSITORY_CACHE[table_name]
+    return repositories[table_name]
 
 
 def get_sqlalchemy_engine_from_config(db_config: DatabaseConfig) -> Engine:
@@ -0,0 +1,32 @@
+import json
+from hashlib import blake2b
+from typing import Any
+
+# Fields which differ between every run, so are excluded when comparing records
+VOLATILE_FIELDS = frozenset({"createdDateTime", "modifiedDateTime"})
+
+
+def get_record_digest(
+    record: dict, ignore_fields: frozenset[str] = VOLATILE_FIELDS
+) -> bytes:
+    """
+    Get a digest of the content of a JSON serialised record.
+    Keys are sorted and the ignored fields are removed at every level of nesting,
+    so records with the same content always have the same digest.
+    """
+    content = json.dumps(_strip_fields(record, ignore_fields), sort_keys=True)
+    return blake2b(content.encode(), digest_size=16).digest()
+
+
+def _strip_fields(value: Any, ignore_fields: frozenset[str]) -> Any:  # noqa: ANN401
+    if isinstance(value, dict):
+        return {
+            key: _strip_fields(item, ignore_fields)
+            for key, item in value.items()
+            if key not in ignore_fields
+        }
+
+    if isinstance(value, list):
+        return [_strip_fields(item, ignore_fields) for item in value]
+
+    return value
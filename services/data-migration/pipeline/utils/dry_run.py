@@ -0,0 +1,225 @@
+import io
+import json
+from enum import StrEnum
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from ftrs_data_layer.domain.triage_code import TriageCode
+from pydantic import BaseModel
+
+from pipeline.seeding.backup import (
+    BACKUP_MODELS,
+    from_record_row,
+    get_record_schema,
+    to_record_row,
+)
+from pipeline.utils.digest import VOLATILE_FIELDS, get_record_digest
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Domain model of each output written by a dry run, in the order they are written
+DRY_RUN_MODELS: dict[str, type[BaseModel]] = {
+    **BACKUP_MODELS,
+    "triage-code": TriageCode,
+}
+
+
+class DryRunFormat(StrEnum):
+    """
+    File format used to store the output of a dry run.
+    """
+
+    JSONL = "jsonl"
+    JSONL_ZSTD = "jsonl.zst"
+    PARQUET = "parquet"
+
+
+class DryRunWriter:
+    """
+    Writes the dry run records of a single output type to a local file.
+
+    Records are serialised as they are written but buffered in memory, and written to
+    the file in batches. For Parquet output, each batch is written as a row group with
+    one column per field of the model, using the same types as typed backups.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        output_format: DryRunFormat = DryRunFormat.JSONL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        model_cls: type[BaseModel] | None = None,
+    ) -> None:
+        if output_format == DryRunFormat.PARQUET and model_cls is None:
+            raise ValueError("A model is required to write Parquet dry run output")
+
+        self.path = path
+        self.output_format = output_format
+        self.batch_size = batch_size
+        self.model_cls = model_cls
+        self.records: list = []
+
+        match output_format:
+            case DryRunFormat.PARQUET:
+                self.file = pq.ParquetWriter(
+                    path, get_record_schema(model_cls), compression="zstd"
+                )
+            case DryRunFormat.JSONL_ZSTD:
+                self.file = pa.output_stream(path, compression="zstd")
+            case _:
+                self.file = open(path, "w")
+
+    def write(self, records: Iterable[BaseModel]) -> None:
+        """
+        Add records to the buffer, writing the buffer once it reaches the batch size.
+        """
+        for record in records:
+            if self.output_format == DryRunFormat.PARQUET:
+                self.records.append(
+                    to_record_row(record.model_dump(mode="json"), self.model_cls)
+                )
+            else:
+                self.records.append(record.model_dump_json())
+
+        if len(self.records) >= self.batch_size:
+            self._write_buffer()
+
+    def flush(self) -> None:
+        """
+        Write any buffered records and flush the file.
+        """
+        self._write_buffer()
+        if self.output_format != DryRunFormat.PARQUET:
+            self.file.flush()
+
+    def close(self) -> None:
+        """
+        Write any buffered records and close the file.
+        """
+        self._write_buffer()
+        self.file.close()
+
+    def _write_buffer(self) -> None:
+        if not self.records:
+            return
+
+        match self.output_format:
+            case DryRunFormat.PARQUET:
+                self.file.write_table(
+                    pa.Table.from_pylist(self.records, schema=self.file.schema)
+                )
+            case DryRunFormat.JSONL_ZSTD:
+                self.file.write("".join(r + "\n" for r in self.records).encode())
+            case _:
+                self.file.writelines(r + "\n" for r in self.records)
+
+        self.records = []
+
+
+class DryRunDiff(BaseModel):
+    output: str
+    added: list[str]
+    removed: list[str]
+    changed: list[str]
+    unchanged: int = 0
+
+
+def get_dry_run_path(
+    output_dir: Path, output: str, output_format: DryRunFormat
+) -> Path:
+    """
+    Get the path of the file holding the given dry run output.
+    """
+    return output_dir / f"{output}.{output_format}"
+
+
+def find_dry_run_file(output_dir: Path, output: str) -> Path | None:
+    """
+    Find the file holding the given dry run output, in whichever format it was written.
+    """
+    for output_format in DryRunFormat:
+        if (path := get_dry_run_path(output_dir, output, output_format)).exists():
+            return path
+
+    return None
+
+
+def read_dry_run_file(
+    path: Path, model_cls: type[BaseModel] | None = None
+) -> Iterator[dict]:
+    """
+    Read the records from a dry run output file.
+    Records are streamed from the file rather than loaded all at once.
+    Parquet rows are converted back into the JSON form of the given model.
+    """
+    if path.name.endswith(f".{DryRunFormat.PARQUET}"):
+        if model_cls is None:
+            raise ValueError("A model is required to read Parquet dry run output")
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield from_record_row(row, model_cls)
+        return
+
+    if path.name.endswith(f".{DryRunFormat.JSONL_ZSTD}"):
+        with pa.input_stream(path, compression="zstd") as stream:
+            yield from _read_lines(io.TextIOWrapper(stream, encoding="utf-8"))
+        return
+
+    with open(path) as file:
+        yield from _read_lines(file)
+
+
+def diff_dry_runs(
+    left_dir: Path,
+    right_dir: Path,
+    ignore_fields: frozenset[str] = VOLATILE_FIELDS,
+) -> list[DryRunDiff]:
+    """
+    Compare the output of two dry runs, which may have been written in different formats.
+
+    Records are matched on their ID (and field, for triage codes). Only a digest of
+    each record in the left run is held in memory while the right run is streamed.
+    """
+    diffs = []
+    for output, model_cls in DRY_RUN_MODELS.items():
+        left_path = find_dry_run_file(left_dir, output)
+        right_path = find_dry_run_file(right_dir, output)
+        if left_path is None and right_path is None:
+            continue
+
+        left = {
+            _get_record_key(record): get_record_digest(record, ignore_fields)
+            for record in (read_dry_run_file(left_path, model_cls) if left_path else [])
+        }
+        diff = DryRunDiff(output=output, added=[], removed=[], changed=[])
+
+        for record in read_dry_run_file(right_path, model_cls) if right_path else []:
+            key = _get_record_key(record)
+            digest = left.pop(key, None)
+            if digest is None:
+                diff.added.append(key)
+            elif digest != get_record_digest(record, ignore_fields):
+                diff.changed.append(key)
+            else:
+                diff.unchanged += 1
+
+        diff.removed = list(left)
+        diffs.append(diff)
+
+    return diffs
+
+
+def _read_lines(file: Iterable[str]) -> Iterator[dict]:
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _get_record_key(record: dict) -> str:
+    if "field" in record:
+        return f"{record.get('id')}#{record['field']}"
+
+    return str(record.get("id"))
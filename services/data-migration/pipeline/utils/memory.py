@@ -0,0 +1,17 @@
+import resource
+from pathlib import Path
+
+STATM_PATH = Path("/proc/self/statm")
+
+
+def get_rss_mb() -> float | None:
+    """
+    Get the current resident set size of the current process in megabytes.
+    Returns None if it cannot be read, as /proc is only available on Linux.
+    """
+    try:
+        resident_pages = int(STATM_PATH.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return resident_pages * resource.getpagesize() / (1024 * 1024)
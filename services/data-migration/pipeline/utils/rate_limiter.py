@@ -0,0 +1,49 @@
+from threading import Lock
+from time import monotonic, sleep
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are added continuously at the given rate, up to the capacity of the bucket.
+    Callers block in `acquire` until enough tokens are available. A request for more
+    tokens than the capacity waits for a full bucket and leaves it in debt, so that
+    large requests are still limited to the overall rate.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Wait until the given number of tokens is available and take them.
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                required = min(tokens, self.capacity)
+                if self._tokens >= required:
+                    self._tokens -= tokens
+                    return waited
+
+                wait = (required - self._tokens) / self.rate
+
+            sleep(wait)
+            waited += wait
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
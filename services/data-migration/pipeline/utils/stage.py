@@ -0,0 +1,103 @@
+from queue import Queue
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType")
+
+_STOP = object()
+
+
+class StageMetrics(BaseModel):
+    name: str
+    workers: int = 1
+    processed_items: int = 0
+    errors: int = 0
+    busy_time: float = 0.0
+    elapsed_time: float = 0.0
+    max_queue_depth: int = 0
+
+    @property
+    def items_per_second(self) -> float:
+        """
+        Throughput of the stage over its lifetime.
+        """
+        return self.processed_items / self.elapsed_time if self.elapsed_time else 0.0
+
+
+class PipelineStage(Generic[ItemType]):
+    """
+    A stage of a processing pipeline.
+
+    Items are consumed from a bounded input queue by a pool of worker threads.
+    Producers block while the queue is full, which applies backpressure to earlier stages.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[ItemType], None],
+        workers: int = 1,
+        queue_size: int = 1,
+    ) -> None:
+        self.handler = handler
+        self.queue: Queue = Queue(maxsize=queue_size)
+        self.metrics = StageMetrics(name=name, workers=workers)
+        self.exception: Exception | None = None
+        self._lock = Lock()
+        self._start_time = perf_counter()
+        self._threads = [
+            Thread(target=self._work, name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+
+    def start(self) -> None:
+        """
+        Start the stage worker threads.
+        """
+        self._start_time = perf_counter()
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, item: ItemType) -> None:
+        """
+        Add an item to the stage, blocking until there is space in the queue.
+        """
+        self.queue.put(item)
+        with self._lock:
+            self.metrics.max_queue_depth = max(
+                self.metrics.max_queue_depth, self.queue.qsize()
+            )
+
+    def join(self) -> None:
+        """
+        Wait for all queued items to be processed and stop the worker threads.
+        """
+        for _ in self._threads:
+            self.queue.put(_STOP)
+
+        for thread in self._threads:
+            thread.join()
+
+        self.metrics.elapsed_time = perf_counter() - self._start_time
+
+    def _work(self) -> None:
+        """
+        Process items from the queue until the stage is stopped.
+        Unexpected errors are recorded so they can be raised once the pipeline has drained,
+        and the worker carries on so that earlier stages are never left blocked.
+        """
+        while (item := self.queue.get()) is not _STOP:
+            start_time = perf_counter()
+            try:
+                self.handler(item)
+            except Exception as e:
+                with self._lock:
+                    self.metrics.errors += 1
+                    self.exception = self.exception or e
+            finally:
+                with self._lock:
+                    self.metrics.processed_items += 1
+                    self.metrics.busy_time += perf_counter() - start_time
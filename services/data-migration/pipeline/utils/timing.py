@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from math import ceil
+
+from pydantic import BaseModel, Field
+
+# Upper bounds of the histogram buckets in milliseconds.
+# Durations above the last bound are counted in a final overflow bucket.
+TIMING_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageTiming(BaseModel):
+    """
+    Cumulative time and a latency histogram for one stage of processing.
+    """
+
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    buckets: list[int] = Field(
+        default_factory=lambda: [0] * (len(TIMING_BUCKETS_MS) + 1)
+    )
+
+    def record(self, elapsed_time: float) -> None:
+        """
+        Record a single duration, in seconds.
+        """
+        self.count += 1
+        self.total_time += elapsed_time
+        self.max_time = max(self.max_time, elapsed_time)
+        self.buckets[bisect_left(TIMING_BUCKETS_MS, elapsed_time * 1000)] += 1
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimate a percentile of the recorded durations in milliseconds.
+        The upper bound of the bucket containing the percentile is returned,
+        capped at the longest duration recorded.
+        """
+        if not self.count:
+            return 0.0
+
+        max_ms = self.max_time * 1000
+        rank = max(ceil(self.count * percentile / 100), 1)
+        cumulative_count = 0
+
+        for index, bucket_count in enumerate(self.buckets):
+            cumulative_count += bucket_count
+            if cumulative_count >= rank:
+                break
+
+        if index >= len(TIMING_BUCKETS_MS):
+            return max_ms
+
+        return min(float(TIMING_BUCKETS_MS[index]), max_ms)
+
+    def summary(self) -> dict:
+        """
+        Summarise the recorded durations.
+        """
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "mean_ms": self.total_time * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_time * 1000,
+        }
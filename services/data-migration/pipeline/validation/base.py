@@ -19,6 +19,13 @@ class Validator(ABC, Generic[TypeToValidate]):
     def validate(self, data: TypeToValidate) -> ValidationResult:
         raise NotImplementedError("Subclasses must implement this method")
 
+    def validate_many(self, data: list[TypeToValidate]) -> list[ValidationResult]:
+        """
+        Run validation over a batch of records, returning a result for each record in order.
+        Subclasses may override this to validate each field across the whole batch.
+        """
+        return [self.validate(item) for item in data]
+
     @classmethod
     def validate_email(
         cls,
@@ -40,3 +47,25 @@ class Validator(ABC, Generic[TypeToValidate]):
         Run the phone number field validator over a phone number value
         """
         return PhoneNumberValidator(expression).validate(phone_number)
+
+    @classmethod
+    def validate_emails(
+        cls,
+        emails: list[str],
+        expression: str = "email",
+    ) -> list[FieldValidationResult[str]]:
+        """
+        Run the email field validator over a column of emails
+        """
+        return EmailValidator.validate_many(emails, expression)
+
+    @classmethod
+    def validate_phone_numbers(
+        cls,
+        phone_numbers: list[str],
+        expression: str = "publicphone",
+    ) -> list[FieldValidationResult[str]]:
+        """
+        Run the phone number field validator over a column of phone numbers
+        """
+        return PhoneNumberValidator.validate_many(phone_numbers, expression)
@@ -31,6 +31,21 @@ class FieldValidator(ABC, Generic[FieldType]):
         """
         raise NotImplementedError("Subclasses must implement this method")
 
+    @classmethod
+    def validate_many(
+        cls, values: list[FieldType], expression: str | None = None
+    ) -> list[FieldValidationResult[FieldType]]:
+        """
+        Run validation over a column of values, returning a result for each value in order.
+        Repeated values are only validated once and share the same result.
+        """
+        results: dict[FieldType, FieldValidationResult[FieldType]] = {}
+        for value in values:
+            if value not in results:
+                results[value] = cls(expression).validate(value)
+
+        return [results[value] for value in values]
+
     def add_issue(
         self,
         severity: ValidationIssueSeverity,
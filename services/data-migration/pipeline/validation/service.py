@@ -17,44 +17,58 @@ class ServiceValidator(Validator[Service]):
     def validate(self, data: Service) -> ValidationResult[Service]:
         """
         Run validation over the service.
+        """
+        return self.validate_many([data])[0]
+
+    def validate_many(self, data: list[Service]) -> list[ValidationResult[Service]]:
+        """
+        Run validation over a batch of services.
+        Each field is validated across the whole batch before the results are
+        combined into one result per service.
 
         Runs:
         - Email validation
         - Phone number validation (publicphone)
+        - Phone number validation (nonpublicphone)
         """
-        validation_result = ValidationResult[Service](
-            origin_record_id=data.id,
-            issues=[],
-            sanitised=data,
-        )
-
-        if email_result := self.validate_email(data.email):
-            data.email = email_result.sanitised
-            validation_result.issues.extend(email_result.issues)
+        field_results = {
+            "email": self.validate_emails([service.email for service in data]),
+            "publicphone": self.validate_phone_numbers(
+                [service.publicphone for service in data]
+            ),
+            "nonpublicphone": self.validate_phone_numbers(
+                [service.nonpublicphone for service in data],
+                expression="nonpublicphone",
+            ),
+        }
+
+        validation_results = []
+        for index, service in enumerate(data):
+            validation_result = ValidationResult[Service](
+                origin_record_id=service.id,
+                issues=[],
+                sanitised=service,
+            )
 
-        if publicphone_result := self.validate_phone_number(data.publicphone):
-            data.publicphone = publicphone_result.sanitised
-            validation_result.issues.extend(publicphone_result.issues)
+            for field, results in field_results.items():
+                setattr(service, field, results[index].sanitised)
+                validation_result.issues.extend(results[index].issues)
 
-        if nonpublicphone_result := self.validate_phone_number(
-            data.nonpublicphone,
-            expression="nonpublicphone",
-        ):
-            data.nonpublicphone = nonpublicphone_result.sanitised
-            validation_result.issues.extend(nonpublicphone_result.issues)
+            validation_results.append(validation_result)
 
-        return validation_result
+        return validation_results
 
 
 class GPPracticeValidator(ServiceValidator):
-    def validate(self, data: Service) -> ValidationResult[Service]:
-        result = super().validate(data)
+    def validate_many(self, data: list[Service]) -> list[ValidationResult[Service]]:
+        results = super().validate_many(data)
 
-        if name_result := self.validate_name(data.publicname):
-            data.publicname = name_result.sanitised
-            result.issues.extend(name_result.issues)
+        for service, result in zip(data, results, strict=True):
+            if name_result := self.validate_name(service.publicname):
+                service.publicname = name_result.sanitised
+                result.issues.extend(name_result.issues)
 
-        return result
+        return results
 
     def validate_name(self, name: str) -> FieldValidationResult[str]:
         result = FieldValidationResult(
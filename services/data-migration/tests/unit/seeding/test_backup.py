@@ -0,0 +1,102 @@
+import json
+
+import pyarrow as pa
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+from ftrs_common.mocks.mock_logger import MockLogger
+from ftrs_data_layer.domain import HealthcareService, Location, Organisation
+from ftrs_data_layer.domain.legacy import Service
+from pydantic import BaseModel
+
+from pipeline.seeding.backup import (
+    RAW_SCHEMA,
+    BackupFormat,
+    from_backup_record,
+    get_backup_format,
+    get_backup_schema,
+    to_backup_record,
+)
+from pipeline.transformer import GPPracticeTransformer
+from pipeline.utils.cache import DoSMetadataCache
+
+
+@pytest.fixture
+def mock_records(
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    mock_metadata_cache: DoSMetadataCache,
+) -> dict[type[BaseModel], BaseModel]:
+    transformer = GPPracticeTransformer(
+        logger=mock_logger, metadata=mock_metadata_cache
+    )
+    output = transformer.transform(mock_legacy_service, [])
+    return {
+        Organisation: output.organisation[0],
+        Location: output.location[0],
+        HealthcareService: output.healthcare_service[0],
+    }
+
+
+def to_dynamodb_item(record: BaseModel) -> dict:
+    serializer = TypeSerializer()
+    item = {"id": str(record.id), "field": "document", **record.model_dump(mode="json")}
+    return {key: serializer.serialize(value) for key, value in item.items()}
+
+
+@pytest.mark.parametrize("model_cls", [Organisation, Location, HealthcareService])
+def test_backup_record_round_trip(
+    model_cls: type[BaseModel], mock_records: dict[type[BaseModel], BaseModel]
+) -> None:
+    item = to_dynamodb_item(mock_records[model_cls])
+    schema = get_backup_schema(model_cls)
+
+    row = to_backup_record(json.dumps({"Item": item}), model_cls)
+    table = pa.Table.from_pylist([row], schema=schema)
+
+    assert from_backup_record(table.to_pylist()[0], model_cls) == item
+
+
+def test_get_backup_schema() -> None:
+    schema = get_backup_schema(HealthcareService)
+
+    assert schema.names[:2] == ["id", "field"]
+    assert schema.field("active").type == pa.bool_()
+    assert schema.field("telecom").type == pa.struct(
+        [
+            ("phone_public", pa.string()),
+            ("phone_private", pa.string()),
+            ("email", pa.string()),
+            ("web", pa.string()),
+        ]
+    )
+    # Opening times combine the fields of each type of opening time
+    opening_time_type = schema.field("openingTime").type.value_type
+    assert [field.name for field in opening_time_type] == [
+        "category",
+        "dayOfWeek",
+        "startTime",
+        "endTime",
+        "allDay",
+        "description",
+    ]
+    # Code IDs may be integers or strings, so are stored as JSON
+    disposition_type = schema.field("dispositions").type.value_type
+    assert disposition_type.field("codeID").type == pa.string()
+    assert disposition_type.field("time").type == pa.int64()
+
+
+def test_to_backup_record_json_values(
+    mock_records: dict[type[BaseModel], BaseModel],
+) -> None:
+    item = to_dynamodb_item(mock_records[HealthcareService])
+
+    row = to_backup_record(json.dumps({"Item": item}), HealthcareService)
+
+    assert row["dispositions"][0]["codeID"] == json.dumps(
+        mock_records[HealthcareService].dispositions[0].codeID
+    )
+
+
+def test_get_backup_format() -> None:
+    assert get_backup_format(RAW_SCHEMA) == BackupFormat.RAW
+    assert get_backup_format(get_backup_schema(Organisation)) == BackupFormat.TYPED
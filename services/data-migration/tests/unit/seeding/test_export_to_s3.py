@@ -1,18 +1,22 @@
 import gzip
 import json
+import shutil
 from io import BytesIO
+from pathlib import Path
 
-import pandas as pd
+import pyarrow.parquet as pq
 import pytest
+from ftrs_data_layer.domain import Location, Organisation
 from pytest_mock import MockerFixture
 
+from pipeline.seeding.backup import BackupFormat, get_backup_schema
 from pipeline.seeding.export_to_s3 import (
-    decompress_and_parse_files,
-    download_exported_files,
     export_table,
     get_export_file_list,
     get_migration_store_bucket_name,
     is_export_complete,
+    iter_export_files,
+    parse_export_lines,
     process_export,
     run_s3_export,
     trigger_table_export,
@@ -198,30 +202,48 @@ async def test_export_table(mocker: MockerFixture) -> None:
     mock_sleep.assert_called()
 
 
-@pytest.mark.asyncio
-async def test_process_export(mocker: MockerFixture) -> None:
+def test_process_export(mocker: MockerFixture, tmp_path: Path) -> None:
     get_file_list_mock = mocker.patch(
         "pipeline.seeding.export_to_s3.get_export_file_list"
     )
     get_file_list_mock.return_value = ["file1", "file2"]
 
-    download_files_mock = mocker.patch(
-        "pipeline.seeding.export_to_s3.download_exported_files"
+    iter_files_mock = mocker.patch("pipeline.seeding.export_to_s3.iter_export_files")
+    iter_files_mock.return_value = iter(
+        [
+            ['{"Item": {"id": 1}}', '{"Item": {"id": 2}}', '{"Item": {"id": 3}}'],
+            ['{"Item": {"id": 4}}'],
+        ]
     )
-    download_files_mock.return_value = [
-        gzip.compress(b'{"Item": {"id": 1}}'),
-        gzip.compress(b'{"Item": {"id": 2}}'),
-    ]
+    mocker.patch("pipeline.seeding.export_to_s3.ROW_GROUP_SIZE", 2)
 
-    result = await process_export(
-        {"S3Bucket": "test_s3_bucket_name", "ExportManifest": "test_export_manifest"}
+    uploaded = tmp_path / "uploaded.parquet"
+    upload_mock = mocker.patch(
+        "pipeline.seeding.export_to_s3.wr.s3.upload",
+        side_effect=lambda local_file, path: shutil.copy(local_file, uploaded),
     )
 
-    assert isinstance(result, pd.DataFrame)
+    description = {
+        "S3Bucket": "test_s3_bucket_name",
+        "ExportManifest": "test_export_manifest",
+    }
+    result = process_export(
+        description, "s3://test_s3_bucket_name/backups/test.parquet"
+    )
+
+    assert result == 4  # noqa: PLR2004
+    iter_files_mock.assert_called_once_with(description, ["file1", "file2"])
+    assert upload_mock.call_args.kwargs["path"] == (
+        "s3://test_s3_bucket_name/backups/test.parquet"
+    )
 
-    assert result.to_dict(orient="records") == [
+    parquet_file = pq.ParquetFile(uploaded)
+    assert parquet_file.num_row_groups == 2  # noqa: PLR2004
+    assert parquet_file.read().to_pylist() == [
         {"data": '{"Item": {"id": 1}}'},
         {"data": '{"Item": {"id": 2}}'},
+        {"data": '{"Item": {"id": 3}}'},
+        {"data": '{"Item": {"id": 4}}'},
     ]
 
 
@@ -256,86 +278,65 @@ def test_get_export_file_list(mocker: MockerFixture) -> None:
     )
 
 
-def test_download_exported_files(mocker: MockerFixture) -> None:
+def test_iter_export_files(mocker: MockerFixture) -> None:
     get_object_mock = mocker.patch("pipeline.seeding.export_to_s3.S3_CLIENT.get_object")
-    get_object_mock.side_effect = [
-        {"Body": BytesIO(b'{"Item": {"id": 1}}')},
-        {"Body": BytesIO(b'{"Item": {"id": 2}}')},
-    ]
+    get_object_mock.side_effect = lambda Bucket, Key: {
+        "Body": BytesIO(
+            gzip.compress(
+                f"""
+                {{"Item": {{"id": "{Key}-1"}}}}
+                {{"Item": {{"id": "{Key}-2"}}}}
+                """.encode()
+            )
+        )
+    }
 
-    result = download_exported_files(
-        {
-            "S3Bucket": "test_s3_bucket_name",
-            "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table",
-        },
-        [{"dataFileS3Key": "file1"}, {"dataFileS3Key": "file2"}],
+    result = list(
+        iter_export_files(
+            {
+                "S3Bucket": "test_s3_bucket_name",
+                "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table",
+            },
+            [{"dataFileS3Key": f"file{i}"} for i in range(5)],
+            max_in_flight=2,
+        )
     )
 
+    # Records are yielded in manifest order, one list per file
     assert result == [
-        b'{"Item": {"id": 1}}',
-        b'{"Item": {"id": 2}}',
+        [f'{{"Item": {{"id": "file{i}-1"}}}}', f'{{"Item": {{"id": "file{i}-2"}}}}']
+        for i in range(5)
     ]
 
-    expected_call_count = 2
+    expected_call_count = 5
     assert get_object_mock.call_count == expected_call_count
-
-    get_object_mock.assert_has_calls(
-        [
-            mocker.call(Bucket="test_s3_bucket_name", Key="file1"),
-            mocker.call(Bucket="test_s3_bucket_name", Key="file2"),
-        ]
-    )
+    get_object_mock.assert_any_call(Bucket="test_s3_bucket_name", Key="file0")
 
 
-def test_decompress_and_parse_files() -> None:
-    result = decompress_and_parse_files(
+def test_parse_export_lines() -> None:
+    result = parse_export_lines(
         [
-            gzip.compress(
-                b"""
-                {"Item": {"id": 1}}
-                {"Item": {"id": 2}}
-                {"Item": {"id": 3}}
-                """
-            ),
-            gzip.compress(
-                b"""
-                {"Item": {"id": 4}}
-                {"Item": {"id": 5}}
-                {"Item": {"id": 6}}
-                """
-            ),
+            "\n",
+            '  {"Item": {"id": 1}}\n',
+            '{"Item": {"id": 2}}\n',
+            "   ",
         ]
     )
 
-    assert result == [
-        '{"Item": {"id": 1}}',
-        '{"Item": {"id": 2}}',
-        '{"Item": {"id": 3}}',
-        '{"Item": {"id": 4}}',
-        '{"Item": {"id": 5}}',
-        '{"Item": {"id": 6}}',
-    ]
+    assert result == ['{"Item": {"id": 1}}', '{"Item": {"id": 2}}']
 
 
 @pytest.mark.asyncio
 async def test_run_s3_export(mocker: MockerFixture) -> None:
     export_task_mock = mocker.patch("pipeline.seeding.export_to_s3.export_table")
     process_export_mock = mocker.patch("pipeline.seeding.export_to_s3.process_export")
-    to_parquet_mock = mocker.patch("pipeline.seeding.export_to_s3.wr.s3.to_parquet")
     mock_set_parameter = mocker.patch("pipeline.seeding.export_to_s3.set_parameter")
 
-    export_task_mock.side_effect = [
-        {
-            "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table_1",
-            "S3Bucket": "test_s3_bucket_name",
-        },
-        {
-            "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table_2",
-            "S3Bucket": "test_s3_bucket_name",
-        },
-    ]
-    mock_processed_exports = [mocker.Mock(shape=[1]), mocker.Mock(shape=[1])]
-    process_export_mock.side_effect = mock_processed_exports
+    export_task_mock.side_effect = lambda entity_name, env, workspace: {
+        "TableArn": f"arn:aws:dynamodb:region:account-id:table/test_{entity_name}",
+        "S3Bucket": "test_s3_bucket_name",
+    }
+    process_export_mock.return_value = 1
 
     await run_s3_export("local", "workspace")
 
@@ -343,49 +344,94 @@ async def test_run_s3_export(mocker: MockerFixture) -> None:
         [
             mocker.call("location", "local", "workspace"),
             mocker.call("organisation", "local", "workspace"),
-        ]
+        ],
+        any_order=True,
     )
 
     process_export_mock.assert_has_calls(
         [
             mocker.call(
                 {
-                    "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table_1",
+                    "TableArn": "arn:aws:dynamodb:region:account-id:table/test_location",
                     "S3Bucket": "test_s3_bucket_name",
-                }
+                },
+                "s3://test_s3_bucket_name/backups/test_location.parquet",
+                None,
             ),
             mocker.call(
                 {
-                    "TableArn": "arn:aws:dynamodb:region:account-id:table/test_table_2",
+                    "TableArn": "arn:aws:dynamodb:region:account-id:table/test_organisation",
                     "S3Bucket": "test_s3_bucket_name",
-                }
+                },
+                "s3://test_s3_bucket_name/backups/test_organisation.parquet",
+                None,
             ),
         ],
         any_order=True,
     )
 
-    to_parquet_mock.assert_has_calls(
-        [
-            mocker.call(
-                df=mock_processed_exports[0],
-                path="s3://test_s3_bucket_name/backups/test_table_1.parquet",
-                dataset=False,
-            ),
-            mocker.call(
-                df=mock_processed_exports[1],
-                path="s3://test_s3_bucket_name/backups/test_table_2.parquet",
-                dataset=False,
-            ),
-        ]
+    mock_set_parameter.assert_called_once()
+    assert mock_set_parameter.call_args.kwargs["name"] == (
+        "/ftrs-dos/local/dynamodb-backup-arns"
     )
+    assert json.loads(mock_set_parameter.call_args.kwargs["value"]) == {
+        "location": "s3://test_s3_bucket_name/backups/test_location.parquet",
+        "organisation": "s3://test_s3_bucket_name/backups/test_organisation.parquet",
+    }
 
-    mock_set_parameter.assert_called_once_with(
-        name="/ftrs-dos/local/dynamodb-backup-arns",
-        value=json.dumps(
-            {
-                "test_table_1": "s3://test_s3_bucket_name/backups/test_table_1.parquet",
-                "test_table_2": "s3://test_s3_bucket_name/backups/test_table_2.parquet",
-            }
-        ),
-        overwrite=True,
+
+@pytest.mark.asyncio
+async def test_run_s3_export_typed(mocker: MockerFixture) -> None:
+    export_task_mock = mocker.patch("pipeline.seeding.export_to_s3.export_table")
+    process_export_mock = mocker.patch("pipeline.seeding.export_to_s3.process_export")
+    mocker.patch("pipeline.seeding.export_to_s3.set_parameter")
+
+    export_task_mock.side_effect = lambda entity_name, env, workspace: {
+        "TableArn": f"arn:aws:dynamodb:region:account-id:table/{entity_name}",
+        "S3Bucket": "test_s3_bucket_name",
+    }
+    process_export_mock.return_value = 1
+
+    await run_s3_export("local", "workspace", BackupFormat.TYPED)
+
+    assert {
+        call.args[0]["TableArn"].rsplit("/")[-1]: call.args[2]
+        for call in process_export_mock.call_args_list
+    } == {"location": Location, "organisation": Organisation}
+
+
+def test_process_export_typed(mocker: MockerFixture, tmp_path: Path) -> None:
+    organisation = Organisation(
+        identifier_ODS_ODSCode="A12345",
+        active=True,
+        name="Test Organisation",
+        type="GP Practice",
+    )
+    item = {
+        "id": {"S": str(organisation.id)},
+        "field": {"S": "document"},
+        **{
+            key: {"S": value}
+            for key, value in organisation.model_dump(mode="json").items()
+            if isinstance(value, str)
+        },
+        "active": {"BOOL": True},
+        "endpoints": {"L": []},
+    }
+    mocker.patch("pipeline.seeding.export_to_s3.get_export_file_list")
+    mocker.patch(
+        "pipeline.seeding.export_to_s3.iter_export_files",
+        return_value=iter([[json.dumps({"Item": item})]]),
     )
+    uploaded = tmp_path / "uploaded.parquet"
+    mocker.patch(
+        "pipeline.seeding.export_to_s3.wr.s3.upload",
+        side_effect=lambda local_file, path: shutil.copy(local_file, uploaded),
+    )
+
+    result = process_export({}, "s3://bucket/backups/test.parquet", Organisation)
+
+    assert result == 1
+    table = pq.read_table(uploaded, filters=[("identifier_ODS_ODSCode", "=", "A12345")])
+    assert table.schema == get_backup_schema(Organisation)
+    assert table.column("name").to_pylist() == ["Test Organisation"]
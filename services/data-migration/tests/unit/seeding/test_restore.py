@@ -1,13 +1,32 @@
 import json
+import shutil
+from pathlib import Path
 from typing import Generator
 from unittest.mock import MagicMock
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError
+from ftrs_data_layer.domain import Organisation
 from pytest_mock import MockerFixture
 
-from pipeline.seeding.restore import iter_batches, run_s3_restore, write_item_batch
+from pipeline.seeding.backup import get_backup_schema, to_backup_record
+from pipeline.seeding.restore import (
+    DEFAULT_WCU_BUDGET,
+    MAX_WRITE_ATTEMPTS,
+    FailureLedger,
+    RestoreProgress,
+    get_write_units,
+    iter_batches,
+    read_backup_items,
+    restore_backup,
+    restore_table,
+    run_s3_restore,
+    write_item_batch,
+)
+from pipeline.utils.rate_limiter import TokenBucket
 
 
 @pytest.fixture(autouse=True)
@@ -19,7 +38,7 @@ def test_iter_batches() -> None:
     """
     Test that iter_batches returns items in batches.
     """
-    items = [json.dumps({"Item": {"id": i}}) for i in range(100)]
+    items = [{"id": i} for i in range(100)]
 
     expected_batch_size = 25
     expected_batch_count = 4
@@ -31,87 +50,271 @@ def test_iter_batches() -> None:
     assert batches[0][0] == {"id": 0}
 
 
-def test_write_item_batch(mocker: MockerFixture) -> None:
+@pytest.fixture
+def mock_rate_limiter(mocker: MockerFixture) -> MagicMock:
+    return mocker.MagicMock(spec=TokenBucket)
+
+
+@pytest.fixture
+def mock_sleep(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch("pipeline.seeding.restore.sleep")
+
+
+def test_write_item_batch(mocker: MockerFixture, mock_rate_limiter: MagicMock) -> None:
     ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
-    ddb_mock.transact_write_items.return_value = None
+    ddb_mock.batch_write_item.return_value = {
+        "UnprocessedItems": {},
+        "ConsumedCapacity": [{"TableName": "test_table", "CapacityUnits": 5.0}],
+    }
+    progress = RestoreProgress(table_name="test_table", total_items=5)
+    ledger = FailureLedger()
 
-    items = [{"id": i} for i in range(5)]
+    items = [{"id": {"N": str(i)}} for i in range(5)]
 
-    write_item_batch("test_table", items)
+    write_item_batch("test_table", items, mock_rate_limiter, progress, ledger)
 
-    ddb_mock.transact_write_items.assert_called_once_with(
-        TransactItems=[
-            {"Put": {"TableName": "test_table", "Item": {"id": 0}}},
-            {"Put": {"TableName": "test_table", "Item": {"id": 1}}},
-            {"Put": {"TableName": "test_table", "Item": {"id": 2}}},
-            {"Put": {"TableName": "test_table", "Item": {"id": 3}}},
-            {"Put": {"TableName": "test_table", "Item": {"id": 4}}},
-        ]
+    ddb_mock.batch_write_item.assert_called_once_with(
+        RequestItems={"test_table": [{"PutRequest": {"Item": item}} for item in items]},
+        ReturnConsumedCapacity="TOTAL",
     )
+    mock_rate_limiter.acquire.assert_called_once_with(5)
+    assert progress.written_items == 5  # noqa: PLR2004
+    assert progress.consumed_wcu == 5  # noqa: PLR2004
+    assert ledger.entries == []
 
 
-def test_write_item_batch_backoff(
-    mocker: MockerFixture,
-    mock_console: MagicMock,
+def test_write_item_batch_unprocessed_items(
+    mocker: MockerFixture, mock_rate_limiter: MagicMock, mock_sleep: MagicMock
 ) -> None:
     ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
-    sleep_mock = mocker.patch("pipeline.seeding.restore.sleep")
+    items = [{"id": {"N": str(i)}} for i in range(5)]
+    ddb_mock.batch_write_item.side_effect = [
+        {"UnprocessedItems": {"test_table": [{"PutRequest": {"Item": items[4]}}]}},
+        {"UnprocessedItems": {}},
+    ]
+    progress = RestoreProgress(table_name="test_table", total_items=5)
+    ledger = FailureLedger()
+
+    write_item_batch("test_table", items, mock_rate_limiter, progress, ledger)
+
+    # Only the unprocessed item is retried
+    assert ddb_mock.batch_write_item.call_args_list[1] == mocker.call(
+        RequestItems={"test_table": [{"PutRequest": {"Item": items[4]}}]},
+        ReturnConsumedCapacity="TOTAL",
+    )
+    mock_rate_limiter.acquire.assert_called_with(1)
+    mock_sleep.assert_called_once()
+    assert progress.written_items == 5  # noqa: PLR2004
+    assert progress.throttled_requests == 1
+    assert ledger.entries == []
+
 
-    ddb_mock.transact_write_items.side_effect = [
-        ClientError({"Error": {"Code": "ThrottlingException"}}, "TransactWriteItems"),
-        ClientError({"Error": {"Code": "ThrottlingException"}}, "TransactWriteItems"),
-        None,
+def test_write_item_batch_throttled(
+    mocker: MockerFixture, mock_rate_limiter: MagicMock, mock_sleep: MagicMock
+) -> None:
+    ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
+    ddb_mock.batch_write_item.side_effect = [
+        ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+            "BatchWriteItem",
+        ),
+        ClientError({"Error": {"Code": "ThrottlingException"}}, "BatchWriteItem"),
+        {"UnprocessedItems": {}},
     ]
+    progress = RestoreProgress(table_name="test_table", total_items=5)
+    ledger = FailureLedger()
 
-    batch = [{"id": i} for i in range(5)]
-    write_item_batch("test_table", batch)
+    batch = [{"id": {"N": str(i)}} for i in range(5)]
+    write_item_batch("test_table", batch, mock_rate_limiter, progress, ledger)
 
     expected_ddb_call_count = 3
     expected_sleep_call_count = 2
 
-    assert ddb_mock.transact_write_items.call_count == expected_ddb_call_count
-    assert sleep_mock.call_count == expected_sleep_call_count
+    assert ddb_mock.batch_write_item.call_count == expected_ddb_call_count
+    assert mock_sleep.call_count == expected_sleep_call_count
+    assert progress.written_items == 5  # noqa: PLR2004
+    assert progress.throttled_requests == 2  # noqa: PLR2004
 
-    mock_console.print.assert_any_call(
-        "Table test_table is being throttled. Waiting for 1 seconds...",
-        style="yellow",
-    )
+
+def test_write_item_batch_retries_exhausted(
+    mocker: MockerFixture, mock_rate_limiter: MagicMock, mock_sleep: MagicMock
+) -> None:
+    ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
+    items = [{"id": {"N": str(i)}} for i in range(2)]
+    ddb_mock.batch_write_item.return_value = {
+        "UnprocessedItems": {"test_table": [{"PutRequest": {"Item": items[1]}}]}
+    }
+    progress = RestoreProgress(table_name="test_table", total_items=2)
+    ledger = FailureLedger()
+
+    write_item_batch("test_table", items, mock_rate_limiter, progress, ledger)
+
+    assert ddb_mock.batch_write_item.call_count == MAX_WRITE_ATTEMPTS
+    assert progress.written_items == 1
+    assert progress.failed_items == 1
+    assert ledger.entries == [
+        {
+            "table": "test_table",
+            "error": f"Items not processed after {MAX_WRITE_ATTEMPTS} attempts",
+            "item": items[1],
+        }
+    ]
 
 
 def test_write_item_batch_clienterror(
     mocker: MockerFixture,
     mock_console: MagicMock,
+    mock_rate_limiter: MagicMock,
 ) -> None:
     ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
-    ddb_mock.transact_write_items.side_effect = ClientError(
-        {"Error": {"Code": "SomeOtherError"}}, "TransactWriteItems"
+    ddb_mock.batch_write_item.side_effect = ClientError(
+        {"Error": {"Code": "SomeOtherError"}}, "BatchWriteItem"
     )
+    progress = RestoreProgress(table_name="test_table", total_items=5)
+    ledger = FailureLedger()
 
-    batch = [{"id": i} for i in range(5)]
+    batch = [{"id": {"N": str(i)}} for i in range(5)]
 
-    write_item_batch("test_table", batch)
+    write_item_batch("test_table", batch, mock_rate_limiter, progress, ledger)
 
+    error = "An error occurred (SomeOtherError) when calling the BatchWriteItem operation: Unknown"
     mock_console.print.assert_any_call(
-        "Error writing items to [bright_blue]test_table[/bright_blue]: An error occurred (SomeOtherError) when calling the TransactWriteItems operation: Unknown",
+        f"Error writing 5 items to [bright_blue]test_table[/bright_blue]: {error}",
         style="bright_red",
     )
+    assert ddb_mock.batch_write_item.call_count == 1
+    assert progress.failed_items == 5  # noqa: PLR2004
+    assert ledger.entries[0] == {
+        "table": "test_table",
+        "error": error,
+        "item": batch[0],
+    }
 
 
 def test_write_item_batch_exception(
     mocker: MockerFixture,
     mock_console: MagicMock,
+    mock_rate_limiter: MagicMock,
 ) -> None:
     ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
-    ddb_mock.transact_write_items.side_effect = Exception("Some error message")
+    ddb_mock.batch_write_item.side_effect = Exception("Some error message")
+    progress = RestoreProgress(table_name="test_table", total_items=5)
+    ledger = FailureLedger()
 
-    batch = [{"id": i} for i in range(5)]
+    batch = [{"id": {"N": str(i)}} for i in range(5)]
 
-    write_item_batch("test_table", batch)
+    write_item_batch("test_table", batch, mock_rate_limiter, progress, ledger)
 
     mock_console.print.assert_any_call(
-        "Error writing items to [bright_blue]test_table[/bright_blue]: Some error message",
+        "Error writing 5 items to [bright_blue]test_table[/bright_blue]: Some error message",
         style="bright_red",
     )
+    assert len(ledger.entries) == 5  # noqa: PLR2004
+
+
+def test_failure_ledger_save(tmp_path: Path) -> None:
+    ledger = FailureLedger()
+    ledger.record("test_table", [{"id": {"S": "1"}}, {"id": {"S": "2"}}], "error")
+
+    ledger.save(tmp_path / "failures.jsonl")
+
+    lines = (tmp_path / "failures.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"table": "test_table", "error": "error", "item": {"id": {"S": "1"}}},
+        {"table": "test_table", "error": "error", "item": {"id": {"S": "2"}}},
+    ]
+
+
+def test_get_write_units() -> None:
+    assert get_write_units([{"id": {"S": "1"}}]) == 1
+    assert get_write_units([{"id": {"S": "1" * 2000}}, {"id": {"S": "1"}}]) == 3  # noqa: PLR2004
+
+
+def test_restore_table(mocker: MockerFixture, tmp_path: Path) -> None:
+    ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
+    ddb_mock.batch_write_item.return_value = {"UnprocessedItems": {}}
+    mocker.patch("pipeline.seeding.restore.READ_BATCH_SIZE", 20)
+
+    items = [{"id": {"N": str(i)}} for i in range(60)]
+    backup_path = tmp_path / "backup.parquet"
+    pq.write_table(
+        pa.table({"data": [json.dumps({"Item": item}) for item in items]}),
+        backup_path,
+        row_group_size=30,
+    )
+
+    progress = restore_table("test_table", "organisation", backup_path)
+
+    # Each record batch of 20 rows is written as one batch of 20 items
+    expected_batch_count = 3
+    assert ddb_mock.batch_write_item.call_count == expected_batch_count
+    written_items = [
+        request["PutRequest"]["Item"]
+        for call in ddb_mock.batch_write_item.call_args_list
+        for request in call.kwargs["RequestItems"]["test_table"]
+    ]
+    assert sorted(written_items, key=lambda item: int(item["id"]["N"])) == items
+    assert progress.total_items == 60  # noqa: PLR2004
+    assert progress.written_items == 60  # noqa: PLR2004
+    assert progress.failed_items == 0
+
+
+def test_restore_table_parse_error(mocker: MockerFixture, tmp_path: Path) -> None:
+    ddb_mock = mocker.patch("pipeline.seeding.restore.DDB_CLIENT")
+
+    ddb_mock.batch_write_item.return_value = {"UnprocessedItems": {}}
+    mocker.patch("pipeline.seeding.restore.READ_BATCH_SIZE", 1)
+
+    backup_path = tmp_path / "backup.parquet"
+    item = {"id": {"S": "1"}}
+    pq.write_table(
+        pa.table({"data": ["not json", json.dumps({"Item": item})]}), backup_path
+    )
+    ledger = FailureLedger()
+
+    progress = restore_table("test_table", "organisation", backup_path, ledger=ledger)
+
+    # The unparseable row is recorded as failed and the rest of the backup is restored
+    ddb_mock.batch_write_item.assert_called_once_with(
+        RequestItems={"test_table": [{"PutRequest": {"Item": item}}]},
+        ReturnConsumedCapacity="TOTAL",
+    )
+    assert progress.written_items == 1
+    assert progress.failed_items == 1
+    assert ledger.entries == [
+        {
+            "table": "test_table",
+            "error": "Expecting value: line 1 column 1 (char 0)",
+            "item": {"data": "not json"},
+        }
+    ]
+
+
+def test_restore_backup(mocker: MockerFixture, tmp_path: Path) -> None:
+    backup_path = tmp_path / "organisation.parquet"
+    pq.write_table(
+        pa.table({"data": [json.dumps({"Item": {"id": {"S": "1"}}})]}), backup_path
+    )
+    mock_download = mocker.patch(
+        "pipeline.seeding.restore.wr.s3.download",
+        side_effect=lambda path, local_file: shutil.copy(backup_path, local_file),
+    )
+    mock_restore_table = mocker.patch(
+        "pipeline.seeding.restore.restore_table",
+        side_effect=lambda table_name, entity_type, path, wcu_budget, ledger: (
+            pq.read_table(path).num_rows
+        ),
+    )
+
+    result = restore_backup(
+        "test_table", "organisation", "s3://test-store/organisation.parquet", 100
+    )
+
+    assert result == 1
+    assert mock_download.call_args.kwargs["path"] == (
+        "s3://test-store/organisation.parquet"
+    )
+    assert mock_restore_table.call_args.args[:2] == ("test_table", "organisation")
 
 
 @pytest.mark.asyncio
@@ -125,47 +328,141 @@ async def test_run_s3_restore(mocker: MockerFixture) -> None:
         },
     )
 
-    mock_read_parquet = mocker.patch(
-        "pipeline.seeding.restore.wr.s3.read_parquet",
-        side_effect=[
-            pd.DataFrame(data=[["healthcare-service"]], columns=["data"]),
-            pd.DataFrame(data=[["organisation"]], columns=["data"]),
-            pd.DataFrame(data=[["location"]], columns=["data"]),
-        ],
-    )
-
-    mock_bulk_load_table = mocker.patch(
-        "pipeline.seeding.restore.bulk_load_table",
-        return_value=None,
+    mock_restore_backup = mocker.patch(
+        "pipeline.seeding.restore.restore_backup",
+        side_effect=lambda table_name, *args: RestoreProgress(table_name=table_name),
     )
 
-    await run_s3_restore("local", "fdos-000")
-
-    mock_read_parquet.assert_has_calls(
-        [
-            mocker.call(path="s3://test-store/healthcare-service.parquet"),
-            mocker.call(path="s3://test-store/organisation.parquet"),
-            mocker.call(path="s3://test-store/location.parquet"),
-        ]
-    )
+    results = await run_s3_restore("local", "fdos-000")
 
-    mock_bulk_load_table.assert_has_calls(
+    assert [result.table_name for result in results] == [
+        "ftrs-dos-local-database-healthcare-service-fdos-000",
+        "ftrs-dos-local-database-organisation-fdos-000",
+        "ftrs-dos-local-database-location-fdos-000",
+    ]
+    mock_restore_backup.assert_has_calls(
         [
             mocker.call(
                 "ftrs-dos-local-database-healthcare-service-fdos-000",
-                ["healthcare-service"],
+                "healthcare-service",
+                "s3://test-store/healthcare-service.parquet",
+                DEFAULT_WCU_BUDGET,
+                mocker.ANY,
             ),
             mocker.call(
                 "ftrs-dos-local-database-organisation-fdos-000",
-                ["organisation"],
+                "organisation",
+                "s3://test-store/organisation.parquet",
+                DEFAULT_WCU_BUDGET,
+                mocker.ANY,
             ),
             mocker.call(
                 "ftrs-dos-local-database-location-fdos-000",
-                ["location"],
+                "location",
+                "s3://test-store/location.parquet",
+                DEFAULT_WCU_BUDGET,
+                mocker.ANY,
             ),
-        ]
+        ],
+        any_order=True,
     )
 
     mock_get_parameter.assert_called_once_with(
         name="/ftrs-dos/local/dynamodb-backup-arns", transform="json"
     )
+
+
+@pytest.mark.asyncio
+async def test_run_s3_restore_saves_failures(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    mocker.patch(
+        "pipeline.seeding.restore.get_parameter",
+        return_value={"organisation": "s3://test-store/organisation.parquet"},
+    )
+
+    def restore_backup(
+        table_name: str,
+        entity_type: str,
+        backup_uri: str,
+        wcu_budget: int,
+        ledger: FailureLedger,
+    ) -> RestoreProgress:
+        ledger.record(table_name, [{"id": {"S": "1"}}], "error")
+        return RestoreProgress(table_name=table_name, failed_items=1)
+
+    mocker.patch("pipeline.seeding.restore.restore_backup", side_effect=restore_backup)
+
+    failures_file = tmp_path / "failures.jsonl"
+    results = await run_s3_restore(
+        "local", None, wcu_budget=100, failures_file=failures_file
+    )
+
+    assert results[0].failed_items == 1
+    assert json.loads(failures_file.read_text()) == {
+        "table": "ftrs-dos-local-database-organisation",
+        "error": "error",
+        "item": {"id": {"S": "1"}},
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_s3_restore_saves_failures_on_error(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    mocker.patch(
+        "pipeline.seeding.restore.get_parameter",
+        return_value={
+            "organisation": "s3://test-store/organisation.parquet",
+            "location": "s3://test-store/location.parquet",
+        },
+    )
+
+    def restore_backup(
+        table_name: str,
+        entity_type: str,
+        backup_uri: str,
+        wcu_budget: int,
+        ledger: FailureLedger,
+    ) -> RestoreProgress:
+        if entity_type == "location":
+            raise ConnectionError("Download failed")
+
+        ledger.record(table_name, [{"id": {"S": "1"}}], "error")
+        return RestoreProgress(table_name=table_name, failed_items=1)
+
+    mocker.patch("pipeline.seeding.restore.restore_backup", side_effect=restore_backup)
+
+    failures_file = tmp_path / "failures.jsonl"
+    with pytest.raises(ConnectionError, match="Download failed"):
+        await run_s3_restore("local", None, failures_file=failures_file)
+
+    assert json.loads(failures_file.read_text())["item"] == {"id": {"S": "1"}}
+
+
+def test_read_backup_items_typed() -> None:
+    organisation = Organisation(
+        identifier_ODS_ODSCode="A12345",
+        active=True,
+        name="Test Organisation",
+        type="GP Practice",
+    )
+    serializer = TypeSerializer()
+    item = {
+        "id": str(organisation.id),
+        "field": "document",
+        **organisation.model_dump(mode="json"),
+    }
+    expected_item = {key: serializer.serialize(value) for key, value in item.items()}
+    backup = pa.Table.from_pylist(
+        [to_backup_record(json.dumps({"Item": expected_item}), Organisation)],
+        schema=get_backup_schema(Organisation),
+    )
+
+    assert read_backup_items(backup, "organisation") == [expected_item]
+
+
+def test_read_backup_items_raw() -> None:
+    backup = pa.table({"data": [json.dumps({"Item": {"id": {"S": "1"}}})]})
+
+    assert read_backup_items(backup, "organisation") == [{"id": {"S": "1"}}]
@@ -1,8 +1,17 @@
+import json
+from datetime import datetime
+
 import pytest
+from aws_lambda_powertools.utilities.data_classes import SQSEvent
 from ftrs_common.mocks.mock_logger import MockLogger
 from pytest_mock import MockerFixture
 
-from pipeline.application import DataMigrationApplication, DMSEvent
+from pipeline.application import (
+    MAX_BATCH_EVENT_RECORDS,
+    DataMigrationApplication,
+    DMSBatchEvent,
+    DMSEvent,
+)
 from pipeline.processor import DataMigrationProcessor
 from pipeline.triagecode_processor import TriageCodeProcessor
 from pipeline.utils.config import DataMigrationConfig
@@ -34,7 +43,7 @@ def test_handle_dms_event_invalid_method(
     )
     app.processor.sync_service = mocker.MagicMock()
 
-    app.handle_dms_event(mock_event)
+    assert app.handle_dms_event(mock_event) is True
 
     # Ensure no processing occurs for unsupported methods
     assert not app.processor.sync_service.called
@@ -71,7 +80,7 @@ def test_handle_dms_event_invalid_table(
     )
     app.processor.sync_service = mocker.MagicMock()
 
-    app.handle_dms_event(mock_event)
+    assert app.handle_dms_event(mock_event) is True
 
     # Ensure no processing occurs for unsupported tables
     assert not app.processor.sync_service.called
@@ -117,17 +126,337 @@ def test_handle_dms_event_supported_event(
     assert mock_logger.was_logged("DM_ETL_011") is False
 
 
+def test_handle_dms_event_batch_event(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.sync_service = mocker.MagicMock()
+    app.processor.sync_services = mocker.MagicMock(return_value={2: "Failed"})
+
+    mock_event = DMSBatchEvent(
+        record_ids=[1, 2, 3],
+        table_name="services",
+        method="insert",
+    )
+
+    assert app.handle_dms_event(mock_event) is False
+
+    app.processor.sync_services.assert_called_once_with([1, 2, 3], "insert")
+    app.processor.sync_service.assert_not_called()
+
+
+def test_handle_dms_event_child_table(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.resolve_service_ids = mocker.MagicMock(return_value=[7])
+    app.processor.sync_services = mocker.MagicMock(return_value={})
+
+    mock_event = DMSEvent(
+        record_id=123,
+        table_name="serviceendpoints",
+        method="update",
+    )
+
+    assert app.handle_dms_event(mock_event) is True
+
+    app.processor.resolve_service_ids.assert_called_once_with("serviceendpoints", [123])
+    app.processor.sync_services.assert_called_once_with([7], "update")
+
+
+def test_handle_dms_event_child_record_not_found(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.resolve_service_ids = mocker.MagicMock(return_value=[])
+    app.processor.sync_services = mocker.MagicMock()
+
+    mock_event = DMSBatchEvent(
+        record_ids=[1, 2],
+        table_name="servicedayopeningtimes",
+        method="insert",
+    )
+
+    assert app.handle_dms_event(mock_event) is True
+    app.processor.sync_services.assert_not_called()
+
+
+def test_handle_sqs_event_coalesces_changes(
+    mocker: MockerFixture,
+    mock_logger: MockLogger,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.resolve_service_ids = mocker.MagicMock(
+        side_effect=lambda table_name, record_ids: {
+            "serviceendpoints": [1],
+            "servicesgsds": [1, 2],
+        }[table_name]
+    )
+    app.processor.sync_services = mocker.MagicMock(return_value={})
+    app.processor.sync_service = mocker.MagicMock()
+
+    event = SQSEvent(
+        data={
+            "Records": [
+                {
+                    "messageId": "message-1",
+                    "body": '{"type": "dms_event", "record_id": 1, "table_name": "services", "method": "update"}',
+                },
+                {
+                    "messageId": "message-2",
+                    "body": '{"type": "dms_event", "record_id": 10, "table_name": "serviceendpoints", "method": "insert"}',
+                },
+                {
+                    "messageId": "message-3",
+                    "body": '{"type": "dms_batch_event", "record_ids": [20, 21], "table_name": "servicesgsds", "method": "update"}',
+                },
+                {
+                    "messageId": "message-4",
+                    "body": '{"type": "dms_event", "record_id": 30, "table_name": "servicetypes", "method": "update"}',
+                },
+            ]
+        }
+    )
+
+    assert app.handle_sqs_event(event) == {"batchItemFailures": []}
+
+    app.processor.sync_services.assert_called_once_with([1, 2], "update")
+    app.processor.sync_service.assert_not_called()
+    assert mock_logger.get_log("DM_ETL_028") == [
+        {
+            "reference": "DM_ETL_028",
+            "msg": "Coalesced 4 changes into a sync of 2 services",
+            "detail": {"change_count": 4, "service_count": 2},
+        }
+    ]
+    assert mock_logger.was_logged("DM_ETL_011") is True
+
+
+def test_handle_sqs_event_reports_failed_messages(
+    mocker: MockerFixture,
+    mock_logger: MockLogger,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.sync_services = mocker.MagicMock(
+        return_value={2: "Service with ID 2 not found"}
+    )
+    app.processor.sync_service = mocker.MagicMock()
+
+    event = SQSEvent(
+        data={
+            "Records": [
+                {
+                    "messageId": "message-1",
+                    "body": '{"type": "dms_event", "record_id": 1, "table_name": "services", "method": "insert"}',
+                },
+                {
+                    "messageId": "message-2",
+                    "body": '{"type": "dms_event", "record_id": 2, "table_name": "services", "method": "insert"}',
+                },
+                {
+                    "messageId": "message-3",
+                    "body": '{"type": "invalid_event"}',
+                },
+                {
+                    "messageId": "message-4",
+                    "body": '{"type": "dms_event", "record_id": 4, "table_name": "services", "method": "delete"}',
+                },
+                {
+                    "messageId": "message-5",
+                    "body": '{"type": "dms_event", "record_id": 2, "table_name": "services", "method": "update"}',
+                },
+            ]
+        }
+    )
+
+    response = app.handle_sqs_event(event)
+
+    # Service 2 failed, so both messages which changed it are redelivered
+    assert response == {
+        "batchItemFailures": [
+            {"itemIdentifier": "message-3"},
+            {"itemIdentifier": "message-2"},
+            {"itemIdentifier": "message-5"},
+        ]
+    }
+    app.processor.sync_services.assert_called_once_with([1, 2], "update")
+    app.processor.sync_service.assert_not_called()
+
+    assert mock_logger.get_log("DM_ETL_018") == [
+        {
+            "reference": "DM_ETL_018",
+            "msg": "Failed to process SQS message message-3: Invalid event format",
+            "detail": {"message_id": "message-3", "error": "Invalid event format"},
+        },
+        {
+            "reference": "DM_ETL_018",
+            "msg": "Failed to process SQS message message-2: Service with ID 2 not found",
+            "detail": {
+                "message_id": "message-2",
+                "error": "Service with ID 2 not found",
+            },
+        },
+        {
+            "reference": "DM_ETL_018",
+            "msg": "Failed to process SQS message message-5: Service with ID 2 not found",
+            "detail": {
+                "message_id": "message-5",
+                "error": "Service with ID 2 not found",
+            },
+        },
+    ]
+    assert mock_logger.get_log("DM_ETL_999")[0]["detail"]["failed_message_count"] == 3  # noqa: PLR2004
+    assert mock_logger.get_log("DM_ETL_999")[0]["detail"]["transformer_metrics"] == {}
+    assert mock_logger.get_log("DM_ETL_999")[0]["detail"]["timings"] == {}
+
+
+def test_handle_sqs_event_sync_error(
+    mocker: MockerFixture,
+    mock_logger: MockLogger,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.sync_services = mocker.MagicMock(
+        side_effect=ConnectionError("Database unavailable")
+    )
+    app.processor.sync_service = mocker.MagicMock()
+
+    event = SQSEvent(
+        data={
+            "Records": [
+                {
+                    "messageId": "message-1",
+                    "body": '{"type": "dms_event", "record_id": 1, "table_name": "services", "method": "update"}',
+                }
+            ]
+        }
+    )
+
+    assert app.handle_sqs_event(event) == {
+        "batchItemFailures": [{"itemIdentifier": "message-1"}]
+    }
+    app.processor.sync_service.assert_not_called()
+    assert mock_logger.get_log("DM_ETL_018") == [
+        {
+            "reference": "DM_ETL_018",
+            "msg": "Failed to process SQS message message-1: Database unavailable",
+            "detail": {
+                "message_id": "message-1",
+                "error": "Database unavailable",
+            },
+        }
+    ]
+
+
+def test_sync_changed_services_in_batches(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.sync_services = mocker.MagicMock(return_value={})
+
+    service_ids = list(range(MAX_BATCH_EVENT_RECORDS + 1))
+
+    assert app.sync_changed_services(service_ids) == {}
+    app.processor.sync_services.assert_has_calls(
+        [
+            mocker.call(service_ids[:MAX_BATCH_EVENT_RECORDS], "update"),
+            mocker.call(service_ids[MAX_BATCH_EVENT_RECORDS:], "update"),
+        ]
+    )
+
+
 def test_handle_full_sync_event(
     mocker: MockerFixture,
+    mock_logger: MockLogger,
     mock_config: DataMigrationConfig,
 ) -> None:
     app = DataMigrationApplication(config=mock_config)
     app.processor.sync_all_services = mocker.MagicMock()
-    app.triage_code_processor.sync_all_triage_codes = mocker.MagicMock()
+
+    def sync_all_triage_codes(concurrent: bool) -> None:
+        # Completion is only logged once the triage codes have been synced
+        assert mock_logger.was_logged("DM_ETL_999") is False
+
+    app.triage_code_processor.sync_all_triage_codes = mocker.MagicMock(
+        side_effect=sync_all_triage_codes
+    )
 
     app.handle_full_sync_event()
     app.processor.sync_all_services.assert_called_once()
-    app.triage_code_processor.sync_all_triage_codes.assert_called_once()
+    app.triage_code_processor.sync_all_triage_codes.assert_called_once_with(
+        concurrent=False
+    )
+    assert mock_logger.was_logged("DM_ETL_999") is True
+
+
+def test_log_completion(
+    mock_logger: MockLogger,
+    mock_config: DataMigrationConfig,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.metrics.total_records = 2
+    app.processor.metrics.record_time("fetch", 0.004)
+
+    app.log_completion()
+
+    detail = mock_logger.get_log("DM_ETL_999")[0]["detail"]
+    assert detail["metrics"]["total_records"] == 2  # noqa: PLR2004
+    assert "timings" not in detail["metrics"]
+    assert detail["timings"]["fetch"]["count"] == 1
+    assert detail["timings"]["fetch"]["p50_ms"] == pytest.approx(4.0)
+
+    emf = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert emf["_aws"]["CloudWatchMetrics"][0]["Namespace"] == "FtRS/DataMigration"
+    assert emf["environment"] == "test"
+    assert emf["total_records"] == [2.0]
+    assert emf["fetch_p50_ms"] == [pytest.approx(4.0)]
+
+
+def test_publish_metrics_reuses_metrics(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    mock_metrics_cls = mocker.patch("pipeline.application.Metrics")
+
+    app.publish_metrics()
+    app.processor.metrics.total_records = 3
+    app.publish_metrics()
+
+    mock_metrics_cls.assert_not_called()
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["total_records"] for line in lines] == [[0.0], [3.0]]
+    # Dimensions are cleared on each flush rather than accumulating
+    assert [line["_aws"]["CloudWatchMetrics"][0]["Dimensions"] for line in lines] == [
+        [["environment", "service"]]
+    ] * 2
+
+
+def test_handle_incremental_sync_event(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+) -> None:
+    app = DataMigrationApplication(config=mock_config)
+    app.processor.sync_modified_services = mocker.MagicMock()
+    watermark_store = mocker.MagicMock()
+
+    app.handle_incremental_sync_event(
+        watermark_store=watermark_store, modified_since=datetime(2025, 7, 1)
+    )
+
+    app.processor.sync_modified_services.assert_called_once_with(
+        watermark_store=watermark_store,
+        modified_since=datetime(2025, 7, 1),
+        batch_size=1000,
+    )
 
 
 def test_parse_event_dms_event(mock_config: DataMigrationConfig) -> None:
@@ -150,6 +479,33 @@ def test_parse_event_dms_event(mock_config: DataMigrationConfig) -> None:
     assert parsed_event.type == "dms_event"
 
 
+def test_parse_event_dms_batch_event(mock_config: DataMigrationConfig) -> None:
+    app = DataMigrationApplication(config=mock_config)
+
+    parsed_event = app.parse_event(
+        {
+            "type": "dms_batch_event",
+            "record_ids": [1, 2],
+            "table_name": "services",
+            "method": "insert",
+        }
+    )
+
+    assert parsed_event == DMSBatchEvent(
+        record_ids=[1, 2], table_name="services", method="insert"
+    )
+
+    with pytest.raises(ValueError, match="Invalid event format"):
+        app.parse_event(
+            {
+                "type": "dms_batch_event",
+                "record_ids": list(range(101)),
+                "table_name": "services",
+                "method": "insert",
+            }
+        )
+
+
 def test_parse_event_invalid_type(
     mock_config: DataMigrationConfig,
     mock_logger: MockLogger,
@@ -2,7 +2,7 @@ from aws_lambda_powertools.utilities.data_classes import SQSEvent
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from pytest_mock import MockerFixture
 
-from pipeline.application import DataMigrationApplication, DMSEvent
+from pipeline.application import DataMigrationApplication
 from pipeline.lambda_handler import lambda_handler
 from pipeline.utils.config import DataMigrationConfig
 
@@ -13,7 +13,7 @@ def test_lambda_handler(
     mock_config: DataMigrationConfig,
 ) -> None:
     app = DataMigrationApplication(config=mock_config)
-    app.handle_dms_event = mocker.MagicMock()
+    app.processor.sync_services = mocker.MagicMock(return_value={})
 
     mocker.patch("pipeline.lambda_handler.DataMigrationApplication", return_value=app)
 
@@ -21,37 +21,21 @@ def test_lambda_handler(
         data={
             "Records": [
                 {
-                    "body": '{"type": "dms_event", "record_id": 1, "table_name": "test_table", "method": "insert"}'
+                    "messageId": "message-1",
+                    "body": '{"type": "dms_event", "record_id": 1, "table_name": "services", "method": "insert"}',
                 },
                 {
-                    "body": '{"type": "dms_event", "record_id": 2, "table_name": "test_table", "method": "update"}'
+                    "messageId": "message-2",
+                    "body": '{"type": "dms_event", "record_id": 2, "table_name": "services", "method": "update"}',
                 },
             ]
         }
     )
 
-    lambda_handler(event, mock_lambda_context)
+    response = lambda_handler(event, mock_lambda_context)
 
-    app.handle_dms_event.assert_has_calls(
-        [
-            mocker.call(
-                DMSEvent(
-                    type="dms_event",
-                    record_id=1,
-                    table_name="test_table",
-                    method="insert",
-                )
-            ),
-            mocker.call(
-                DMSEvent(
-                    type="dms_event",
-                    record_id=2,
-                    table_name="test_table",
-                    method="update",
-                )
-            ),
-        ]
-    )
+    assert response == {"batchItemFailures": []}
+    app.processor.sync_services.assert_called_once_with([1, 2], "update")
 
 
 def test_lambda_handler_no_app(
@@ -5,8 +5,11 @@ import boto3
 import pytest
 
 from pipeline.migration_copy_db_trigger_lambda_handler import (
+    MAX_RETRIES,
+    RETRY_DELAY,
     get_message_from_event,
     lambda_handler,
+    send_message,
 )
 
 
@@ -62,15 +65,44 @@ def test_lambda_handler_handles_sqs_exception(
 ) -> None:
     event = {"detail": {"eventName": "INSERT"}}
     context = {}
-    send_call_count = 2
+
+    def send_message(QueueUrl: str, MessageBody: str) -> dict:  # noqa: N803
+        if QueueUrl == "queue-url-2":
+            raise ConnectionError("SQS error")
+        return {"MessageId": "test-message-id"}
+
+    mock_sqs_client.send_message.side_effect = send_message
+
+    with patch("pipeline.migration_copy_db_trigger_lambda_handler.sleep") as mock_sleep:
+        lambda_handler(event, context)
+
+    # The failed send is retried before giving up
+    send_call_count = 1 + 1 + MAX_RETRIES
+    assert mock_sqs_client.send_message.call_count == send_call_count
+    assert mock_sleep.call_count == MAX_RETRIES
+
+
+def test_send_message_retries_until_sent(mock_sqs_client: MagicMock) -> None:
     mock_sqs_client.send_message.side_effect = [
-        {"MessageId": "test-message-id"},
         Exception("SQS error"),
+        {"MessageId": "test-message-id"},
     ]
 
-    lambda_handler(event, context)
+    with patch("pipeline.migration_copy_db_trigger_lambda_handler.sleep") as mock_sleep:
+        assert send_message("queue-url-1", "{}") is True
+
+    assert mock_sqs_client.send_message.call_count == 2  # noqa: PLR2004
+    mock_sleep.assert_called_once_with(RETRY_DELAY)
 
-    assert mock_sqs_client.send_message.call_count == send_call_count
+
+def test_lambda_handler_no_workspaces(
+    mock_sqs_client: MagicMock, mock_workspaces: MagicMock
+) -> None:
+    mock_workspaces.return_value = []
+
+    lambda_handler({"detail": {"eventName": "INSERT"}}, {})
+
+    mock_sqs_client.send_message.assert_not_called()
 
 
 def test_get_message_from_event_creates_correct_message_format() -> None:
@@ -116,6 +148,6 @@ def test_lambda_handler_handles_complex_event_structure(
 
     expected_message = json.dumps({"source": "aurora_trigger", "event": complex_event})
 
-    mock_sqs_client.send_message.assert_called_with(
+    mock_sqs_client.send_message.assert_any_call(
         QueueUrl="queue-url-2", MessageBody=expected_message
     )
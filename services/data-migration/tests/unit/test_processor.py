@@ -1,4 +1,6 @@
+from datetime import datetime
 from decimal import Decimal
+from pathlib import Path
 
 import pytest
 from freezegun import freeze_time
@@ -23,15 +25,26 @@ from ftrs_data_layer.domain.legacy.service import (
 )
 from pytest_mock import MockerFixture
 from sqlalchemy import Engine
+from sqlalchemy.dialects import postgresql
 
 from pipeline.processor import (
     DataMigrationMetrics,
     DataMigrationProcessor,
+    ServiceBatch,
     ServiceTransformOutput,
+    TransformedBatch,
+    TransformedService,
 )
+from pipeline.transformer import GPPracticeTransformer, TransformerMetrics
 from pipeline.utils import dbutil
 from pipeline.utils.cache import DoSMetadataCache
-from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.checkpoint import (
+    MigrationCheckpoint,
+    MigrationCheckpointStore,
+    SyncWatermark,
+    SyncWatermarkStore,
+)
+from pipeline.utils.config import DataMigrationConfig, LogVerbosity, PipelineConfig
 from pipeline.validation.types import ValidationIssue, ValidationResult
 
 
@@ -56,9 +69,30 @@ def test_processor_init(
         "transformed_records": 0,
         "unsupported_records": 0,
         "invalid_records": 0,
+        "timings": {},
     }
 
 
+def test_metrics_time() -> None:
+    metrics = DataMigrationMetrics()
+
+    with metrics.time("fetch"):
+        pass
+
+    with pytest.raises(ValueError, match="Test error"), metrics.time("fetch"):
+        raise ValueError("Test error")
+
+    metrics.record_time("write", 0.2)
+
+    assert metrics.timings["fetch"].count == 2  # noqa: PLR2004
+    summary = metrics.timing_summary()
+    assert list(summary) == ["fetch", "write"]
+    assert summary["write"]["p50_ms"] == pytest.approx(200.0)
+
+    metrics.reset()
+    assert metrics.timings == {}
+
+
 def test_sync_all_services(
     mocker: MockerFixture,
     mock_config: DataMigrationConfig,
@@ -74,7 +108,7 @@ def test_sync_all_services(
 
     mock_session = mocker.MagicMock()
     mock_session.__enter__.return_value = mock_session
-    mock_session.scalars = mocker.MagicMock(return_value=[mock_legacy_service])
+    mock_session.scalars = mocker.MagicMock(side_effect=[[mock_legacy_service], []])
 
     mocker.patch("pipeline.processor.Session", return_value=mock_session)
 
@@ -83,6 +117,683 @@ def test_sync_all_services(
     assert processor._process_service.call_count == 1
     processor._process_service.assert_called_once_with(mock_legacy_service)
 
+    assert mock_logger.get_log("DM_ETL_020")[0]["detail"]["processed_records"] == 1
+
+
+def test_sync_all_services_saves_checkpoint(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    processor._process_service = mocker.MagicMock()
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save = mocker.MagicMock(wraps=store.save)
+
+    processor.sync_all_services(checkpoint_store=store, batch_size=2)
+
+    call_kwargs = processor._iter_record_batches.call_args.kwargs
+    assert call_kwargs["batch_size"] == 2  # noqa: PLR2004
+    assert call_kwargs["start_after"] is None
+    assert store.save.call_count == 2  # noqa: PLR2004
+    assert [
+        log["detail"]["last_record_id"] for log in mock_logger.get_log("DM_ETL_020")
+    ] == [2, 3]
+    assert [
+        log["detail"]["batch_records"] for log in mock_logger.get_log("DM_ETL_020")
+    ] == [2, 1]
+    assert all(log["detail"]["rss_mb"] > 0 for log in mock_logger.get_log("DM_ETL_020"))
+    # Checkpoint is removed once the full sync completes
+    assert not store.path.exists()
+
+
+def test_sync_all_services_flushes_each_batch(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    manager = mocker.MagicMock()
+    manager.process.return_value = True
+    processor._process_service = manager.process
+    processor._flush = manager.flush
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save = manager.save
+
+    processor.sync_all_services(checkpoint_store=store, batch_size=2)
+
+    # Output is flushed before the checkpoint is saved for each page
+    assert [call[0] for call in manager.mock_calls] == [
+        "process",
+        "process",
+        "flush",
+        "save",
+        "process",
+        "flush",
+        "save",
+    ]
+
+
+def test_sync_all_services_resume_retries_failed_records(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3, 4, 5, 6)]
+
+    def iter_record_batches(
+        batch_size: int, start_after: int | None, **kwargs: dict
+    ) -> list[list[Service]]:
+        remaining = [
+            service
+            for service in services
+            if start_after is None or service.id > start_after
+        ]
+        return [
+            remaining[index : index + batch_size]
+            for index in range(0, len(remaining), batch_size)
+        ]
+
+    processor._iter_record_batches = mocker.MagicMock(side_effect=iter_record_batches)
+    processor._process_service = mocker.MagicMock(
+        side_effect=lambda service: service.id != 3  # noqa: PLR2004
+    )
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+
+    processor.sync_all_services(checkpoint_store=store, batch_size=2)
+
+    # Later pages are still processed, but the checkpoint is held before the failed page
+    assert processor._process_service.call_count == 6  # noqa: PLR2004
+    assert store.load().last_record_id == 2  # noqa: PLR2004
+    assert mock_logger.get_log("DM_ETL_029")[0]["detail"] == {
+        "last_record_id": 2,
+        "failed_record_id": 4,
+    }
+
+    processor._process_service = mocker.MagicMock(return_value=True)
+
+    processor.sync_all_services(checkpoint_store=store, resume=True, batch_size=2)
+
+    assert [call.args[0].id for call in processor._process_service.call_args_list] == [
+        3,
+        4,
+        5,
+        6,
+    ]
+    assert not store.path.exists()
+
+
+def test_sync_all_services_pipelined(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    outputs = {
+        service.id: ServiceTransformOutput(organisation=[], location=[])
+        for service in services
+    }
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: None
+        if service.id == 2  # noqa: PLR2004
+        else TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=outputs[service.id],
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock()
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save = mocker.MagicMock(wraps=store.save)
+
+    processor.sync_all_services(
+        checkpoint_store=store,
+        batch_size=2,
+        pipeline_config=PipelineConfig(load_workers=2, queue_size=1),
+    )
+
+    assert processor._iter_record_batches.call_args.kwargs["eager_load"] is True
+    assert processor._transform_service.call_count == 3  # noqa: PLR2004
+    processor._save_batch.assert_has_calls(
+        [mocker.call([outputs[1]]), mocker.call([outputs[3]])], any_order=True
+    )
+    assert processor.metrics.migrated_records == 2  # noqa: PLR2004
+    assert len(mock_logger.get_log("DM_ETL_007")) == 2  # noqa: PLR2004
+
+    # Checkpoints are saved in page order
+    assert store.save.call_count == 2  # noqa: PLR2004
+    assert [
+        log["detail"]["last_record_id"] for log in mock_logger.get_log("DM_ETL_020")
+    ] == [2, 3]
+    assert not store.path.exists()
+
+    stage_logs = {
+        log["detail"]["stage"]: log["detail"]
+        for log in mock_logger.get_log("DM_ETL_024")
+    }
+    assert list(stage_logs) == ["fetch", "transform", "load"]
+    assert stage_logs["fetch"]["processed_items"] == 2  # noqa: PLR2004
+    assert stage_logs["transform"]["processed_items"] == 2  # noqa: PLR2004
+    assert stage_logs["load"]["processed_items"] == 2  # noqa: PLR2004
+    assert stage_logs["load"]["workers"] == 2  # noqa: PLR2004
+
+
+def test_log_progress_reports_current_rss(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    processor._process_service = mocker.MagicMock()
+    mocker.patch("pipeline.processor.get_rss_mb", side_effect=[100.0, 104.0, 102.5])
+
+    processor.sync_all_services(batch_size=2)
+
+    assert [
+        (log["detail"]["rss_mb"], log["detail"]["rss_delta_mb"])
+        for log in mock_logger.get_log("DM_ETL_020")
+    ] == [(104.0, 4.0), (102.5, -1.5)]
+
+
+def test_sync_all_services_pipelined_flushes_each_batch(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    manager = mocker.MagicMock()
+    processor._flush = manager.flush
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=ServiceTransformOutput(),
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock()
+    processor._load_batch = mocker.MagicMock(wraps=processor._load_batch)
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save = manager.save
+
+    processor.sync_all_services(
+        checkpoint_store=store,
+        batch_size=2,
+        pipeline_config=PipelineConfig(load_workers=1, queue_size=1),
+    )
+
+    # Output is flushed before the checkpoint is saved for each page
+    assert [call[0] for call in manager.mock_calls] == [
+        "flush",
+        "save",
+        "flush",
+        "save",
+    ]
+    # The transformed output is released once each page has been saved
+    loaded_batches = [call.args[0] for call in processor._load_batch.call_args_list]
+    assert [batch.services for batch in loaded_batches] == [[], []]
+    assert processor.metrics.migrated_records == 3  # noqa: PLR2004
+
+
+def test_sync_all_services_pipelined_save_error(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2)]
+    processor._iter_record_batches = mocker.MagicMock(return_value=[services])
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=ServiceTransformOutput(),
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock(side_effect=RuntimeError("Throttled"))
+
+    processor.sync_all_services(pipeline_config=PipelineConfig())
+
+    assert processor.metrics.errors == 2  # noqa: PLR2004
+    assert processor.metrics.migrated_records == 0
+    assert mock_logger.get_log("DM_ETL_025") == [
+        {
+            "reference": "DM_ETL_025",
+            "msg": "Failed to save batch of 2 transformed records: Throttled",
+            "detail": {"record_count": 2, "record_ids": [1, 2], "error": "Throttled"},
+        }
+    ]
+
+
+def test_sync_all_services_pipelined_save_error_holds_checkpoint(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:1], services[1:2], services[2:]]
+    )
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=ServiceTransformOutput(),
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock(
+        side_effect=[None, RuntimeError("Throttled"), None]
+    )
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+
+    processor.sync_all_services(
+        checkpoint_store=store, batch_size=1, pipeline_config=PipelineConfig()
+    )
+
+    # Pages after the failed page are saved, but the checkpoint stays before it
+    assert processor.metrics.migrated_records == 2  # noqa: PLR2004
+    assert processor.metrics.errors == 1
+    assert store.load().last_record_id == 1
+    assert mock_logger.get_log("DM_ETL_029") == [
+        {
+            "reference": "DM_ETL_029",
+            "msg": "Records failed to migrate in the page ending at record 2, checkpoint held at 1",
+            "detail": {"failed_record_id": 2, "last_record_id": 1},
+        }
+    ]
+
+
+def test_sync_all_services_pipelined_transform_error(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    processor._transform_batch = mocker.MagicMock(
+        side_effect=[ValueError("Unexpected"), mocker.DEFAULT]
+    )
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+
+    with pytest.raises(ValueError, match="Unexpected"):
+        processor.sync_all_services(
+            checkpoint_store=store, pipeline_config=PipelineConfig()
+        )
+
+    # The failed page was never completed so the checkpoint does not advance past it
+    assert not mock_logger.was_logged("DM_ETL_020")
+    assert not store.path.exists()
+
+
+def test_transform_batch(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    transformed = mocker.MagicMock()
+    processor._transform_service = mocker.MagicMock(
+        side_effect=[transformed, None, ValueError("Test error")]
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    result = processor._transform_batch(
+        ServiceBatch(sequence=4, records=services, start_time=1.0)
+    )
+
+    assert result == TransformedBatch(
+        sequence=4,
+        last_record_id=3,
+        record_count=3,
+        start_time=1.0,
+        services=[transformed],
+        errors={3: "Test error"},
+    )
+    assert processor.metrics.errors == 1
+    assert mock_logger.get_log("DM_ETL_008") == [
+        {
+            "reference": "DM_ETL_008",
+            "msg": "Error processing record: Test error",
+            "detail": {"error": "Test error"},
+        }
+    ]
+
+
+def test_iter_transformed_batches(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    processor._transform_service = mocker.MagicMock(return_value=None)
+    processor._save_batch = mocker.MagicMock()
+
+    batches = list(processor.iter_transformed_batches(batch_size=2))
+
+    assert [(batch.sequence, batch.last_record_id) for batch in batches] == [
+        (0, 2),
+        (1, 3),
+    ]
+    assert processor._iter_record_batches.call_args.kwargs["batch_size"] == 2  # noqa: PLR2004
+    assert processor._iter_record_batches.call_args.kwargs["where"]
+    assert processor._iter_record_batches.call_args.kwargs["eager_load"] is True
+    processor._save_batch.assert_not_called()
+
+
+def test_iter_record_batches_reads_every_service(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+    processor._transform_service = mocker.MagicMock()
+
+    batches = list(processor.iter_record_batches(batch_size=2))
+
+    assert batches == [services[:2], services[2:]]
+    processor._iter_record_batches.assert_called_once_with(
+        batch_size=2, eager_load=True
+    )
+    processor._transform_service.assert_not_called()
+
+
+def test_sync_all_services_resume(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    processor._process_service = mocker.MagicMock()
+    processor._iter_record_batches = mocker.MagicMock(return_value=[])
+
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save(MigrationCheckpoint(last_record_id=500, processed_records=500))
+
+    processor.sync_all_services(checkpoint_store=store, resume=True)
+
+    assert processor._iter_record_batches.call_args.kwargs["start_after"] == 500  # noqa: PLR2004
+    assert mock_logger.get_log("DM_ETL_019") == [
+        {
+            "reference": "DM_ETL_019",
+            "msg": "Resuming full sync after service ID 500",
+            "detail": {"last_record_id": 500, "processed_records": 500},
+        }
+    ]
+
+
+def test_sync_modified_services(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    processor._process_service = mocker.MagicMock(return_value=True)
+
+    services = [
+        mocker.MagicMock(id=1, modifiedtime=datetime(2025, 7, 2, 9, 0)),
+        mocker.MagicMock(id=2, modifiedtime=datetime(2025, 7, 3, 9, 0)),
+        mocker.MagicMock(id=3, modifiedtime=None),
+    ]
+    processor._iter_record_batches = mocker.MagicMock(return_value=[services])
+
+    store = SyncWatermarkStore(tmp_path / "watermark.json")
+    store.save(SyncWatermark(modified_since=datetime(2025, 7, 1)))
+
+    processor.sync_modified_services(watermark_store=store)
+
+    assert processor._process_service.call_count == len(services)
+    where = processor._iter_record_batches.call_args.kwargs["where"]
+    assert str(where[0].compile(compile_kwargs={"literal_binds": True})) == (
+        "pathwaysdos.services.modifiedtime >= '2025-07-01 00:00:00'"
+    )
+    assert store.load().modified_since == datetime(2025, 7, 3, 9, 0)
+    assert mock_logger.was_logged("DM_ETL_023") is True
+
+
+def test_sync_modified_services_errors_do_not_advance_watermark(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    def _fail(service: Service) -> bool:
+        processor.metrics.errors += 1
+        return False
+
+    processor._process_service = mocker.MagicMock(side_effect=_fail)
+    processor._iter_record_batches = mocker.MagicMock(
+        return_value=[[mocker.MagicMock(id=1, modifiedtime=datetime(2025, 7, 2))]]
+    )
+
+    store = SyncWatermarkStore(tmp_path / "watermark.json")
+
+    processor.sync_modified_services(
+        watermark_store=store, modified_since=datetime(2025, 7, 1)
+    )
+
+    assert not store.path.exists()
+    assert mock_logger.get_log("DM_ETL_022") == [
+        {
+            "reference": "DM_ETL_022",
+            "msg": "Incremental sync completed with 1 errors, watermark not advanced",
+            "detail": {"error_count": 1},
+        }
+    ]
+
+
+def test_sync_modified_services_no_watermark(
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    tmp_path: Path,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    with pytest.raises(ValueError, match="No incremental sync watermark found"):
+        processor.sync_modified_services(
+            watermark_store=SyncWatermarkStore(tmp_path / "watermark.json")
+        )
+
+
+def test_get_selection_criteria(
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    criteria = processor._get_selection_criteria()
+
+    assert len(criteria) == 1
+    compiled = str(
+        criteria[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert (
+        compiled
+        == (
+            "pathwaysdos.services.typeid = 100 "
+            "AND pathwaysdos.services.statusid = 1 "
+            "AND pathwaysdos.services.odscode ~ '^[ABCDEFGHJKLMNPVWY][0-9]{5}$' "
+            "OR pathwaysdos.services.typeid IN (136, 152) "
+            "AND pathwaysdos.services.statusid = 1 "
+            "AND left(pathwaysdos.services.odscode, 6) ~ '^U\\\\d{5}$'"  # backslash escaped by literal rendering
+        )
+    )
+
+
+def test_iter_record_batches(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    first_page = [mocker.MagicMock(id=1), mocker.MagicMock(id=2)]
+    second_page = [mocker.MagicMock(id=3)]
+
+    mock_session = mocker.MagicMock()
+    mock_session.__enter__.return_value = mock_session
+    mock_session.scalars = mocker.MagicMock(side_effect=[first_page, second_page, []])
+    mocker.patch("pipeline.processor.Session", return_value=mock_session)
+
+    batches = list(processor._iter_record_batches(batch_size=2, start_after=None))
+
+    assert batches == [first_page, second_page]
+    statements = [
+        str(call.args[0].compile(compile_kwargs={"literal_binds": True}))
+        for call in mock_session.scalars.call_args_list
+    ]
+    assert "WHERE" not in statements[0]
+    assert "pathwaysdos.services.id > 2" in statements[1]
+    assert "pathwaysdos.services.id > 3" in statements[2]
+    assert all("ORDER BY pathwaysdos.services.id" in stmt for stmt in statements)
+    # Each processed page is expunged before the next page is read
+    assert mock_session.expunge_all.call_count == 2  # noqa: PLR2004
+
+
+def test_iter_record_batches_eager_load(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    page = [mocker.MagicMock(id=1)]
+    mock_session = mocker.MagicMock()
+    mock_session.__enter__.return_value = mock_session
+    mock_session.scalars = mocker.MagicMock(side_effect=[page, []])
+    mocker.patch("pipeline.processor.Session", return_value=mock_session)
+
+    batches = processor._iter_record_batches(batch_size=2, eager_load=True)
+
+    assert next(batches) == page
+    # The page is detached before it is handed over for processing
+    mock_session.expunge_all.assert_called_once()
+    statement = mock_session.scalars.call_args.args[0]
+    assert len(statement._with_options) == 6  # noqa: PLR2004
+    assert list(batches) == []
+
 
 def test_sync_service(
     mocker: MockerFixture,
@@ -95,7 +806,7 @@ def test_sync_service(
         logger=mock_logger,
     )
 
-    processor._process_service = mocker.MagicMock()
+    processor._process_service = mocker.MagicMock(return_value=True)
 
     mock_session = mocker.MagicMock()
     mock_session.__enter__.return_value = mock_session
@@ -106,7 +817,7 @@ def test_sync_service(
     record_id = 1
     method = "test_method"
 
-    assert processor.sync_service(record_id, method) is None
+    assert processor.sync_service(record_id, method) is True
 
     assert processor._process_service.call_count == 1
     processor._process_service.assert_called_once_with(mock_legacy_service)
@@ -138,6 +849,111 @@ def test_sync_service_record_not_found(
         processor.sync_service(record_id, method)
 
 
+def test_sync_services(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2)]
+    outputs = {
+        service.id: ServiceTransformOutput(organisation=[], location=[])
+        for service in services
+    }
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=outputs[service.id],
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock()
+
+    mock_session = mocker.MagicMock()
+    mock_session.__enter__.return_value = mock_session
+    mock_session.exec.return_value.all.return_value = services
+    mocker.patch("pipeline.processor.Session", return_value=mock_session)
+
+    assert processor.sync_services([1, 2], "insert") == {}
+
+    mock_session.exec.assert_called_once()
+    processor._save_batch.assert_called_once_with([outputs[1], outputs[2]])
+    assert processor.metrics.migrated_records == 2  # noqa: PLR2004
+
+
+def test_sync_services_errors(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    processor._transform_service = mocker.MagicMock(side_effect=Exception("Failed"))
+    processor._save_batch = mocker.MagicMock()
+
+    mock_session = mocker.MagicMock()
+    mock_session.__enter__.return_value = mock_session
+    mock_session.exec.return_value.all.return_value = [mocker.MagicMock(id=1)]
+    mocker.patch("pipeline.processor.Session", return_value=mock_session)
+
+    assert processor.sync_services([1], "insert") == {1: "Failed"}
+    assert processor.metrics.errors == 1
+
+    # Missing services only fail themselves
+    assert processor.sync_services([1, 2, 3], "insert") == {
+        1: "Failed",
+        2: "Service with ID 2 not found",
+        3: "Service with ID 3 not found",
+    }
+
+    processor._save_batch.assert_not_called()
+
+
+def test_sync_services_save_error(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+
+    services = [mocker.MagicMock(id=record_id) for record_id in (1, 2, 3)]
+    processor._transform_service = mocker.MagicMock(
+        side_effect=lambda service: None
+        if service.id == 3  # noqa: PLR2004
+        else TransformedService(
+            record_id=service.id,
+            transformer_name="MockTransformer",
+            output=ServiceTransformOutput(),
+            start_time=0.0,
+        )
+    )
+    processor._save_batch = mocker.MagicMock(side_effect=RuntimeError("Throttled"))
+
+    mock_session = mocker.MagicMock()
+    mock_session.__enter__.return_value = mock_session
+    mock_session.exec.return_value.all.return_value = services
+    mocker.patch("pipeline.processor.Session", return_value=mock_session)
+
+    # Skipped services were not part of the failed write
+    assert processor.sync_services([1, 2, 3], "update") == {
+        1: "Throttled",
+        2: "Throttled",
+    }
+    assert processor.metrics.errors == 2  # noqa: PLR2004
+    processor._save_batch.assert_called_once()
+
+
 @freeze_time("2025-07-25 12:00:00")
 def test_process_service(
     mocker: MockerFixture,
@@ -151,6 +967,7 @@ def test_process_service(
         logger=mock_logger,
     )
     processor.metadata = mock_metadata_cache
+    mock_logger.setLevel("DEBUG")
 
     processor.logger.append_keys = mocker.MagicMock()
     processor.logger.remove_keys = mocker.MagicMock()
@@ -165,10 +982,19 @@ def test_process_service(
         skipped_records=0,
         invalid_records=0,
         errors=0,
+        timings=processor.metrics.timings,
     )
 
-    processor._process_service(service=mock_legacy_service)
+    assert processor._process_service(service=mock_legacy_service) is True
 
+    assert set(processor.metrics.timings) == {
+        "serialise",
+        "select",
+        "validate",
+        "transform",
+        "write",
+    }
+    assert processor.metrics.timings["serialise"].count == 2  # noqa: PLR2004
     assert processor.metrics == DataMigrationMetrics(
         total_records=1,
         supported_records=1,
@@ -178,6 +1004,7 @@ def test_process_service(
         skipped_records=0,
         invalid_records=0,
         errors=0,
+        timings=processor.metrics.timings,
     )
 
     assert mock_logger.was_logged("DM_ETL_004") is False
@@ -415,7 +1242,7 @@ def test_process_service_unsupported_service(
     processor.metadata = mock_metadata_cache
     mock_legacy_service.typeid = 1000
 
-    processor._process_service(mock_legacy_service)
+    assert processor._process_service(mock_legacy_service) is True
 
     assert processor.metrics == DataMigrationMetrics(
         total_records=1,
@@ -425,6 +1252,7 @@ def test_process_service_unsupported_service(
         migrated_records=0,
         skipped_records=0,
         errors=0,
+        timings=processor.metrics.timings,
     )
 
     assert mock_logger.get_log("DM_ETL_004") == [
@@ -460,6 +1288,7 @@ def test_process_service_skipped_service(
         migrated_records=0,
         skipped_records=1,
         errors=0,
+        timings=processor.metrics.timings,
     )
 
     assert mock_logger.get_log("DM_ETL_005") == [
@@ -516,6 +1345,7 @@ def test_handles_invalid_service(
         skipped_records=0,
         invalid_records=0,
         errors=0,
+        timings=processor.metrics.timings,
     )
 
     processor._process_service(mock_legacy_service)
@@ -529,6 +1359,7 @@ def test_handles_invalid_service(
         skipped_records=0,
         invalid_records=1,
         errors=0,
+        timings=processor.metrics.timings,
     )
     mock_transformer.transform.assert_not_called()
     processor._save.assert_not_called()
@@ -549,7 +1380,7 @@ def test_process_service_error(
 
     processor._save = mocker.MagicMock(side_effect=Exception("Test error"))
 
-    processor._process_service(mock_legacy_service)
+    assert processor._process_service(mock_legacy_service) is False
 
     assert processor.metrics == DataMigrationMetrics(
         total_records=1,
@@ -559,6 +1390,7 @@ def test_process_service_error(
         migrated_records=0,
         skipped_records=0,
         errors=1,
+        timings=processor.metrics.timings,
     )
 
     assert mock_logger.get_log("DM_ETL_008") == [
@@ -570,6 +1402,79 @@ def test_process_service_error(
     ]
 
 
+def test_process_service_skips_record_logs_below_level(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    mock_logger.setLevel("INFO")
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    processor.metadata = mock_metadata_cache
+    processor._save = mocker.MagicMock()
+
+    assert processor._process_service(mock_legacy_service) is True
+
+    assert mock_logger.was_logged("DM_ETL_001") is False
+    assert mock_logger.was_logged("DM_ETL_006") is False
+    assert "serialise" not in processor.metrics.timings
+
+
+def test_process_service_summary_verbosity(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    mock_logger.setLevel("DEBUG")
+    processor = DataMigrationProcessor(
+        config=mock_config.model_copy(update={"log_verbosity": LogVerbosity.SUMMARY}),
+        logger=mock_logger,
+    )
+    processor.metadata = mock_metadata_cache
+    processor._save = mocker.MagicMock()
+
+    assert processor._process_service(mock_legacy_service) is True
+
+    assert mock_logger.get_log("DM_ETL_001") == [
+        {
+            "msg": "Starting to process record",
+            "reference": "DM_ETL_001",
+        }
+    ]
+    assert mock_logger.get_log("DM_ETL_006")[0]["detail"] == {
+        "transformer_name": "GPPracticeTransformer"
+    }
+
+
+def test_should_log_record_detail(
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    services = [Service.model_construct(id=service_id) for service_id in range(1000)]
+
+    def sampled(verbosity: LogVerbosity, percent: float = 1.0) -> int:
+        processor = DataMigrationProcessor(
+            config=mock_config.model_copy(
+                update={"log_verbosity": verbosity, "log_sample_percent": percent}
+            ),
+            logger=mock_logger,
+        )
+        return sum(processor._should_log_record_detail(s) for s in services)
+
+    assert sampled(LogVerbosity.FULL) == 1000  # noqa: PLR2004
+    assert sampled(LogVerbosity.SUMMARY) == 0
+    assert sampled(LogVerbosity.SAMPLED, 0) == 0
+    assert sampled(LogVerbosity.SAMPLED, 100) == 1000  # noqa: PLR2004
+    assert 50 <= sampled(LogVerbosity.SAMPLED, 10) <= 150  # noqa: PLR2004
+    assert sampled(LogVerbosity.SAMPLED, 10) == sampled(LogVerbosity.SAMPLED, 10)
+
+
 def test_get_transformer(
     mocker: MockerFixture,
     mock_config: DataMigrationConfig,
@@ -646,6 +1551,39 @@ def test_get_transformer_not_supported(
     ]
 
 
+def test_get_transformer_dispatches_on_type_id(
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    processor = DataMigrationProcessor(
+        config=mock_config,
+        logger=mock_logger,
+    )
+    processor.metadata = mock_metadata_cache
+
+    first = processor.get_transformer(mock_legacy_service)
+    second = processor.get_transformer(mock_legacy_service)
+
+    assert isinstance(first, GPPracticeTransformer)
+    assert first is second
+    assert mock_logger.was_logged("DM_ETL_002") is False
+
+    mock_legacy_service.typeid = 200
+    assert processor.get_transformer(mock_legacy_service) is None
+    assert mock_logger.was_logged("DM_ETL_002") is False
+
+    mock_legacy_service.typeid = 100
+    mock_legacy_service.odscode = "X12345"
+    assert processor.get_transformer(mock_legacy_service) is None
+    assert len(mock_logger.get_log("DM_ETL_002")) == 1
+
+    assert processor.transformers.metrics == {
+        "GPPracticeTransformer": TransformerMetrics(selected=2, rejected=1)
+    }
+
+
 def test_save(
     mocker: MockerFixture,
     mock_config: DataMigrationConfig,
@@ -663,11 +1601,16 @@ def test_save(
     mock_location_repo = mocker.MagicMock()
     mock_service_repo = mocker.MagicMock()
 
-    dbutil.REPOSITORY_CACHE = {
-        "ftrs-dos-test-database-organisation-test_workspace": mock_org_repo,
-        "ftrs-dos-test-database-healthcare-service-test_workspace": mock_service_repo,
-        "ftrs-dos-test-database-location-test_workspace": mock_location_repo,
-    }
+    mocker.patch.object(
+        dbutil.REPOSITORY_CACHE,
+        "repositories",
+        {
+            "ftrs-dos-test-database-organisation-test_workspace": mock_org_repo,
+            "ftrs-dos-test-database-healthcare-service-test_workspace": mock_service_repo,
+            "ftrs-dos-test-database-location-test_workspace": mock_location_repo,
+        },
+        create=True,
+    )
     validation_issues = []
     transformer = processor.get_transformer(mock_legacy_service)
     result = transformer.transform(mock_legacy_service, validation_issues)
@@ -682,3 +1625,20 @@ def test_save(
 
     assert mock_service_repo.upsert.call_count == 1
     mock_service_repo.upsert.assert_called_once_with(result.healthcare_service[0])
+
+
+def test_resolve_service_ids(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+) -> None:
+    processor = DataMigrationProcessor(config=mock_config, logger=mock_logger)
+    mock_get_parent_service_ids = mocker.patch(
+        "pipeline.processor.get_parent_service_ids", return_value=[1, 2]
+    )
+
+    assert processor.resolve_service_ids("servicesgsds", [10, 11]) == [1, 2]
+    mock_get_parent_service_ids.assert_called_once_with(
+        processor.engine, "servicesgsds", [10, 11]
+    )
+    assert "fetch" in processor.metrics.timings
@@ -1,3 +1,4 @@
+import logging
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -15,6 +16,7 @@ class TestDataMigrationProcessor(unittest.TestCase):
         self.config.db_config.connection_string = "sqlite+pysqlite:///:memory:"
 
         self.logger = MagicMock()
+        self.logger.log_level = logging.DEBUG
         self.processor = DataMigrationProcessor(config=self.config, logger=self.logger)
         self.processor.engine = MagicMock()
         self.processor.metadata = MagicMock()
@@ -0,0 +1,176 @@
+import json
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from ftrs_common.mocks.mock_logger import MockLogger
+from ftrs_data_layer.domain.legacy import Service
+from pytest_mock import MockerFixture
+
+from pipeline.profiler import (
+    RECORDS_FILE,
+    SUMMARY_FILE,
+    DataMigrationProfiler,
+    ProfileReport,
+    RecordProfile,
+)
+from pipeline.utils.config import DataMigrationConfig
+
+
+def test_profile_all_services(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    tmp_path: Path,
+) -> None:
+    profiler = DataMigrationProfiler(config=mock_config, logger=mock_logger)
+
+    services = [
+        mock_legacy_service,
+        mock_legacy_service.model_copy(
+            update={"id": 2, "email": "not-an-email", "address": None}
+        ),
+        mock_legacy_service.model_copy(update={"id": 3, "statusid": 2}),
+        mock_legacy_service.model_copy(update={"id": 4, "odscode": None}),
+    ]
+    profiler.processor.iter_record_batches = mocker.MagicMock(
+        return_value=[services[:2], services[2:]]
+    )
+
+    report = profiler.profile_all_services(tmp_path, batch_size=2, workers=2)
+
+    profiler.processor.iter_record_batches.assert_called_once_with(batch_size=2)
+    assert report.total_records == 4  # noqa: PLR2004
+    assert report.supported_records == 3  # noqa: PLR2004
+    assert report.unsupported_records == 1
+    assert report.skipped_records == 1
+    assert report.records_with_issues == 1
+    assert report.errors == 0
+    assert report.transformers == {"GPPracticeTransformer": 3}
+    assert report.rejection_reasons == {"Service does not have an ODS code": 1}
+    assert report.skip_reasons == {"Service is not active": 1}
+    assert report.issue_counts == {"invalid_format": 1}
+    assert report.address_issues == {"address_missing": 1}
+    assert [stage.name for stage in report.stages] == ["fetch", "profile"]
+    assert report.stages[1].processed_items == 2  # noqa: PLR2004
+    assert {"select", "validate", "address", "write"} <= set(report.timings)
+
+    # No records are written to DynamoDB
+    assert profiler.processor.metrics.migrated_records == 0
+
+    rows = {
+        row["record_id"]: row
+        for row in pq.read_table(tmp_path / RECORDS_FILE).to_pylist()
+    }
+    assert sorted(rows) == [1, 2, 3, 4]
+    assert rows[1]["is_valid"] is True
+    assert rows[2]["is_valid"] is False
+    assert rows[2]["issue_codes"] == ["invalid_format"]
+    assert rows[2]["address_issue"] == "address_missing"
+    assert rows[3]["skip_reason"] == "Service is not active"
+    assert rows[3]["is_valid"] is None
+    assert rows[4]["transformer_name"] is None
+
+    summary = json.loads((tmp_path / SUMMARY_FILE).read_text())
+    assert summary["total_records"] == 4  # noqa: PLR2004
+    assert summary["issue_counts"] == {"invalid_format": 1}
+
+    assert mock_logger.get_log("DM_ETL_026")[0]["detail"] == {
+        "total_records": 4,
+        "supported_records": 3,
+        "records_with_issues": 1,
+        "issue_counts": {"invalid_format": 1},
+    }
+
+
+def test_profile_batch_validation_error(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+) -> None:
+    profiler = DataMigrationProfiler(config=mock_config, logger=mock_logger)
+
+    transformer = profiler._select_transformer(
+        mock_legacy_service, RecordProfile(record_id=1)
+    )
+    mocker.patch.object(
+        transformer.validator, "validate_many", side_effect=ValueError("boom")
+    )
+
+    profiles = profiler._profile_batch([mock_legacy_service])
+
+    assert profiles == [
+        RecordProfile(
+            record_id=1,
+            type_id=100,
+            status_id=1,
+            transformer_name="GPPracticeTransformer",
+            error="boom",
+        )
+    ]
+
+
+def test_check_address(
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+) -> None:
+    profiler = DataMigrationProfiler(config=mock_config, logger=mock_logger)
+
+    assert profiler._check_address(mock_legacy_service) is None
+    assert (
+        profiler._check_address(
+            mock_legacy_service.model_copy(update={"address": "Not Available"})
+        )
+        == "address_missing"
+    )
+    assert (
+        profiler._check_address(
+            mock_legacy_service.model_copy(update={"address": "Leeds"})
+        )
+        == "address_lines_missing"
+    )
+    assert (
+        profiler._check_address(
+            mock_legacy_service.model_copy(update={"postcode": None})
+        )
+        == "postcode_missing"
+    )
+
+
+def test_profile_report_add() -> None:
+    report = ProfileReport()
+
+    report.add(
+        RecordProfile(
+            record_id=1,
+            transformer_name="GPPracticeTransformer",
+            is_valid=False,
+            should_continue=False,
+            issue_codes=["invalid_format", "invalid_length"],
+        )
+    )
+    report.add(
+        RecordProfile(
+            record_id=2,
+            rejection_reasons=["Service type is not GP Practice (100)"],
+            address_issue="address_missing",
+            error="boom",
+        )
+    )
+
+    assert report.model_dump(exclude={"stages", "timings"}) == {
+        "total_records": 2,
+        "supported_records": 1,
+        "unsupported_records": 1,
+        "skipped_records": 0,
+        "invalid_records": 1,
+        "records_with_issues": 1,
+        "errors": 1,
+        "transformers": {"GPPracticeTransformer": 1},
+        "rejection_reasons": {"Service type is not GP Practice (100)": 1},
+        "skip_reasons": {},
+        "issue_counts": {"invalid_format": 1, "invalid_length": 1},
+        "address_issues": {"address_missing": 1},
+    }
@@ -1,14 +1,19 @@
+from threading import Lock
+from time import sleep
 from unittest.mock import MagicMock
 
 import pytest
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.exceptions import ClientError
 from ftrs_common.mocks.mock_logger import MockLogger
 from pytest_mock import MockerFixture
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import create_mock_engine
 
 from pipeline.queue_populator import (
     DatabaseConfig,
     QueuePopulatorConfig,
+    QueuePopulatorMetrics,
     get_dms_event_batches,
     get_record_ids,
     lambda_handler,
@@ -49,7 +54,7 @@ def test_get_record_ids(
     mock_config: QueuePopulatorConfig,
     mock_sql_executor: MagicMock,
 ) -> None:
-    get_record_ids(mock_config)
+    list(get_record_ids(mock_config))
 
     mock_sql_executor.assert_called_once()
     statement = mock_sql_executor.mock_calls[0][1][0]
@@ -57,6 +62,7 @@ def test_get_record_ids(
     assert str(statement) == (
         "SELECT pathwaysdos.services.id \nFROM pathwaysdos.services"
     )
+    assert statement.get_execution_options()["yield_per"] == 1000  # noqa: PLR2004
 
 
 def test_get_record_ids_with_type_ids(
@@ -64,7 +70,7 @@ def test_get_record_ids_with_type_ids(
     mock_sql_executor: MagicMock,
 ) -> None:
     mock_config.type_ids = [1, 2, 3]
-    get_record_ids(mock_config)
+    list(get_record_ids(mock_config))
 
     mock_sql_executor.assert_called_once()
     statement = mock_sql_executor.mock_calls[0][1][0]
@@ -82,7 +88,7 @@ def test_get_record_ids_with_status_ids(
     mock_sql_executor: MagicMock,
 ) -> None:
     mock_config.status_ids = [1, 2, 3]
-    get_record_ids(mock_config)
+    list(get_record_ids(mock_config))
 
     mock_sql_executor.assert_called_once()
     statement = mock_sql_executor.mock_calls[0][1][0]
@@ -101,7 +107,7 @@ def test_get_record_ids_with_type_and_status_ids(
 ) -> None:
     mock_config.type_ids = [1, 2, 3]
     mock_config.status_ids = [4, 5, 6]
-    get_record_ids(mock_config)
+    list(get_record_ids(mock_config))
 
     mock_sql_executor.assert_called_once()
     statement = mock_sql_executor.mock_calls[0][1][0]
@@ -115,6 +121,32 @@ def test_get_record_ids_with_type_and_status_ids(
     )
 
 
+def test_get_record_ids_supported_only(
+    mock_config: QueuePopulatorConfig,
+    mock_sql_executor: MagicMock,
+) -> None:
+    mock_config.type_ids = [100]
+    mock_config.supported_only = True
+    list(get_record_ids(mock_config))
+
+    mock_sql_executor.assert_called_once()
+    statement = mock_sql_executor.mock_calls[0][1][0]
+    compiled_statement = str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert compiled_statement.startswith(
+        "SELECT pathwaysdos.services.id \n"
+        "FROM pathwaysdos.services \n"
+        "WHERE pathwaysdos.services.typeid IN (100) "
+        "AND (pathwaysdos.services.typeid = 100 "
+        "AND pathwaysdos.services.statusid = 1 "
+    )
+    assert "pathwaysdos.services.typeid IN (136, 152)" in compiled_statement
+
+
 def test_get_dms_event_batches(
     mocker: MockerFixture, mock_config: QueuePopulatorConfig
 ) -> None:
@@ -153,6 +185,28 @@ def test_get_dms_event_batches(
     }
 
 
+def test_get_dms_event_batches_records_per_message(
+    mocker: MockerFixture, mock_config: QueuePopulatorConfig
+) -> None:
+    mocker.patch(
+        "pipeline.queue_populator.get_record_ids", return_value=list(range(1, 251))
+    )
+    mock_config.records_per_message = 20
+
+    batches = list(get_dms_event_batches(mock_config))
+
+    assert len(batches) == 2  # noqa: PLR2004
+    assert len(batches[0]["Entries"]) == 10  # noqa: PLR2004
+    assert len(batches[1]["Entries"]) == 3  # noqa: PLR2004
+    assert batches[0]["Entries"][0] == {
+        "Id": "1-20",
+        "MessageBody": '{"type":"dms_batch_event","record_ids":['
+        + ",".join(str(record_id) for record_id in range(1, 21))
+        + '],"table_name":"services","method":"insert"}',
+    }
+    assert batches[1]["Entries"][-1]["Id"] == "241-250"
+
+
 def test_send_message_batch(mocker: MockerFixture, mock_logger: MockLogger) -> None:
     mock_sqs_client = mocker.MagicMock()
     mock_sqs_client.send_message_batch = mocker.MagicMock(
@@ -182,7 +236,7 @@ def test_send_message_batch(mocker: MockerFixture, mock_logger: MockLogger) -> N
         ],
     }
 
-    send_message_batch(batch)
+    assert send_message_batch(batch) == QueuePopulatorMetrics(sent_messages=2)
 
     mock_sqs_client.send_message_batch.assert_called_once_with(
         QueueUrl=batch["QueueUrl"],
@@ -234,7 +288,9 @@ def test_send_message_batch_with_failed_messages(
         ],
     }
 
-    send_message_batch(batch)
+    assert send_message_batch(batch, max_retries=0) == QueuePopulatorMetrics(
+        sent_messages=0, failed_messages=2
+    )
 
     mock_sqs_client.send_message_batch.assert_called_once_with(
         QueueUrl=batch["QueueUrl"],
@@ -293,7 +349,9 @@ def test_send_message_batch_mixed_results(
         ],
     }
 
-    send_message_batch(batch)
+    assert send_message_batch(batch, max_retries=0) == QueuePopulatorMetrics(
+        sent_messages=1, failed_messages=2
+    )
 
     mock_sqs_client.send_message_batch.assert_called_once_with(
         QueueUrl=batch["QueueUrl"],
@@ -327,6 +385,76 @@ def test_send_message_batch_mixed_results(
     ]
 
 
+def test_send_message_batch_retries_failed_messages(
+    mocker: MockerFixture, mock_logger: MockLogger
+) -> None:
+    mock_sqs_client = mocker.MagicMock()
+    mock_sqs_client.send_message_batch = mocker.MagicMock(
+        side_effect=[
+            {
+                "Successful": [{"Id": "1"}],
+                "Failed": [
+                    {"Id": "2", "SenderFault": False, "Message": "Throttled"},
+                    {"Id": "3", "SenderFault": True, "Message": "Invalid body"},
+                ],
+            },
+            ClientError(
+                {"Error": {"Code": "ServiceUnavailable", "Message": "Unavailable"}},
+                "SendMessageBatch",
+            ),
+            {"Successful": [{"Id": "2"}], "Failed": []},
+        ]
+    )
+    mock_sleep = mocker.patch("pipeline.queue_populator.sleep")
+
+    mocker.patch("pipeline.queue_populator.SQS_CLIENT", mock_sqs_client)
+    mocker.patch("pipeline.queue_populator.LOGGER", mock_logger)
+
+    entries = [{"Id": str(record_id), "MessageBody": "{}"} for record_id in (1, 2, 3)]
+    batch = {"QueueUrl": "test-queue", "Entries": entries}
+
+    assert send_message_batch(batch, retry_delay=1) == QueuePopulatorMetrics(
+        sent_messages=2, failed_messages=1
+    )
+
+    assert mock_sqs_client.send_message_batch.call_args_list == [
+        mocker.call(QueueUrl="test-queue", Entries=entries),
+        mocker.call(QueueUrl="test-queue", Entries=[entries[1]]),
+        mocker.call(QueueUrl="test-queue", Entries=[entries[1]]),
+    ]
+    assert mock_sleep.call_args_list == [mocker.call(1), mocker.call(2)]
+    assert len(mock_logger.get_log("DM_QP_005")) == 2  # noqa: PLR2004
+    assert mock_logger.get_log("DM_QP_003")[0]["detail"]["failed"] == [
+        {"Id": "3", "SenderFault": True, "Message": "Invalid body"}
+    ]
+
+
+def test_send_message_batch_retries_exhausted(
+    mocker: MockerFixture, mock_logger: MockLogger
+) -> None:
+    mock_sqs_client = mocker.MagicMock()
+    mock_sqs_client.send_message_batch = mocker.MagicMock(
+        side_effect=ClientError(
+            {"Error": {"Code": "ServiceUnavailable", "Message": "Unavailable"}},
+            "SendMessageBatch",
+        )
+    )
+    mocker.patch("pipeline.queue_populator.sleep")
+    mocker.patch("pipeline.queue_populator.SQS_CLIENT", mock_sqs_client)
+    mocker.patch("pipeline.queue_populator.LOGGER", mock_logger)
+
+    batch = {
+        "QueueUrl": "test-queue",
+        "Entries": [{"Id": "1", "MessageBody": "{}"}, {"Id": "2", "MessageBody": "{}"}],
+    }
+
+    assert send_message_batch(batch, max_retries=2) == QueuePopulatorMetrics(
+        failed_messages=2
+    )
+    assert mock_sqs_client.send_message_batch.call_count == 3  # noqa: PLR2004
+    assert mock_logger.get_log("DM_QP_003")[0]["detail"]["count"] == 2  # noqa: PLR2004
+
+
 def test_populate_sqs_queue(
     mocker: MockerFixture, mock_config: QueuePopulatorConfig, mock_logger: MockLogger
 ) -> None:
@@ -336,10 +464,12 @@ def test_populate_sqs_queue(
 
     expected_batch_count = 100  # 1000 records / 10 per batch
 
-    mock_send_message_batch = mocker.MagicMock()
+    mock_send_message_batch = mocker.MagicMock(
+        return_value=QueuePopulatorMetrics(sent_messages=10)
+    )
     mocker.patch("pipeline.queue_populator.send_message_batch", mock_send_message_batch)
 
-    populate_sqs_queue(mock_config)
+    assert populate_sqs_queue(mock_config) == QueuePopulatorMetrics(sent_messages=1000)
 
     assert mock_send_message_batch.call_count == expected_batch_count
     assert mock_logger.get_log("DM_QP_000") == [
@@ -347,6 +477,7 @@ def test_populate_sqs_queue(
             "detail": {
                 "type_ids": None,
                 "status_ids": None,
+                "supported_only": False,
             },
             "msg": "Starting Data Migration Queue Populator",
             "reference": "DM_QP_000",
@@ -354,12 +485,50 @@ def test_populate_sqs_queue(
     ]
     assert mock_logger.get_log("DM_QP_999") == [
         {
-            "msg": "Data Migration Queue Populator completed",
+            "detail": {"sent_messages": 1000, "failed_messages": 0},
+            "msg": "Data Migration Queue Populator completed: 1000 messages sent, 0 failed",
             "reference": "DM_QP_999",
         }
     ]
 
 
+def test_populate_sqs_queue_bounds_in_flight_batches(
+    mocker: MockerFixture, mock_config: QueuePopulatorConfig, mock_logger: MockLogger
+) -> None:
+    mocker.patch("pipeline.queue_populator.get_record_ids", return_value=range(100))
+    mocker.patch("pipeline.queue_populator.LOGGER", mock_logger)
+    mock_config.max_in_flight_batches = 2
+
+    lock = Lock()
+    in_flight = []
+    peak_in_flight = 0
+
+    def send(batch: dict, max_retries: int) -> QueuePopulatorMetrics:
+        nonlocal peak_in_flight
+        with lock:
+            in_flight.append(batch)
+            peak_in_flight = max(peak_in_flight, len(in_flight))
+        sleep(0.001)
+        with lock:
+            in_flight.remove(batch)
+
+        if batch["Entries"][0]["Id"] == "50":
+            raise RuntimeError("Unexpected error")
+        return QueuePopulatorMetrics(sent_messages=len(batch["Entries"]))
+
+    mocker.patch("pipeline.queue_populator.send_message_batch", side_effect=send)
+
+    assert populate_sqs_queue(mock_config) == QueuePopulatorMetrics(
+        sent_messages=90, failed_messages=10
+    )
+    assert peak_in_flight <= 2  # noqa: PLR2004
+    assert mock_logger.get_log("DM_QP_006")[0]["detail"] == {
+        "count": 10,
+        "error": "Unexpected error",
+        "queue_url": mock_config.sqs_queue_url,
+    }
+
+
 def test_lambda_handler(
     mocker: MockerFixture,
     mock_config: QueuePopulatorConfig,
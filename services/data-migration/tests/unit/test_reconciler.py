@@ -0,0 +1,107 @@
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from ftrs_common.mocks.mock_logger import MockLogger
+from ftrs_data_layer.domain.legacy import Service
+from pytest_mock import MockerFixture
+
+from pipeline.processor import TransformedBatch, TransformedService
+from pipeline.reconciler import DataMigrationReconciler, TableReconciliation
+from pipeline.transformer import GPPracticeTransformer
+from pipeline.utils.cache import DoSMetadataCache
+from pipeline.utils.config import DataMigrationConfig
+
+
+def test_reconcile(
+    mocker: MockerFixture,
+    mock_config: DataMigrationConfig,
+    mock_logger: MockLogger,
+    mock_legacy_service: Service,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    reconciler = DataMigrationReconciler(config=mock_config, logger=mock_logger)
+
+    transformer = GPPracticeTransformer(
+        logger=mock_logger, metadata=mock_metadata_cache
+    )
+    output = transformer.transform(mock_legacy_service, [])
+    reconciler.processor.iter_transformed_batches = mocker.MagicMock(
+        return_value=[
+            TransformedBatch(
+                sequence=0,
+                last_record_id=1,
+                record_count=1,
+                start_time=0.0,
+                services=[
+                    TransformedService(
+                        record_id=1,
+                        transformer_name="GPPracticeTransformer",
+                        output=output,
+                        start_time=0.0,
+                    )
+                ],
+            )
+        ]
+    )
+
+    organisation = output.organisation[0].model_copy(
+        # Timestamps are not compared
+        update={"modifiedDateTime": datetime.now(UTC)}
+    )
+    location = output.location[0].model_copy(update={"name": "Drifted"})
+    extra_service = output.healthcare_service[0].model_copy(update={"id": uuid4()})
+    target_items = {
+        "organisation": [[organisation.model_dump(mode="json")], []],
+        "location": [[], [location.model_dump(mode="json")]],
+        "healthcare-service": [[extra_service.model_dump(mode="json")], []],
+    }
+
+    def get_repository(
+        config: DataMigrationConfig, table: str, model_cls: type, logger: MockLogger
+    ) -> MagicMock:
+        repository = mocker.MagicMock()
+        repository.scan_segment.side_effect = lambda segment, total_segments: map(
+            model_cls.model_validate, target_items[table][segment]
+        )
+        return repository
+
+    mock_get_repository = mocker.patch(
+        "pipeline.reconciler.get_repository", side_effect=get_repository
+    )
+
+    results = reconciler.reconcile(segments=2, batch_size=10)
+
+    assert results == [
+        TableReconciliation(
+            table="organisation",
+            source_records=1,
+            target_records=1,
+            matched=1,
+        ),
+        TableReconciliation(
+            table="location",
+            source_records=1,
+            target_records=1,
+            drifted=[str(location.id)],
+        ),
+        TableReconciliation(
+            table="healthcare-service",
+            source_records=1,
+            target_records=1,
+            missing=[str(output.healthcare_service[0].id)],
+            extra=[str(extra_service.id)],
+        ),
+    ]
+    reconciler.processor.iter_transformed_batches.assert_called_once_with(10)
+    # Each scan thread gets its own repository
+    assert mock_get_repository.call_count == 6  # noqa: PLR2004
+
+    logs = mock_logger.get_log("DM_ETL_027")
+    assert [log["detail"]["table"] for log in logs] == [
+        "organisation",
+        "location",
+        "healthcare-service",
+    ]
+    assert logs[2]["detail"]["missing"] == 1
+    assert logs[2]["detail"]["extra"] == 1
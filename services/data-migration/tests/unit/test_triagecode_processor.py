@@ -9,6 +9,7 @@ from ftrs_data_layer.logbase import DataMigrationLogBase
 from pipeline.transformer.triage_code import TriageCodeTransformer
 from pipeline.triagecode_processor import TriageCodeProcessor
 from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.stage import StageMetrics
 
 
 @pytest.fixture(autouse=True)
@@ -22,6 +23,7 @@ def processor() -> TriageCodeProcessor:
     processor = TriageCodeProcessor(config, logger)
     processor.metadata = Mock()
     processor._save_to_dynamoDB = Mock()
+    processor._save_batch_to_dynamoDB = Mock()
     return processor
 
 
@@ -62,6 +64,76 @@ def test_sync_all_triage_codes_processes_all_record_types(
     mock_transform_discriminator.assert_called_once_with(mock_symptom_discriminator)
 
 
+@patch("pipeline.triagecode_processor.iter_records")
+@patch.object(TriageCodeTransformer, "build_triage_code_from_symptom_group")
+@patch.object(TriageCodeTransformer, "build_triage_code_from_disposition")
+@patch.object(TriageCodeTransformer, "build_triage_code_from_symptom_discriminator")
+def test_sync_all_triage_codes_concurrent(
+    mock_transform_discriminator: Mock,
+    mock_transform_disposition: Mock,
+    mock_transform_group: Mock,
+    mock_iter_records: Mock,
+    processor: TriageCodeProcessor,
+) -> NoReturn:
+    records = {
+        legacy.SymptomGroup: [Mock(id=record_id) for record_id in range(150)],
+        legacy.Disposition: [Mock(id=1), Mock(id=2)],
+        legacy.SymptomDiscriminator: [Mock(id=3)],
+    }
+    mock_iter_records.side_effect = lambda engine, model, batch_size: iter(
+        records[model]
+    )
+    mock_transform_disposition.side_effect = [Mock(id="DX1"), Exception("Failed")]
+    processor._process_combinations = Mock(
+        return_value=StageMetrics(name="Combinations", processed_items=5)
+    )
+
+    processor.sync_all_triage_codes(concurrent=True)
+
+    assert mock_transform_group.call_count == 150  # noqa: PLR2004
+    mock_transform_discriminator.assert_called_once_with(
+        records[legacy.SymptomDiscriminator][0]
+    )
+    processor._process_combinations.assert_called_once_with(log_records=False)
+    processor._save_to_dynamoDB.assert_not_called()
+    assert sorted(
+        len(call.args[0]) for call in processor._save_batch_to_dynamoDB.call_args_list
+    ) == [1, 1, 50, 100]
+    assert processor.metrics.errors == 1
+
+    stage_logs = {
+        call.kwargs["stage"]: call.kwargs
+        for call in processor.logger.log.call_args_list
+        if call.args[0] == DataMigrationLogBase.DM_ETL_024
+    }
+    assert list(stage_logs) == [
+        "SymptomGroup",
+        "Disposition",
+        "SymptomDiscriminator",
+        "Combinations",
+    ]
+    assert stage_logs["SymptomGroup"]["processed_items"] == 150  # noqa: PLR2004
+    assert stage_logs["Disposition"]["processed_items"] == 1
+    assert stage_logs["Disposition"]["errors"] == 1
+    assert stage_logs["Combinations"]["processed_items"] == 5  # noqa: PLR2004
+
+
+@patch("pipeline.triagecode_processor.iter_records")
+def test_sync_all_triage_codes_concurrent_stream_error(
+    mock_iter_records: Mock,
+    processor: TriageCodeProcessor,
+) -> NoReturn:
+    mock_iter_records.side_effect = Exception("Database connection failed")
+    processor._process_combinations = Mock(
+        return_value=StageMetrics(name="Combinations")
+    )
+
+    with pytest.raises(Exception, match="Database connection failed"):
+        processor.sync_all_triage_codes(concurrent=True)
+
+    processor._process_combinations.assert_called_once()
+
+
 def test_process_record_logs_input_record(processor: TriageCodeProcessor) -> NoReturn:
     record = Mock()
     record.id = 1
@@ -171,79 +243,133 @@ def test_save_to_dynamoDB_calls_upsert(
     mock_repo.upsert.assert_called_once_with(triage_code)
 
 
+@patch("pipeline.triagecode_processor.get_repository")
+def test_save_batch_to_dynamoDB_calls_batch_upsert(
+    mock_get_repository: Mock, processor: TriageCodeProcessor
+) -> NoReturn:
+    mock_repo = Mock()
+    mock_get_repository.return_value = mock_repo
+    triage_codes = [Mock(spec=TriageCode), Mock(spec=TriageCode)]
+
+    TriageCodeProcessor._save_batch_to_dynamoDB(processor, triage_codes)
+
+    mock_get_repository.assert_called_once_with(
+        processor.config, "triage-code", TriageCode, processor.logger
+    )
+    mock_repo.batch_upsert.assert_called_once_with(triage_codes)
+
+
 def test_process_combinations_success(
     mocker: Mock, processor: TriageCodeProcessor
 ) -> NoReturn:
     """
     Test successful execution of _process_combinations.
     """
-    mock_symptom_group_ids = [1, 2]
     mock_symptom_discriminators = [MagicMock(), MagicMock()]
-    mock_triage_code = MagicMock()
-
+    mock_iter = mocker.patch(
+        "pipeline.triagecode_processor.iter_symptom_discriminators_by_symptom_group",
+        return_value=[(sg_id, mock_symptom_discriminators) for sg_id in range(250)],
+    )
     mocker.patch(
-        "pipeline.triagecode_processor.get_all_symptom_groups",
-        return_value=mock_symptom_group_ids,
+        "pipeline.triagecode_processor.TriageCodeTransformer.build_triage_code_combinations",
+        side_effect=lambda sg_id, _: MagicMock(id=f"SG{sg_id}"),
     )
+
+    processor._process_combinations()
+
+    mock_iter.assert_called_once_with(processor.engine)
+    assert [call.args[0] for call in processor.logger.log.call_args_list].count(
+        DataMigrationLogBase.DM_ETL_006
+    ) == 250  # noqa: PLR2004
+    assert [
+        len(call.args[0]) for call in processor._save_batch_to_dynamoDB.call_args_list
+    ] == [100, 100, 50]
+    processor._save_to_dynamoDB.assert_not_called()
+    assert processor.metrics.errors == 0
+
+
+def test_process_combinations_error_in_transform(
+    mocker: Mock, processor: TriageCodeProcessor
+) -> NoReturn:
+    """
+    Test handling of exceptions when building the combinations for a symptom group.
+    """
     mocker.patch(
-        "pipeline.triagecode_processor.get_symptom_discriminators_for_symptom_group",
-        return_value=mock_symptom_discriminators,
+        "pipeline.triagecode_processor.iter_symptom_discriminators_by_symptom_group",
+        return_value=[(1, [MagicMock()]), (2, [MagicMock()])],
     )
     mocker.patch(
         "pipeline.triagecode_processor.TriageCodeTransformer.build_triage_code_combinations",
-        return_value=mock_triage_code,
+        side_effect=[Exception("Error building combinations"), MagicMock(id="SG2")],
     )
-    mocker.patch.object(processor, "_save_to_dynamoDB")
 
     processor._process_combinations()
 
-    assert processor._save_to_dynamoDB.call_count == len(mock_symptom_group_ids)
+    processor.logger.exception.assert_called_once()
+    processor.logger.log.assert_any_call(
+        DataMigrationLogBase.DM_ETL_008,
+        error="Error building combinations",
+    )
+    assert processor._save_batch_to_dynamoDB.call_count == 1
+    assert processor.metrics.errors == 1
 
 
-def test_process_combinations_no_discriminators(
-    mocker: Mock, processor: TriageCodeProcessor
+@patch("pipeline.triagecode_processor.iter_records", return_value=[])
+def test_sync_all_triage_codes_concurrent_skips_combination_record_logs(
+    mock_iter_records: Mock, mocker: Mock, processor: TriageCodeProcessor
 ) -> NoReturn:
     """
-    Test processing when no symptom discriminators are found for a symptom group.
+    Test that in concurrent mode combinations are only logged per symptom group on failure.
     """
-    mock_symptom_group_ids = [1]
     mocker.patch(
-        "pipeline.triagecode_processor.get_all_symptom_groups",
-        return_value=mock_symptom_group_ids,
+        "pipeline.triagecode_processor.iter_symptom_discriminators_by_symptom_group",
+        return_value=[(1, [MagicMock()]), (2, [MagicMock()])],
     )
     mocker.patch(
-        "pipeline.triagecode_processor.get_symptom_discriminators_for_symptom_group",
-        return_value=[],
+        "pipeline.triagecode_processor.TriageCodeTransformer.build_triage_code_combinations",
+        side_effect=[Exception("Error building combinations"), MagicMock(id="SG2")],
     )
 
-    processor._process_combinations()
+    processor.sync_all_triage_codes(concurrent=True)
 
-    processor.logger.log.assert_called_once_with(
-        DataMigrationLogBase.DM_ETL_012, sg_id=1
+    logged_references = [call.args[0] for call in processor.logger.log.call_args_list]
+    assert DataMigrationLogBase.DM_ETL_006 not in logged_references
+    processor.logger.exception.assert_not_called()
+    processor.logger.log.assert_any_call(
+        DataMigrationLogBase.DM_ETL_008,
+        error="Error building combinations",
+        record_id=1,
+        record_type="Combinations",
     )
+    processor._save_batch_to_dynamoDB.assert_called_once()
+    assert processor.metrics.errors == 1
 
 
-def test_process_combinations_error_in_discriminator_fetch(
+def test_process_combinations_save_error(
     mocker: Mock, processor: TriageCodeProcessor
 ) -> NoReturn:
     """
-    Test handling of exceptions when fetching discriminators for a symptom group.
+    Test that every triage code in a batch is counted as an error if the batch cannot be saved.
     """
-    mock_symptom_group_ids = [1]
     mocker.patch(
-        "pipeline.triagecode_processor.get_all_symptom_groups",
-        return_value=mock_symptom_group_ids,
+        "pipeline.triagecode_processor.iter_symptom_discriminators_by_symptom_group",
+        return_value=[(1, [MagicMock()]), (2, [MagicMock()])],
     )
     mocker.patch(
-        "pipeline.triagecode_processor.get_symptom_discriminators_for_symptom_group",
-        side_effect=Exception("Error fetching discriminators"),
+        "pipeline.triagecode_processor.TriageCodeTransformer.build_triage_code_combinations",
+        side_effect=lambda sg_id, _: MagicMock(id=f"SG{sg_id}"),
     )
+    processor._save_batch_to_dynamoDB.side_effect = Exception("Write failed")
+
     processor._process_combinations()
-    processor.logger.exception.assert_called_once()
-    processor.logger.log.assert_called_once_with(
-        DataMigrationLogBase.DM_ETL_008,
-        error="Error fetching discriminators",
+
+    processor.logger.log.assert_any_call(
+        DataMigrationLogBase.DM_ETL_025,
+        record_count=2,
+        record_ids=["SG1", "SG2"],
+        error="Write failed",
     )
+    assert processor.metrics.errors == 2  # noqa: PLR2004
 
 
 def test_process_combinations_engine_error(
@@ -253,7 +379,7 @@ def test_process_combinations_engine_error(
     Test handling of exceptions when fetching symptom groups.
     """
     mocker.patch(
-        "pipeline.triagecode_processor.get_all_symptom_groups",
+        "pipeline.triagecode_processor.iter_symptom_discriminators_by_symptom_group",
         side_effect=Exception("Database connection failed"),
     )
 
@@ -264,3 +390,4 @@ def test_process_combinations_engine_error(
         DataMigrationLogBase.DM_ETL_008,
         error="Database connection failed",
     )
+    processor._save_batch_to_dynamoDB.assert_not_called()
@@ -32,8 +32,14 @@ from ftrs_data_layer.domain.legacy import (
     ServiceSpecifiedOpeningDate,
     ServiceSpecifiedOpeningTime,
 )
+from pytest_mock import MockerFixture
 
-from pipeline.transformer import ServiceTransformer
+from pipeline.transformer import (
+    GPEnhancedAccessTransformer,
+    GPPracticeTransformer,
+    ServiceTransformer,
+    build_selection_clause,
+)
 from pipeline.utils.cache import DoSMetadataCache
 
 
@@ -79,6 +85,27 @@ def test_service_transformer_abstract_methods(mock_logger: MockLogger) -> None:
         ServiceTransformer(logger=mock_logger)
 
 
+def test_service_transformer_default_selection_criteria() -> None:
+    assert ServiceTransformer.get_selection_criteria() == []
+
+
+def test_build_selection_clause() -> None:
+    clause = build_selection_clause(
+        [GPPracticeTransformer, GPEnhancedAccessTransformer]
+    )
+
+    assert clause is not None
+    assert len(clause.clauses) == 2  # noqa: PLR2004
+
+
+def test_build_selection_clause_unfiltered_transformer() -> None:
+    class BasicTransformer(ServiceTransformer):
+        pass
+
+    assert build_selection_clause([GPPracticeTransformer, BasicTransformer]) is None
+    assert build_selection_clause([]) is None
+
+
 @freeze_time("2025-07-17T12:00:00")
 def test_service_transformer_build_organisation(
     mock_logger: MockLogger,
@@ -779,6 +806,32 @@ def test_build_sgsds(
     ]
 
 
+def test_build_sgsd_pair_cached(
+    mocker: MockerFixture,
+    mock_legacy_service: Service,
+    mock_logger: MockLogger,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    transformer = BasicServiceTransformer(
+        logger=mock_logger,
+        metadata=mock_metadata_cache,
+    )
+    mocker.spy(mock_metadata_cache.symptom_groups, "get")
+
+    first = transformer.build_sgsds(mock_legacy_service)
+    second = transformer.build_sgsds(mock_legacy_service)
+
+    assert first == second
+    assert mock_metadata_cache.symptom_groups.get.call_count == 2  # noqa: PLR2004
+    assert list(transformer.sgsd_pairs) == [(1035, 4003), (360, 14023)]
+
+    # Each service gets its own copy, so changing one output does not affect another
+    assert all(a is not b for a, b in zip(first, second, strict=True))
+    first[0].sd.synonyms.append("changed")
+    assert "changed" not in second[0].sd.synonyms
+    assert "changed" not in transformer.build_sgsds(mock_legacy_service)[0].sd.synonyms
+
+
 def test_build_dispositions(
     mock_legacy_service: Service,
     mock_logger: MockLogger,
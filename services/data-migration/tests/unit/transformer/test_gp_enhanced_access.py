@@ -2,6 +2,7 @@ import pytest
 from ftrs_common.mocks.mock_logger import MockLogger
 from ftrs_data_layer.domain import HealthcareServiceCategory, HealthcareServiceType
 from ftrs_data_layer.domain.legacy import Service
+from sqlalchemy.dialects import postgresql
 
 from pipeline.transformer.gp_enhanced_access import GPEnhancedAccessTransformer
 from pipeline.utils.cache import DoSMetadataCache
@@ -95,6 +96,19 @@ def test_is_service_supported(
     assert message == expected_message
 
 
+def test_get_selection_criteria() -> None:
+    criteria = GPEnhancedAccessTransformer.get_selection_criteria()
+
+    assert [
+        str(clause.compile(dialect=postgresql.dialect())) for clause in criteria
+    ] == [
+        "pathwaysdos.services.typeid IN (__[POSTCOMPILE_typeid_1])",
+        "pathwaysdos.services.statusid = %(statusid_1)s",
+        "left(pathwaysdos.services.odscode, %(left_1)s) ~ %(left_2)s",
+    ]
+    assert criteria[2].right.value == r"^U\d{5}$"
+
+
 @pytest.mark.parametrize(
     "status_id, service_name, expected_result, expected_message",
     [
@@ -2,6 +2,7 @@ import pytest
 from ftrs_common.mocks.mock_logger import MockLogger
 from ftrs_data_layer.domain import HealthcareServiceCategory, HealthcareServiceType
 from ftrs_data_layer.domain.legacy import Service
+from sqlalchemy.dialects import postgresql
 
 from pipeline.transformer.gp_practice import GPPracticeTransformer
 from pipeline.utils.cache import DoSMetadataCache
@@ -38,6 +39,23 @@ def test_is_service_supported(
     assert message == expected_message
 
 
+def test_get_selection_criteria() -> None:
+    criteria = GPPracticeTransformer.get_selection_criteria()
+
+    assert [
+        str(
+            clause.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        for clause in criteria
+    ] == [
+        "pathwaysdos.services.typeid = 100",
+        "pathwaysdos.services.statusid = 1",
+        "pathwaysdos.services.odscode ~ '^[ABCDEFGHJKLMNPVWY][0-9]{5}$'",
+    ]
+
+
 @pytest.mark.parametrize(
     "status_id, expected_result, expected_message",
     [
@@ -0,0 +1,105 @@
+from datetime import UTC, datetime
+
+from freezegun import freeze_time
+from ftrs_common.mocks.mock_logger import MockLogger
+
+from pipeline.transformer import (
+    GPEnhancedAccessTransformer,
+    GPPracticeTransformer,
+    ServiceTransformer,
+    TransformerMetrics,
+    TransformerRegistry,
+)
+from pipeline.utils.cache import DoSMetadataCache
+
+
+class BasicTransformer(ServiceTransformer):
+    pass
+
+
+def test_get_candidates() -> None:
+    registry = TransformerRegistry([GPPracticeTransformer, GPEnhancedAccessTransformer])
+
+    assert registry.get_candidates(100) == [GPPracticeTransformer]
+    assert registry.get_candidates(136) == [GPEnhancedAccessTransformer]
+    assert registry.get_candidates(152) == [GPEnhancedAccessTransformer]
+    assert registry.get_candidates(200) == []
+    assert registry.get_candidates(None) == []
+
+
+def test_get_candidates_with_fallback() -> None:
+    registry = TransformerRegistry(
+        [BasicTransformer, GPPracticeTransformer, GPEnhancedAccessTransformer]
+    )
+
+    assert registry.get_candidates(100) == [BasicTransformer, GPPracticeTransformer]
+    assert registry.get_candidates(136) == [
+        BasicTransformer,
+        GPEnhancedAccessTransformer,
+    ]
+    assert registry.get_candidates(200) == [BasicTransformer]
+
+
+def test_get_instance_is_cached(
+    mock_logger: MockLogger,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    registry = TransformerRegistry([GPPracticeTransformer])
+
+    first = registry.get_instance(
+        GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+    )
+    second = registry.get_instance(
+        GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+    )
+
+    assert isinstance(first, GPPracticeTransformer)
+    assert first is second
+    assert first.logger == mock_logger
+    assert first.metadata == mock_metadata_cache
+
+
+def test_get_instance_refreshes_start_time(
+    mock_logger: MockLogger,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    registry = TransformerRegistry([GPPracticeTransformer])
+
+    with freeze_time("2025-01-01T09:00:00Z"):
+        instance = registry.get_instance(
+            GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+        )
+        assert instance.start_time == datetime(2025, 1, 1, 9, tzinfo=UTC)
+
+    # A record transformed hours later in the same sync gets a later timestamp
+    with freeze_time("2025-01-01T12:00:00Z"):
+        assert registry.get_instance(
+            GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+        ).start_time == datetime(2025, 1, 1, 12, tzinfo=UTC)
+
+
+def test_get_metrics_and_reset(
+    mock_logger: MockLogger,
+    mock_metadata_cache: DoSMetadataCache,
+) -> None:
+    registry = TransformerRegistry([GPPracticeTransformer])
+
+    registry.get_metrics(GPPracticeTransformer).selected += 1
+    registry.get_metrics(GPPracticeTransformer).rejected += 2
+    instance = registry.get_instance(
+        GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+    )
+
+    assert registry.metrics == {
+        "GPPracticeTransformer": TransformerMetrics(selected=1, rejected=2)
+    }
+
+    registry.reset()
+
+    assert registry.metrics == {}
+    assert (
+        registry.get_instance(
+            GPPracticeTransformer, logger=mock_logger, metadata=mock_metadata_cache
+        )
+        is not instance
+    )
@@ -3,11 +3,16 @@ from unittest.mock import MagicMock, patch
 
 from pipeline.utils.address_formatter import (
     _norm,
+    _pycountry_county_name_gb,
+    _search_county_name,
     format_address,
 )
 
 
 class TestAddressFormatter(unittest.TestCase):
+    def setUp(self) -> None:
+        _search_county_name.cache_clear()
+
     def test_verify_address_formatting_with_multiple_segments(self) -> None:
         # Input address with multiple segments
         result = format_address(
@@ -111,6 +116,37 @@ class TestAddressFormatter(unittest.TestCase):
 
             self.assertEqual(result.county, "Hampshire")
 
+    def test_verify_county_detection_fuzzy_matches(self) -> None:
+        # Segments which are not the exact name of a GB subdivision keep the
+        # result of pycountry's fuzzy search
+        self.assertEqual(_pycountry_county_name_gb("Bristol"), "Bristol, City of")
+        self.assertEqual(_pycountry_county_name_gb("Berkshire"), "West Berkshire")
+        self.assertEqual(_pycountry_county_name_gb("Oxford"), "Oxfordshire")
+        self.assertEqual(_pycountry_county_name_gb("Lincoln"), "Lincolnshire")
+        self.assertEqual(_pycountry_county_name_gb("London"), "London, City of")
+        self.assertEqual(_pycountry_county_name_gb("ton"), "Luton")
+        self.assertEqual(_pycountry_county_name_gb("Kent"), "Kent")
+        self.assertIsNone(_pycountry_county_name_gb("  "))
+
+    @patch("pipeline.utils.address_formatter.pycountry")
+    def test_verify_county_detection_exact_subdivision_not_searched(
+        self, mock_pycountry: MagicMock
+    ) -> None:
+        self.assertEqual(
+            _pycountry_county_name_gb(" north  YORKSHIRE "), "North Yorkshire"
+        )
+
+        mock_pycountry.subdivisions.search_fuzzy.assert_not_called()
+
+    @patch("pipeline.utils.address_formatter.pycountry")
+    def test_verify_county_search_is_memoised(self, mock_pycountry: MagicMock) -> None:
+        mock_pycountry.subdivisions.search_fuzzy.return_value = []
+
+        _pycountry_county_name_gb("Oxford")
+        _pycountry_county_name_gb("Oxford")
+
+        mock_pycountry.subdivisions.search_fuzzy.assert_called_once_with("Oxford")
+
     def test_verify_text_normalization(self) -> None:
         self.assertEqual(_norm(None), "")
         self.assertEqual(_norm(""), "")
@@ -0,0 +1,66 @@
+from datetime import datetime
+from pathlib import Path
+
+from freezegun import freeze_time
+
+from pipeline.utils.checkpoint import (
+    BatchCompletionTracker,
+    MigrationCheckpoint,
+    MigrationCheckpointStore,
+    SyncWatermark,
+    SyncWatermarkStore,
+)
+
+
+def test_load_missing_checkpoint(tmp_path: Path) -> None:
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+
+    assert store.load() == MigrationCheckpoint()
+
+
+@freeze_time("2025-07-25 12:00:00")
+def test_save_and_load_checkpoint(tmp_path: Path) -> None:
+    store = MigrationCheckpointStore(tmp_path / "nested" / "checkpoint.json")
+
+    store.save(MigrationCheckpoint(last_record_id=123, processed_records=1000))
+
+    loaded = store.load()
+    assert loaded.last_record_id == 123  # noqa: PLR2004
+    assert loaded.processed_records == 1000  # noqa: PLR2004
+    assert loaded.updated_at.isoformat() == "2025-07-25T12:00:00+00:00"
+    assert not (tmp_path / "nested" / "checkpoint.json.tmp").exists()
+
+
+def test_clear_checkpoint(tmp_path: Path) -> None:
+    store = MigrationCheckpointStore(tmp_path / "checkpoint.json")
+    store.save(MigrationCheckpoint(last_record_id=1))
+
+    store.clear()
+
+    assert not store.path.exists()
+    # Clearing an already removed checkpoint is a no-op
+    store.clear()
+
+
+def test_save_and_load_watermark(tmp_path: Path) -> None:
+    store = SyncWatermarkStore(tmp_path / "watermark.json")
+    assert store.load() == SyncWatermark()
+
+    store.save(SyncWatermark(modified_since=datetime(2025, 7, 1, 9, 30)))
+
+    assert store.load().modified_since == datetime(2025, 7, 1, 9, 30)
+
+
+def test_batch_completion_tracker_orders_batches() -> None:
+    completed = []
+    tracker = BatchCompletionTracker[str](completed.append)
+
+    tracker.complete(1, "second")
+    assert completed == []
+
+    tracker.complete(2, "third")
+    assert completed == []
+
+    tracker.complete(0, "first")
+    assert completed == ["first", "second", "third"]
+    assert tracker.pending == {}
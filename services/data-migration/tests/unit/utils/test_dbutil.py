@@ -1,10 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 import pytest
+from ftrs_common.mocks.mock_logger import MockLogger
+from ftrs_data_layer.domain import Organisation
+from ftrs_data_layer.domain.legacy import SymptomGroupSymptomDiscriminator
 from sqlalchemy import Engine
+from sqlalchemy.dialects import postgresql
 from sqlmodel import Session
 
-from pipeline.utils.dbutil import iter_records
+from pipeline.utils.config import DataMigrationConfig
+from pipeline.utils.dbutil import (
+    SERVICE_CHILD_TABLES,
+    get_parent_service_ids,
+    get_repository,
+    iter_records,
+    iter_symptom_discriminators_by_symptom_group,
+)
 
 
 @pytest.fixture
@@ -125,3 +137,104 @@ def test_select_statement_yields_correct_number_of_records(
 
         assert len(results) == record_count
         assert results == mock_records
+
+
+def test_iter_symptom_discriminators_by_symptom_group(mock_engine: Mock) -> None:
+    rows = [
+        SymptomGroupSymptomDiscriminator(
+            id=row_id, symptomgroupid=sg_id, symptomdiscriminatorid=sd_id
+        )
+        for row_id, sg_id, sd_id in [(1, 10, 1), (2, 10, 2), (3, 11, 1), (4, 12, 3)]
+    ]
+
+    with patch("pipeline.utils.dbutil.Session") as mock_session_cls:
+        mock_session_instance = Mock()
+        mock_session_cls.return_value.__enter__.return_value = mock_session_instance
+        mock_session_instance.scalars.return_value = iter(rows)
+
+        groups = list(iter_symptom_discriminators_by_symptom_group(mock_engine))
+
+    assert groups == [(10, rows[:2]), (11, [rows[2]]), (12, [rows[3]])]
+
+    mock_session_instance.scalars.assert_called_once()
+    stmt = mock_session_instance.scalars.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 1000  # noqa: PLR2004
+    assert str(stmt.compile(dialect=postgresql.dialect())).endswith(
+        "ORDER BY pathwaysdos.symptomgroupsymptomdiscriminators.symptomgroupid, "
+        "pathwaysdos.symptomgroupsymptomdiscriminators.symptomdiscriminatorid"
+    )
+
+
+@pytest.mark.parametrize(
+    ("table_name", "expected_sql"),
+    [
+        (
+            "serviceendpoints",
+            "SELECT DISTINCT pathwaysdos.serviceendpoints.serviceid \n"
+            "FROM pathwaysdos.serviceendpoints \n"
+            "WHERE pathwaysdos.serviceendpoints.id IN (__[POSTCOMPILE_id_1])",
+        ),
+        (
+            "servicedayopeningtimes",
+            "SELECT DISTINCT pathwaysdos.servicedayopenings.serviceid \n"
+            "FROM pathwaysdos.servicedayopenings "
+            "JOIN pathwaysdos.servicedayopeningtimes "
+            "ON pathwaysdos.servicedayopeningtimes.servicedayopeningid = "
+            "pathwaysdos.servicedayopenings.id \n"
+            "WHERE pathwaysdos.servicedayopeningtimes.id IN (__[POSTCOMPILE_id_1])",
+        ),
+    ],
+)
+def test_get_parent_service_ids(
+    mock_engine: Mock, table_name: str, expected_sql: str
+) -> None:
+    with patch("pipeline.utils.dbutil.Session") as mock_session_cls:
+        mock_session_instance = Mock()
+        mock_session_cls.return_value.__enter__.return_value = mock_session_instance
+        mock_session_instance.exec.return_value = iter([3, 1, 3])
+
+        service_ids = get_parent_service_ids(mock_engine, table_name, [10, 11])
+
+    assert service_ids == [1, 3]
+    stmt = mock_session_instance.exec.call_args.args[0]
+    assert str(stmt.compile(dialect=postgresql.dialect())) == expected_sql
+
+
+def test_service_child_tables() -> None:
+    assert SERVICE_CHILD_TABLES == {
+        "serviceendpoints",
+        "servicedayopenings",
+        "servicedayopeningtimes",
+        "servicespecifiedopeningdates",
+        "servicespecifiedopeningtimes",
+        "servicesgsds",
+        "servicedispositions",
+        "serviceagerange",
+    }
+
+
+def test_get_repository_cached_per_thread(
+    mock_config: DataMigrationConfig, mock_logger: MockLogger
+) -> None:
+    def get_organisation_repository() -> object:
+        return get_repository(mock_config, "organisation", Organisation, mock_logger)
+
+    with patch("pipeline.utils.dbutil.boto3.session.Session") as mock_session_cls:
+        mock_session_cls.side_effect = lambda: Mock()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            first_repository = executor.submit(get_organisation_repository).result()
+            assert executor.submit(get_organisation_repository).result() is (
+                first_repository
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_repository = executor.submit(get_organisation_repository).result()
+
+    # Each thread creates its repositories from its own session and resource
+    assert other_repository is not first_repository
+    assert other_repository.resource is not first_repository.resource
+    assert mock_session_cls.call_count == 2  # noqa: PLR2004
+    first_repository.resource.Table.assert_called_once_with(
+        "ftrs-dos-test-database-organisation-test_workspace"
+    )
@@ -0,0 +1,29 @@
+from pipeline.utils.digest import get_record_digest
+
+
+def test_get_record_digest_ignores_key_order() -> None:
+    assert get_record_digest({"id": "1", "name": "one"}) == get_record_digest(
+        {"name": "one", "id": "1"}
+    )
+
+
+def test_get_record_digest_ignores_volatile_fields() -> None:
+    record = {
+        "id": "1",
+        "modifiedDateTime": "2025-07-15T12:00:00Z",
+        "endpoints": [{"id": "2", "createdDateTime": "2025-07-15T12:00:00Z"}],
+    }
+    rerun = {
+        "id": "1",
+        "modifiedDateTime": "2025-07-16T12:00:00Z",
+        "endpoints": [{"id": "2", "createdDateTime": "2025-07-16T12:00:00Z"}],
+    }
+
+    assert get_record_digest(record) == get_record_digest(rerun)
+    assert get_record_digest(record) != get_record_digest(rerun, frozenset())
+
+
+def test_get_record_digest_detects_changes() -> None:
+    assert get_record_digest({"id": "1", "name": "one"}) != get_record_digest(
+        {"id": "1", "name": "two"}
+    )
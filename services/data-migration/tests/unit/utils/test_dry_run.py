@@ -0,0 +1,154 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from ftrs_data_layer.domain.triage_code import TriageCode
+from pydantic import BaseModel
+
+from pipeline.utils.dry_run import (
+    DryRunFormat,
+    DryRunWriter,
+    diff_dry_runs,
+    find_dry_run_file,
+    get_dry_run_path,
+    read_dry_run_file,
+)
+
+
+class MockRecord(BaseModel):
+    id: str
+    name: str
+    modifiedDateTime: str = "2025-07-15T12:00:00Z"
+
+
+@pytest.mark.parametrize("output_format", list(DryRunFormat))
+def test_write_and_read_dry_run_file(
+    tmp_path: Path, output_format: DryRunFormat
+) -> None:
+    path = get_dry_run_path(tmp_path, "organisation", output_format)
+    writer = DryRunWriter(path, output_format, batch_size=2, model_cls=MockRecord)
+
+    writer.write([MockRecord(id="1", name="one")])
+    writer.write([MockRecord(id="2", name="two"), MockRecord(id="3", name="three")])
+    assert writer.records == []
+
+    writer.write([MockRecord(id="4", name="four")])
+    assert len(writer.records) == 1
+
+    writer.close()
+
+    assert path.name == f"organisation.{output_format}"
+    assert find_dry_run_file(tmp_path, "organisation") == path
+    assert [record["name"] for record in read_dry_run_file(path, MockRecord)] == [
+        "one",
+        "two",
+        "three",
+        "four",
+    ]
+
+
+def test_flush_writes_buffered_records(tmp_path: Path) -> None:
+    path = get_dry_run_path(tmp_path, "location", DryRunFormat.JSONL)
+    writer = DryRunWriter(path, DryRunFormat.JSONL)
+
+    writer.write([MockRecord(id="1", name="one")])
+    assert path.read_text() == ""
+
+    writer.flush()
+    assert path.read_text() == (
+        '{"id":"1","name":"one","modifiedDateTime":"2025-07-15T12:00:00Z"}\n'
+    )
+
+    writer.close()
+
+
+def test_parquet_dry_run_file_is_typed(tmp_path: Path) -> None:
+    path = get_dry_run_path(tmp_path, "triage-code", DryRunFormat.PARQUET)
+    writer = DryRunWriter(path, DryRunFormat.PARQUET, model_cls=TriageCode)
+    triage_code = TriageCode(
+        id="SG1",
+        codeType="Symptom Group (SG)",
+        codeID=1,
+        codeValue="Symptom group 1",
+        time=10,
+        synonyms=["synonym"],
+    )
+    writer.write([triage_code])
+    writer.close()
+
+    schema = pq.read_schema(path)
+    assert schema.field("time").type == pa.int64()
+    assert schema.field("synonyms").type == pa.list_(pa.string())
+    assert list(read_dry_run_file(path, TriageCode)) == [
+        triage_code.model_dump(mode="json")
+    ]
+
+
+def test_parquet_dry_run_file_requires_model(tmp_path: Path) -> None:
+    path = get_dry_run_path(tmp_path, "organisation", DryRunFormat.PARQUET)
+
+    with pytest.raises(ValueError, match="A model is required"):
+        DryRunWriter(path, DryRunFormat.PARQUET)
+
+
+def test_find_dry_run_file_missing(tmp_path: Path) -> None:
+    assert find_dry_run_file(tmp_path, "organisation") is None
+
+
+def test_diff_dry_runs(tmp_path: Path) -> None:
+    left_dir = tmp_path / "left"
+    right_dir = tmp_path / "right"
+    left_dir.mkdir()
+    right_dir.mkdir()
+
+    left = DryRunWriter(
+        get_dry_run_path(left_dir, "organisation", DryRunFormat.JSONL),
+        DryRunFormat.JSONL,
+    )
+    left.write(
+        [
+            MockRecord(id="1", name="one"),
+            MockRecord(id="2", name="two"),
+            MockRecord(id="3", name="three"),
+        ]
+    )
+    left.close()
+
+    right = DryRunWriter(
+        get_dry_run_path(right_dir, "organisation", DryRunFormat.PARQUET),
+        DryRunFormat.PARQUET,
+        model_cls=MockRecord,
+    )
+    right.write(
+        [
+            # Timestamps differ between runs and are ignored
+            MockRecord(id="1", name="one", modifiedDateTime="2025-07-16T12:00:00Z"),
+            MockRecord(id="2", name="two (changed)"),
+            MockRecord(id="4", name="four"),
+        ]
+    )
+    right.close()
+
+    triage_codes = DryRunWriter(
+        get_dry_run_path(right_dir, "triage-code", DryRunFormat.JSONL_ZSTD),
+        DryRunFormat.JSONL_ZSTD,
+    )
+    triage_codes.write([TriageCode.model_construct(id="SG1", field="combinations")])
+    triage_codes.close()
+
+    with patch.dict(
+        "pipeline.utils.dry_run.DRY_RUN_MODELS", {"organisation": MockRecord}
+    ):
+        diffs = {diff.output: diff for diff in diff_dry_runs(left_dir, right_dir)}
+
+    assert list(diffs) == ["organisation", "triage-code"]
+    assert diffs["organisation"].model_dump() == {
+        "output": "organisation",
+        "added": ["4"],
+        "removed": ["3"],
+        "changed": ["2"],
+        "unchanged": 1,
+    }
+    assert diffs["triage-code"].added == ["SG1#combinations"]
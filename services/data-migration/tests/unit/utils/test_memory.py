@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from pipeline.utils.memory import get_rss_mb
+
+
+def test_get_rss_mb(mocker: MockerFixture, tmp_path: Path) -> None:
+    statm_path = tmp_path / "statm"
+    statm_path.write_text("4096 1024 256 1 0 512 0\n")
+    mocker.patch("pipeline.utils.memory.STATM_PATH", statm_path)
+    mocker.patch("pipeline.utils.memory.resource.getpagesize", return_value=4096)
+
+    assert get_rss_mb() == 4  # noqa: PLR2004
+
+
+def test_get_rss_mb_unavailable(mocker: MockerFixture, tmp_path: Path) -> None:
+    mocker.patch("pipeline.utils.memory.STATM_PATH", tmp_path / "missing")
+
+    assert get_rss_mb() is None
@@ -0,0 +1,54 @@
+import pytest
+from pytest_mock import MockerFixture
+
+from pipeline.utils.rate_limiter import TokenBucket
+
+
+def test_token_bucket_acquire_available(mocker: MockerFixture) -> None:
+    mocker.patch("pipeline.utils.rate_limiter.monotonic", return_value=0.0)
+    mock_sleep = mocker.patch("pipeline.utils.rate_limiter.sleep")
+
+    bucket = TokenBucket(rate=10)
+
+    assert bucket.acquire(4) == 0
+    assert bucket.acquire(6) == 0
+    mock_sleep.assert_not_called()
+
+
+def test_token_bucket_acquire_waits_for_refill(mocker: MockerFixture) -> None:
+    clock = {"now": 0.0}
+    mocker.patch(
+        "pipeline.utils.rate_limiter.monotonic", side_effect=lambda: clock["now"]
+    )
+    mock_sleep = mocker.patch(
+        "pipeline.utils.rate_limiter.sleep",
+        side_effect=lambda seconds: clock.update(now=clock["now"] + seconds),
+    )
+
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.acquire(10)
+
+    assert bucket.acquire(5) == pytest.approx(0.5)
+    mock_sleep.assert_called_once_with(pytest.approx(0.5))
+
+
+def test_token_bucket_acquire_more_than_capacity(mocker: MockerFixture) -> None:
+    clock = {"now": 0.0}
+    mocker.patch(
+        "pipeline.utils.rate_limiter.monotonic", side_effect=lambda: clock["now"]
+    )
+    mocker.patch(
+        "pipeline.utils.rate_limiter.sleep",
+        side_effect=lambda seconds: clock.update(now=clock["now"] + seconds),
+    )
+
+    bucket = TokenBucket(rate=10, capacity=10)
+
+    # A large request takes a full bucket and leaves it in debt
+    assert bucket.acquire(20) == 0
+    assert bucket.acquire(10) == pytest.approx(2.0)
+
+
+def test_token_bucket_invalid_rate() -> None:
+    with pytest.raises(ValueError, match="Token bucket rate must be positive"):
+        TokenBucket(rate=0)
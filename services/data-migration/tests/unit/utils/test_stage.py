@@ -0,0 +1,66 @@
+from threading import Event
+
+from pipeline.utils.stage import PipelineStage, StageMetrics
+
+
+def test_pipeline_stage_processes_items() -> None:
+    processed = []
+    stage = PipelineStage[int]("test", handler=processed.append, workers=2)
+
+    stage.start()
+    for item in range(10):
+        stage.put(item)
+    stage.join()
+
+    assert sorted(processed) == list(range(10))
+    assert stage.exception is None
+    assert stage.metrics.name == "test"
+    assert stage.metrics.workers == 2  # noqa: PLR2004
+    assert stage.metrics.processed_items == 10  # noqa: PLR2004
+    assert stage.metrics.errors == 0
+    assert stage.metrics.elapsed_time > 0
+
+
+def test_pipeline_stage_records_errors() -> None:
+    processed = []
+
+    def handler(item: int) -> None:
+        if item == 1:
+            raise ValueError("Test error")
+        processed.append(item)
+
+    stage = PipelineStage[int]("test", handler=handler)
+
+    stage.start()
+    for item in range(3):
+        stage.put(item)
+    stage.join()
+
+    # Later items are still processed so that producers are not left blocked
+    assert processed == [0, 2]
+    assert isinstance(stage.exception, ValueError)
+    assert stage.metrics.processed_items == 3  # noqa: PLR2004
+    assert stage.metrics.errors == 1
+
+
+def test_pipeline_stage_queue_is_bounded() -> None:
+    release = Event()
+    stage = PipelineStage[int]("test", handler=lambda _: release.wait(), queue_size=2)
+
+    stage.start()
+    for item in range(3):
+        stage.put(item)
+
+    assert stage.queue.full()
+    release.set()
+    stage.join()
+
+    assert stage.metrics.max_queue_depth == 2  # noqa: PLR2004
+
+
+def test_stage_metrics_items_per_second() -> None:
+    assert StageMetrics(name="test").items_per_second == 0.0
+    assert (
+        StageMetrics(name="test", processed_items=10, elapsed_time=2).items_per_second
+        == 5.0  # noqa: PLR2004
+    )
@@ -0,0 +1,62 @@
+import pytest
+
+from pipeline.utils.timing import TIMING_BUCKETS_MS, StageTiming
+
+
+def test_stage_timing_record() -> None:
+    timing = StageTiming()
+
+    timing.record(0.0005)
+    timing.record(0.003)
+    timing.record(20.0)
+
+    assert timing.count == 3  # noqa: PLR2004
+    assert timing.total_time == pytest.approx(20.0035)
+    assert timing.max_time == 20.0  # noqa: PLR2004
+    assert len(timing.buckets) == len(TIMING_BUCKETS_MS) + 1
+    assert timing.buckets[0] == 1
+    assert timing.buckets[2] == 1
+    assert timing.buckets[-1] == 1
+
+
+def test_stage_timing_percentile() -> None:
+    timing = StageTiming()
+    for _ in range(90):
+        timing.record(0.004)
+    for _ in range(10):
+        timing.record(0.3)
+
+    assert timing.percentile(50) == 5.0  # noqa: PLR2004
+    assert timing.percentile(90) == 5.0  # noqa: PLR2004
+    # Capped at the longest recorded duration rather than the 500ms bucket bound
+    assert timing.percentile(99) == pytest.approx(300.0)
+
+
+def test_stage_timing_percentile_overflow() -> None:
+    timing = StageTiming()
+    timing.record(12.5)
+
+    assert timing.percentile(50) == pytest.approx(12500.0)
+
+
+def test_stage_timing_summary() -> None:
+    assert StageTiming().summary() == {
+        "count": 0,
+        "total_time": 0.0,
+        "mean_ms": 0.0,
+        "p50_ms": 0.0,
+        "p90_ms": 0.0,
+        "p99_ms": 0.0,
+        "max_ms": 0.0,
+    }
+
+    timing = StageTiming()
+    timing.record(0.002)
+    timing.record(0.004)
+
+    summary = timing.summary()
+    assert summary["count"] == 2  # noqa: PLR2004
+    assert summary["mean_ms"] == pytest.approx(3.0)
+    assert summary["p50_ms"] == 2.0  # noqa: PLR2004
+    assert summary["p99_ms"] == pytest.approx(4.0)
+    assert summary["max_ms"] == pytest.approx(4.0)
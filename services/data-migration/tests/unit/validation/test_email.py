@@ -58,3 +58,18 @@ def test_valid_nhs_email_with_subdomain(email_validator: EmailValidator) -> None
     assert result is not None
     assert result.sanitised == email
     assert len(result.issues) == 0
+
+
+def test_validate_many() -> None:
+    emails = ["test.user@nhs.net", "invalid-email-format", "test.user@nhs.net"]
+
+    results = EmailValidator.validate_many(emails, expression="email")
+
+    assert [result.sanitised for result in results] == [
+        "test.user@nhs.net",
+        None,
+        "test.user@nhs.net",
+    ]
+    assert results[0] is results[2]
+    assert results[1].issues[0].code == "invalid_format"
+    assert results[1].issues[0].expression == ["email"]
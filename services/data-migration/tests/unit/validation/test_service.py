@@ -0,0 +1,62 @@
+from ftrs_common.mocks.mock_logger import MockLogger
+from ftrs_data_layer.domain.legacy import Service
+
+from pipeline.validation.service import GPPracticeValidator, ServiceValidator
+
+
+def test_service_validator_validate(
+    mock_logger: MockLogger, mock_legacy_service: Service
+) -> None:
+    mock_legacy_service.publicphone = "01234 567890"
+    mock_legacy_service.email = "invalid-email-format"
+
+    result = ServiceValidator(mock_logger).validate(mock_legacy_service)
+
+    assert result.origin_record_id == mock_legacy_service.id
+    assert result.sanitised.email is None
+    assert result.sanitised.publicphone == "01234567890"
+    assert [issue.code for issue in result.issues] == ["invalid_format"]
+    assert result.issues[0].expression == ["email"]
+
+
+def test_service_validator_validate_many(
+    mock_logger: MockLogger, mock_legacy_service: Service
+) -> None:
+    services = [
+        mock_legacy_service.model_copy(
+            update={"id": record_id, "nonpublicphone": nonpublicphone}
+        )
+        for record_id, nonpublicphone in [(1, "09876 543210"), (2, None), (3, "123")]
+    ]
+
+    results = ServiceValidator(mock_logger).validate_many(services)
+
+    assert [result.origin_record_id for result in results] == [1, 2, 3]
+    assert [[issue.code for issue in result.issues] for result in results] == [
+        [],
+        ["empty"],
+        ["invalid_length"],
+    ]
+    assert results[0].issues is not results[1].issues
+    assert [service.nonpublicphone for service in services] == [
+        "09876543210",
+        None,
+        None,
+    ]
+
+
+def test_gp_practice_validator_validate_many(
+    mock_logger: MockLogger, mock_legacy_service: Service
+) -> None:
+    services = [
+        mock_legacy_service.model_copy(
+            update={"id": 1, "publicname": "Practice - Site"}
+        ),
+        mock_legacy_service.model_copy(update={"id": 2, "publicname": None}),
+    ]
+
+    results = GPPracticeValidator(mock_logger).validate_many(services)
+
+    assert services[0].publicname == "Practice"
+    assert [issue.code for issue in results[0].issues] == []
+    assert [issue.code for issue in results[1].issues] == ["publicname_required"]